@@ -5,16 +5,14 @@
 from config import (
     ENTRY_TF, DAILY_TF, LTF_TF,
     LIMIT_4H, LIMIT_1D, LIMIT_LTF,
-    TP1_R, TP2_R, ZONE_BUFFER, SR_LOOKBACK
+    TP1_R, TP2_R, ZONE_BUFFER,
+    ATR_PERIOD, SUPERTREND_MULT,
+    SPOT_MIN_SCORE, FUTURES_MIN_SCORE
 )
 
-from exchange import fetch_ohlcv
-from indicators import (
-    supertrend,
-    accumulation_distribution,
-    find_support,
-    find_resistance
-)
+from candle_store import get_candles
+from indicators import supertrend, accumulation_distribution
+from levels import get_level_index
 from scoring import institutional_score
 from regime import detect_market_regime
 from risk import calculate_futures_position
@@ -45,9 +43,9 @@ def analyze_single_coin(symbol, mode, balance):
     # FETCH DATA
     # =========================
     try:
-        df4h = fetch_ohlcv(symbol, ENTRY_TF, LIMIT_4H)
-        df1d = fetch_ohlcv(symbol, DAILY_TF, LIMIT_1D)
-        df_ltf = fetch_ohlcv(symbol, LTF_TF, LIMIT_LTF)
+        df4h = get_candles(symbol, ENTRY_TF, LIMIT_4H)
+        df1d = get_candles(symbol, DAILY_TF, LIMIT_1D)
+        df_ltf = get_candles(symbol, LTF_TF, LIMIT_LTF)
     except Exception as e:
         result["Reasons"].append(f"Data error: {e}")
         return result
@@ -61,7 +59,7 @@ def analyze_single_coin(symbol, mode, balance):
     # =========================
     # DIRECTION
     # =========================
-    _, trend = supertrend(df4h, period=10, mult=3.0)
+    _, trend = supertrend(df4h, period=ATR_PERIOD, mult=SUPERTREND_MULT)
     direction = "LONG" if trend.iloc[-1] == 1 else "SHORT"
     result["Trend"] = direction
 
@@ -72,12 +70,12 @@ def analyze_single_coin(symbol, mode, balance):
     score = score_data["TotalScore"]
     result["Score"] = score
 
-    if mode == "SPOT" and score < 70:
-        result["Reasons"].append("Score < 70 (SPOT)")
+    if mode == "SPOT" and score < SPOT_MIN_SCORE:
+        result["Reasons"].append(f"Score < {SPOT_MIN_SCORE} (SPOT)")
         return result
 
-    if mode == "FUTURES" and score < 75:
-        result["Reasons"].append("Score < 75 (FUTURES)")
+    if mode == "FUTURES" and score < FUTURES_MIN_SCORE:
+        result["Reasons"].append(f"Score < {FUTURES_MIN_SCORE} (FUTURES)")
         return result
 
     # =========================
@@ -105,23 +103,25 @@ def analyze_single_coin(symbol, mode, balance):
     # =========================
     # SL + TP
     # =========================
+    levels = get_level_index(symbol, df1d)
+
     if direction == "LONG":
-        supports = [s for s in find_support(df1d, SR_LOOKBACK) if s < entry]
-        if not supports:
+        support = levels.nearest_support(entry)
+        if support is None:
             result["Reasons"].append("Tidak ada support valid")
             return result
 
-        sl = max(supports) * (1 - ZONE_BUFFER)
+        sl = support * (1 - ZONE_BUFFER)
         tp1 = entry + (entry - sl) * TP1_R
         tp2 = entry + (entry - sl) * TP2_R
 
     else:
-        resistances = [r for r in find_resistance(df1d, SR_LOOKBACK) if r > entry]
-        if not resistances:
+        resistance = levels.nearest_resistance(entry)
+        if resistance is None:
             result["Reasons"].append("Tidak ada resistance valid")
             return result
 
-        sl = min(resistances) * (1 + ZONE_BUFFER)
+        sl = resistance * (1 + ZONE_BUFFER)
         tp1 = entry - (sl - entry) * TP1_R
         tp2 = entry - (sl - entry) * TP2_R
 
@@ -0,0 +1,195 @@
+# =====================================================
+# OPSI A PRO — LOCAL READ API
+# IN-MEMORY STATE | ETAG / IF-NONE-MATCH | NO EXCHANGE CALL
+# =====================================================
+#
+# scanner_bot mem-publish state setelah tiap cycle → disimpan sebagai
+# JSON siap kirim + ETag. Request hanya membaca memory (tanpa CSV,
+# tanpa exchange), klien kirim If-None-Match → 304 kalau tidak berubah.
+#
+#   GET /scan          hasil scan cycle terakhir (+ signal baru)
+#   GET /signals       signal aktif (OPEN / TP1 HIT)
+#   GET /scores        universe score grid (close 4h terakhir)
+#   GET /performance   rollup trade result + bot rating
+#   GET /breadth       market breadth cycle terakhir
+#   GET /              daftar resource + versi
+
+import os
+import json
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+import clock
+from config import API_HOST, API_PORT, TRADE_RESULT_FILE
+
+
+# =====================================================
+# STATE (JSON + ETAG PER RESOURCE)
+# =====================================================
+class ApiState:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._items = {}        # name → (body bytes, etag, updated ms)
+
+    def publish(self, name: str, data) -> bool:
+        """Simpan resource. Return False kalau isi sama (ETag tetap)."""
+        body = json.dumps(
+            _clean(data), default=_json_default, allow_nan=False, separators=(",", ":")
+        ).encode()
+        etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+        with self._lock:
+            old = self._items.get(name)
+            if old is not None and old[1] == etag:
+                return False
+            self._items[name] = (body, etag, clock.time_ms())
+            return True
+
+    def get(self, name: str):
+        with self._lock:
+            return self._items.get(name)
+
+    def index(self) -> dict:
+        with self._lock:
+            return {
+                name: {"etag": etag, "updated": updated}
+                for name, (_, etag, updated) in self._items.items()
+            }
+
+
+def _clean(v):
+    """
+    NaN / inf → None secara rekursif. np.float64 turunan float, jadi
+    json.dumps menulisnya langsung (NaN = JSON tidak valid) tanpa
+    lewat _json_default.
+    """
+    if isinstance(v, dict):
+        return {k: _clean(x) for k, x in v.items()}
+    if isinstance(v, (list, tuple)):
+        return [_clean(x) for x in v]
+    if isinstance(v, (float, np.floating)):
+        return float(v) if np.isfinite(v) else None
+    return v
+
+
+def _json_default(v):
+    if isinstance(v, np.integer):
+        return int(v)
+    if isinstance(v, np.floating):
+        return float(v) if np.isfinite(v) else None
+    if isinstance(v, np.bool_):
+        return bool(v)
+    return str(v)
+
+
+def records(df: pd.DataFrame) -> list:
+    """DataFrame → list dict (NaN → null)."""
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+state = ApiState()
+
+
+# =====================================================
+# ROLLUP PERFORMANCE (TRADE_RESULT_FILE)
+# =====================================================
+def performance_rollup(rating: dict) -> dict:
+    out = {"rating": rating, "modes": []}
+
+    if not os.path.exists(TRADE_RESULT_FILE):
+        return out
+
+    df = pd.read_csv(TRADE_RESULT_FILE)
+    if df.empty or "R" not in df:
+        return out
+
+    out["total"] = {
+        "Trades": int(len(df)),
+        "WinRate": round(float((df["R"] > 0).mean() * 100), 2),
+        "AvgR": round(float(df["R"].mean()), 3),
+        "TotalR": round(float(df["R"].sum()), 3)
+    }
+
+    # file lama (sebelum RESULT_COLUMNS punya Mode) → total saja
+    if "Mode" not in df:
+        return out
+
+    g = df.groupby("Mode")["R"]
+    roll = pd.DataFrame({
+        "Trades": g.size(),
+        "WinRate": g.apply(lambda r: round((r > 0).mean() * 100, 2)),
+        "AvgR": g.mean().round(3),
+        "TotalR": g.sum().round(3)
+    }).reset_index()
+
+    out["modes"] = records(roll)
+    return out
+
+
+# =====================================================
+# HTTP HANDLER
+# =====================================================
+ROUTES = {
+    "/scan": "scan",
+    "/signals": "signals",
+    "/scores": "scores",
+    "/performance": "performance",
+    "/breadth": "breadth"
+}
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    server_version = "OpsiAPro/1.0"
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0].rstrip("/") or "/"
+
+        if path == "/":
+            self._send(200, json.dumps(state.index()).encode())
+            return
+
+        name = ROUTES.get(path)
+        item = state.get(name) if name else None
+
+        if item is None:
+            self._send(404, b'{"error":"not found"}')
+            return
+
+        body, etag, _ = item
+        match = self.headers.get("If-None-Match", "")
+
+        if etag in [t.strip() for t in match.split(",")] or match.strip() == "*":
+            self._send(304, None, etag)
+        else:
+            self._send(200, body, etag)
+
+    def _send(self, code, body, etag=None):
+        self.send_response(code)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        if body is not None:
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body is not None:
+            self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        pass    # tanpa access log per request
+
+
+# =====================================================
+# START (THREAD DAEMON)
+# =====================================================
+def start_api_server(host=API_HOST, port=API_PORT) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), ApiHandler)
+    server.daemon_threads = True
+    threading.Thread(
+        target=server.serve_forever, name="api-server", daemon=True
+    ).start()
+    return server
@@ -3,8 +3,10 @@
 # FINAL | STABLE | INSTITUTIONAL GRADE | STREAMLIT SAFE
 # =====================================================
 
+import os
+import tempfile
+
 import streamlit as st
-import time
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
@@ -18,24 +20,33 @@ from utils import (
 )
 
 from config import (
-    RATE_LIMIT_DELAY,
     MAX_SCAN_SYMBOLS,
-    FUTURES_BIG_COINS
+    FUTURES_BIG_COINS,
+    HISTORY_PAGE_SIZE,
+    TRADE_RESULT_FILE
 )
 
-from signals import check_signal
 from history import (
     load_signal_history,
-    save_signal,
     auto_close_signals,
     merge_signal_history,
-    monitor_regime_flip,
-    is_symbol_in_cooldown      # ✅ ANTI DUPLICATE
+    monitor_regime_flip
+)
+from history_store import (
+    query_signal_history,
+    count_signals,
+    distinct_values,
+    export_signal_history
 )
 
+from universe import top_symbols
+from scan_worker import get_scan_worker
+from score_grid import load_grid, start_grid_worker
+from heatmap import generate_score_heatmap, plot_score_heatmap
+from heatmap_delta import compute_score_delta, get_rotation_tracker
+
 from montecarlo import run_monte_carlo
 from analyze_single_coin import analyze_single_coin
-from telegram_bot import send_telegram_message, format_signal_message
 
 
 # =====================================================
@@ -55,6 +66,29 @@ st.title("🚀 OPSI A PRO — SPOT & FUTURES (Institutional Grade)")
 okx = get_okx()
 
 
+def scan_universe(mode):
+    if mode == "FUTURES":
+        return FUTURES_BIG_COINS
+
+    # top likuiditas (quote volume + spread), bukan urutan dict markets
+    return top_symbols(MAX_SCAN_SYMBOLS)
+
+
+def grid_universe():
+    return list(dict.fromkeys(FUTURES_BIG_COINS + scan_universe("SPOT")))
+
+
+# =====================================================
+# SCORE GRID (BACKGROUND, 1X PER CLOSE 4H)
+# =====================================================
+@st.cache_resource
+def _score_grid_worker():
+    return start_grid_worker(grid_universe)
+
+
+_score_grid_worker()
+
+
 # =====================================================
 # AUTO MAINTENANCE (SAFE FOR STREAMLIT CLOUD)
 # =====================================================
@@ -113,63 +147,58 @@ tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
 # =====================================================
 # TAB 1 — SCAN MARKET
 # =====================================================
-with tab1:
-    if st.button("🔍 Scan Market"):
+def render_scan_job(job, polling):
+    """
+    1 snapshot per run (tanpa loop blocking). Saat job berjalan,
+    fragment ini di-rerun tiap detik; tab lain tetap responsif.
+    """
+    snap = job.snapshot()
 
-        if MODE == "FUTURES":
-            symbols = FUTURES_BIG_COINS
-        else:
-            symbols = [
-                s for s, m in okx.markets.items()
-                if m.get("spot") and m.get("active")
-                and s.endswith("/USDT")
-            ][:MAX_SCAN_SYMBOLS]
-
-        found = []
-        progress = st.progress(0.0)
-        status = st.empty()
-        total = len(symbols)
-
-        for i, symbol in enumerate(symbols, 1):
-            status.info(f"Scanning {symbol} ({i}/{total})")
-
-            # =========================
-            # ANTI DUPLICATE / COOLDOWN
-            # =========================
-            if is_symbol_in_cooldown(symbol, MODE):
-                progress.progress(i / total)
-                continue
-
-            try:
-                sig = check_signal(symbol, MODE, BALANCE)
-            except Exception:
-                progress.progress(i / total)
-                continue
-
-            if sig and sig.get("SignalType") == "TRADE_EXECUTION":
-
-                save_signal(sig)
-                found.append(sig)
-
-                # =========================
-                # TELEGRAM ENTRY ALERT
-                # =========================
-                try:
-                    msg = format_signal_message(sig)
-                    send_telegram_message(msg)
-                    st.toast(f"📩 {symbol} sent", icon="📨")
-                except Exception as e:
-                    st.warning(f"Telegram error: {e}")
-
-            progress.progress(i / total)
-            time.sleep(RATE_LIMIT_DELAY)
-
-        if found:
-            st.success(f"🔥 Found {len(found)} A+ setups")
-            st.dataframe(pd.DataFrame(found), use_container_width=True)
+    # job selesai → full rerun supaya polling fragment berhenti
+    if polling and snap["status"] != "RUNNING":
+        st.rerun()
+
+    st.progress(snap["done"] / max(snap["total"], 1))
+
+    if snap["status"] == "RUNNING":
+        st.info(f"Scanning {snap['current'] or '...'} ({snap['done']}/{snap['total']})")
+    else:
+        until = pd.Timestamp(snap["valid_until"], unit="ms", tz="UTC")
+        st.caption(
+            f"Scan {snap['mode']} selesai {pd.Timestamp(snap['finished'], unit='s', tz='UTC'):%H:%M} UTC"
+            f" • cache sampai close candle {until:%H:%M} UTC"
+        )
+
+        if snap["status"] == "ERROR":
+            st.error("Scan gagal — klik Scan Market untuk ulang")
+        elif snap["found"]:
+            st.success(f"🔥 Found {len(snap['found'])} A+ setups")
         else:
             st.warning("Tidak ada setup A+ ditemukan")
 
+    if snap["found"]:
+        st.dataframe(pd.DataFrame(snap["found"]), use_container_width=True)
+
+    if snap["errors"]:
+        with st.expander(f"⚠️ {len(snap['errors'])} error"):
+            st.write(snap["errors"])
+
+
+with tab1:
+    worker = get_scan_worker(MODE)
+
+    if st.button("🔍 Scan Market"):
+        worker.start(scan_universe(MODE), BALANCE)
+
+    job = worker.current()
+
+    if job is None:
+        st.info("Klik Scan Market — scan jalan di background (dipakai semua session)")
+    else:
+        # job bisa dimulai session lain; polling hanya selama RUNNING
+        running = job.snapshot()["status"] == "RUNNING"
+        st.fragment(run_every=1 if running else None)(render_scan_job)(job, running)
+
 
 # =====================================================
 # TAB 2 — SIGNAL HISTORY
@@ -177,13 +206,49 @@ with tab1:
 with tab2:
     st.subheader("📜 Signal History")
 
-    df = load_signal_history()
+    c1, c2 = st.columns(2)
+    c1.metric("Total Signals", count_signals())
+    c2.metric("OPEN Signals", count_signals(status="OPEN"))
+
+    # =========================
+    # FILTER (SERVER SIDE)
+    # =========================
+    f1, f2, f3, f4 = st.columns(4)
+
+    f_symbol = f1.selectbox(
+        "Symbol",
+        ["ALL"] + distinct_values("Symbol")
+    )
+    f_mode = f2.selectbox("Mode", ["ALL", "SPOT", "FUTURES"])
+    f_status = f3.multiselect(
+        "Status",
+        ["OPEN", "TP1 HIT", "TP2 HIT", "SL HIT"]
+    )
+    f_dates = f4.date_input("Tanggal (UTC)", value=())
+
+    filters = {
+        "symbol": None if f_symbol == "ALL" else f_symbol,
+        "mode": None if f_mode == "ALL" else f_mode,
+        "status": f_status or None,
+        "start": f_dates[0] if len(f_dates) > 0 else None,
+        "end": f_dates[1] if len(f_dates) > 1 else None
+    }
+
+    total = count_signals(**filters)
+    pages = max(1, -(-total // HISTORY_PAGE_SIZE))
+
+    page = st.number_input(
+        f"Page (1–{pages})",
+        min_value=1,
+        max_value=pages,
+        value=1,
+        step=1
+    )
 
-    st.metric("Total Signals", len(df))
-    st.metric("OPEN Signals", (df["Status"] == "OPEN").sum())
+    df, total = query_signal_history(page=int(page), **filters)
 
     preferred_cols = [
-        "Time",
+        "TimeWIB",
         "Symbol",
         "Phase",
         "Regime",
@@ -203,10 +268,8 @@ with tab2:
 
     show_cols = [c for c in preferred_cols if c in df.columns]
 
-    st.dataframe(
-        df[show_cols].sort_values("Time", ascending=False),
-        use_container_width=True
-    )
+    st.caption(f"{total} signal cocok filter • page {page}/{pages}")
+    st.dataframe(df[show_cols], use_container_width=True)
 
     st.divider()
 
@@ -216,25 +279,42 @@ with tab2:
     )
 
     if uploaded:
-        upload_df = pd.read_csv(uploaded)
-        st.dataframe(upload_df.head(), use_container_width=True)
+        st.dataframe(pd.read_csv(uploaded, nrows=5), use_container_width=True)
 
         if st.button("♻️ Merge ke History"):
-            added = merge_signal_history(upload_df)
+            added = merge_signal_history(uploaded)
 
             if added > 0:
                 st.success(f"✅ {added} signal baru ditambahkan")
             else:
                 st.info("ℹ️ Tidak ada signal baru")
 
-            st.experimental_rerun()
-
-    st.download_button(
-        "⬇️ Download Full History",
-        df.to_csv(index=False),
-        "signal_history_backup.csv",
-        mime="text/csv"
-    )
+            st.rerun()
+
+    # =========================
+    # EXPORT (STREAMING, ON DEMAND)
+    # =========================
+    # file temp per session → export session lain tidak saling timpa;
+    # tombol download di luar branch klik supaya tetap ada saat rerun
+    if st.button("📦 Siapkan Export CSV"):
+        old = st.session_state.get("history_export")
+        if old and os.path.exists(old):
+            os.remove(old)
+
+        fd, path = tempfile.mkstemp(prefix="opsi_history_", suffix=".csv")
+        os.close(fd)
+        st.session_state["history_export"] = export_signal_history(path, **filters)
+
+    export_path = st.session_state.get("history_export")
+
+    if export_path and os.path.exists(export_path):
+        with open(export_path, "rb") as f:
+            st.download_button(
+                "⬇️ Download History",
+                f,
+                "signal_history_backup.csv",
+                mime="text/csv"
+            )
 
 
 # =====================================================
@@ -242,7 +322,7 @@ with tab2:
 # =====================================================
 with tab3:
     try:
-        trade_results = pd.read_csv("trade_results.csv")
+        trade_results = pd.read_csv(TRADE_RESULT_FILE)
     except Exception:
         trade_results = pd.DataFrame()
 
@@ -276,3 +356,57 @@ with tab3:
                     ))
 
                 st.plotly_chart(fig, use_container_width=True)
+
+
+# =====================================================
+# TAB 5 — SCORE HEATMAP (PRECOMPUTED GRID)
+# =====================================================
+with tab5:
+    grid = generate_score_heatmap(okx)
+
+    if grid.empty:
+        st.info("Score grid belum tersedia — dihitung di background setiap close 4h")
+    else:
+        close_ms = load_grid()["close"]
+        st.caption(
+            f"Close 4h: {pd.Timestamp(close_ms, unit='ms', tz='UTC'):%Y-%m-%d %H:%M} UTC"
+            f" • {len(grid)} symbol"
+        )
+
+        st.plotly_chart(plot_score_heatmap(grid), use_container_width=True)
+        st.dataframe(
+            grid.sort_values("Score", ascending=False).drop(columns="BarTime"),
+            use_container_width=True,
+            hide_index=True
+        )
+
+
+# =====================================================
+# TAB 6 — Δ SCORE (ROTATION)
+# =====================================================
+with tab6:
+    delta = compute_score_delta()
+
+    if delta is None:
+        st.info("Butuh minimal 2 snapshot grid (2 close 4h)")
+    else:
+        tracker = get_rotation_tracker()
+        horizon = st.radio(
+            "Horizon (jumlah close 4h)",
+            list(tracker.horizons),
+            horizontal=True
+        )
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.subheader("🟢 Top Gainers")
+            st.dataframe(tracker.gainers(horizon), use_container_width=True, hide_index=True)
+        with col2:
+            st.subheader("🔴 Top Losers")
+            st.dataframe(tracker.losers(horizon), use_container_width=True, hide_index=True)
+
+        st.subheader("🔄 Rotating In")
+        st.dataframe(tracker.rotating_in(horizon), use_container_width=True, hide_index=True)
+
+        with st.expander("Δ Score semua symbol (snapshot terakhir)"):
+            st.dataframe(delta, use_container_width=True, hide_index=True)
@@ -0,0 +1,182 @@
+# =====================================================
+# OPSI A PRO — HISTORICAL BACKFILL
+# OKX HISTORY-CANDLES | PARALLEL | RESUMABLE CHECKPOINT
+# =====================================================
+#
+# Unit kerja = (symbol, tf). Tiap unit page mundur via
+# /market/history-candles (param "after" = ambil bar < cursor),
+# semua thread berbagi bucket "history_candles" di ratelimit.limiter.
+# Setiap page: upsert ke candle store → checkpoint cursor ke JSON.
+# Dijalankan ulang → lanjut dari cursor terakhir.
+#
+#   python backfill.py --tf 15m 4h 1d --days 730 --workers 4
+
+import os
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+from config import (
+    FUTURES_BIG_COINS,
+    ENTRY_TF,
+    DAILY_TF,
+    BASE_TF,
+    BACKFILL_CHECKPOINT_FILE,
+    BACKFILL_PAGE_LIMIT,
+    EXCHANGE_BAR_OFFSET_HOURS
+)
+from exchange import get_okx
+from ratelimit import limiter
+from candle_store import upsert_candles, candle_bounds, COLS
+from resample import timeframe_ms
+
+_lock = threading.Lock()
+
+
+# =====================================================
+# CHECKPOINT
+# =====================================================
+def _key(symbol: str, tf: str) -> str:
+    return f"{symbol}|{tf}"
+
+
+def load_checkpoint() -> dict:
+    if not os.path.exists(BACKFILL_CHECKPOINT_FILE):
+        return {}
+    with open(BACKFILL_CHECKPOINT_FILE) as f:
+        return json.load(f)
+
+
+def _save_checkpoint(symbol: str, tf: str, state: dict):
+    with _lock:
+        data = load_checkpoint()
+        data[_key(symbol, tf)] = state
+
+        tmp = BACKFILL_CHECKPOINT_FILE + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=1)
+        os.replace(tmp, BACKFILL_CHECKPOINT_FILE)
+
+
+# =====================================================
+# 1 PAGE
+# =====================================================
+def okx_bar(tf: str) -> str:
+    """
+    ccxt tf → param bar OKX, alignment sama dengan store / seed ccxt:
+    >= 6h pakai varian "utc" kalau EXCHANGE_BAR_OFFSET_HOURS = 0.
+    """
+    bar = tf[:-1] + {"m": "m", "h": "H", "d": "D", "w": "W"}[tf[-1]]
+    if EXCHANGE_BAR_OFFSET_HOURS == 0 and timeframe_ms(tf) >= 6 * 3_600_000:
+        bar += "utc"
+    return bar
+
+
+def fetch_history_page(okx, symbol: str, tf: str, before_ms: int):
+    """Max BACKFILL_PAGE_LIMIT bar dengan open time < before_ms (urut naik)."""
+    limiter.acquire("history_candles")
+
+    res = okx.publicGetMarketHistoryCandles({
+        "instId": okx.market(symbol)["id"],
+        "bar": okx_bar(tf),
+        "after": str(int(before_ms)),
+        "limit": str(BACKFILL_PAGE_LIMIT)
+    })
+
+    rows = [r[:6] for r in res.get("data", [])]
+    df = pd.DataFrame(rows, columns=COLS).astype(float)
+    df["t"] = df["t"].astype("int64")
+
+    return df.sort_values("t").reset_index(drop=True)
+
+
+# =====================================================
+# 1 SYMBOL × TF
+# =====================================================
+def backfill_one(okx, symbol: str, tf: str, start_ms: int) -> dict:
+    state = load_checkpoint().get(_key(symbol, tf))
+
+    if state and state.get("start") <= start_ms and state.get("done"):
+        return state
+
+    if state and not state.get("done"):
+        cursor = state["cursor"]
+    else:
+        # mulai dari bar tertua di store (kalau ada), selain itu dari sekarang
+        first, _, _ = candle_bounds(symbol, tf)
+        cursor = int(first) if first is not None else int(time.time() * 1000)
+
+    state = {"start": start_ms, "cursor": cursor, "rows": (state or {}).get("rows", 0), "done": False}
+
+    while cursor > start_ms:
+        df = fetch_history_page(okx, symbol, tf, cursor)
+
+        if df.empty:
+            break       # awal listing
+
+        upsert_candles(symbol, tf, df)
+
+        oldest = int(df["t"].iloc[0])
+        if oldest >= cursor:
+            break
+
+        cursor = oldest
+        state.update(cursor=cursor, rows=state["rows"] + len(df))
+        _save_checkpoint(symbol, tf, state)
+
+    state["done"] = True
+    _save_checkpoint(symbol, tf, state)
+    return state
+
+
+# =====================================================
+# BATCH
+# =====================================================
+def backfill(symbols=None, timeframes=None, days=730, workers=4, log=print) -> dict:
+    """
+    Backfill semua (symbol, tf) sampai `days` hari ke belakang.
+    Return {key: state}. Aman dihentikan & dijalankan ulang.
+    """
+    symbols = symbols or FUTURES_BIG_COINS
+    timeframes = timeframes or [BASE_TF, ENTRY_TF, DAILY_TF]
+
+    okx = get_okx()
+    start_ms = int(time.time() * 1000) - days * timeframe_ms("1d")
+    jobs = [(s, tf) for s in symbols for tf in timeframes]
+    result = {}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(backfill_one, okx, s, tf, start_ms): (s, tf)
+            for s, tf in jobs
+        }
+
+        for fut in as_completed(futures):
+            symbol, tf = futures[fut]
+            try:
+                state = fut.result()
+                log(f"[BACKFILL] {symbol} {tf}: {state['rows']} rows")
+            except Exception as e:
+                state = {"error": str(e)}
+                log(f"[BACKFILL ERROR] {symbol} {tf}: {e}")
+            result[_key(symbol, tf)] = state
+
+    return result
+
+
+# =====================================================
+# CLI
+# =====================================================
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="OPSI A PRO candle backfill")
+    ap.add_argument("--symbols", nargs="*", default=None)
+    ap.add_argument("--tf", nargs="*", default=None)
+    ap.add_argument("--days", type=int, default=730)
+    ap.add_argument("--workers", type=int, default=4)
+    args = ap.parse_args()
+
+    backfill(args.symbols, args.tf, args.days, args.workers)
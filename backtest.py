@@ -0,0 +1,369 @@
+# =====================================================
+# OPSI A PRO — BACKTEST ENGINE
+# CHECK_SIGNAL LOGIC (HTF) OVER STORED CANDLES
+# =====================================================
+#
+# Simulasi check_signal di setiap close bar 4h:
+# supertrend → score → regime / shift → mode filter → ADL → SL S/R.
+# Perbedaan dengan live:
+# - evaluasi hanya di close 4h (live: setiap cycle 5 menit)
+# - FUTURES: LTF entry / LTF SL dari FUTURES_EXEC_TF yang tersimpan
+#   (kalau tidak ada → SL HTF + batas FUTURES_MAX_RISK)
+# - pivot daily dipakai setelah bar daily konfirmasinya close
+# - 1 posisi per symbol (sama seperti cooldown OPEN di history)
+
+import numpy as np
+import pandas as pd
+
+from config import (
+    ENTRY_TF,
+    DAILY_TF,
+    BASE_TF,
+    FUTURES_EXEC_TF,
+    ATR_PERIOD,
+    SUPERTREND_MULT,
+    SR_LOOKBACK,
+    ZONE_BUFFER,
+    LEVEL_ZONE_PCT,
+    TP1_R,
+    TP2_R,
+    SPOT_MIN_SCORE,
+    FUTURES_MIN_SCORE,
+    FUTURES_MAX_RISK
+)
+from candle_store import load_candles
+from resample import resample_ohlcv, timeframe_ms
+from indicators import supertrend
+from scoring import score_components_series
+from utils import WIB_OFFSET_HOURS, is_danger_hour
+from regime import classify_regime
+from levels import LevelIndex, pivot_events
+
+TF_MS = timeframe_ms(ENTRY_TF)
+DAY_MS = timeframe_ms(DAILY_TF)
+
+LONG_REGIMES = ["REGIME_ACCUMULATION", "REGIME_MARKUP"]
+SHORT_REGIMES = ["REGIME_DISTRIBUTION", "REGIME_MARKDOWN"]
+
+
+def default_params(mode: str) -> dict:
+    return {
+        "ATR_PERIOD": ATR_PERIOD,
+        "SUPERTREND_MULT": SUPERTREND_MULT,
+        "SR_LOOKBACK": SR_LOOKBACK,
+        "ZONE_BUFFER": ZONE_BUFFER,
+        "LEVEL_ZONE_PCT": LEVEL_ZONE_PCT,
+        "TP1_R": TP1_R,
+        "TP2_R": TP2_R,
+        "MIN_SCORE": FUTURES_MIN_SCORE if mode == "FUTURES" else SPOT_MIN_SCORE
+    }
+
+
+def load_history(symbol: str):
+    """4h + 1d dari candle store (fallback: resample base feed)."""
+    df4h = load_candles(symbol, ENTRY_TF)
+    df1d = load_candles(symbol, DAILY_TF)
+
+    if df4h.empty or df1d.empty:
+        base = load_candles(symbol, BASE_TF)
+        df4h = resample_ohlcv(base, ENTRY_TF)
+        df1d = resample_ohlcv(base, DAILY_TF)
+
+    return df4h, df1d
+
+
+def load_ltf(symbol: str):
+    return load_candles(symbol, FUTURES_EXEC_TF)
+
+
+# =====================================================
+# TRADE RESOLUTION (FIRST TOUCH)
+# =====================================================
+def _first(mask) -> int:
+    return int(np.argmax(mask)) if mask.any() else -1
+
+
+def resolve_trade(t, high, low, start, direction, entry, sl, tp1, tp2):
+    """
+    Cari bar pertama (index >= start) yang menyentuh SL / TP1 / TP2.
+    SL & TP di bar yang sama → SL dulu (konservatif, sama dengan
+    urutan cek di auto_close_signals).
+
+    Return dict Status, TP1Time, ExitTime, ExitIndex, ExitPrice,
+    R, MFE_R, MAE_R (R = kelipatan jarak entry–SL).
+    """
+    h, l = high[start:], low[start:]
+    risk = abs(entry - sl)
+    long_ = direction == "LONG"
+
+    if long_:
+        i_sl, i_tp1, i_tp2 = _first(l <= sl), _first(h >= tp1), _first(h >= tp2)
+    else:
+        i_sl, i_tp1, i_tp2 = _first(h >= sl), _first(l <= tp1), _first(l <= tp2)
+
+    res = {
+        "Status": "OPEN",
+        "TP1Time": None,
+        "ExitTime": None,
+        "ExitIndex": None,
+        "ExitPrice": None,
+        "R": np.nan
+    }
+
+    if i_sl >= 0 and (i_tp2 < 0 or i_sl <= i_tp2):
+        exit_i, res["Status"], res["ExitPrice"] = i_sl, "SL HIT", sl
+    elif i_tp2 >= 0:
+        exit_i, res["Status"], res["ExitPrice"] = i_tp2, "TP2 HIT", tp2
+    else:
+        exit_i = len(h) - 1
+        if i_tp1 >= 0:
+            res["Status"] = "TP1 HIT"
+
+    if i_tp1 >= 0 and i_tp1 <= exit_i and not (
+        res["Status"] == "SL HIT" and i_tp1 == i_sl
+    ):
+        res["TP1Time"] = int(t[start + i_tp1])
+
+    if res["ExitPrice"] is not None:
+        sign = 1 if long_ else -1
+        res["R"] = sign * (res["ExitPrice"] - entry) / risk
+        res["ExitIndex"] = start + exit_i
+        res["ExitTime"] = int(t[start + exit_i])
+
+    # excursion s/d exit, dibatasi level exit
+    if exit_i >= 0 and len(h):
+        hi, lo = h[:exit_i + 1].max(), l[:exit_i + 1].min()
+        fav, adv = (hi - entry, lo - entry) if long_ else (entry - lo, entry - hi)
+        res["MFE_R"] = min(fav / risk, abs(tp2 - entry) / risk)
+        res["MAE_R"] = max(adv / risk, -1.0)
+    else:
+        res["MFE_R"] = res["MAE_R"] = np.nan
+
+    return res
+
+
+# =====================================================
+# FEATURES (CACHE PER PARAMETER)
+# =====================================================
+class SymbolFeatures:
+    """
+    Semua fitur yang tidak tergantung parameter dihitung 1x.
+    Supertrend di-cache per (ATR_PERIOD, SUPERTREND_MULT),
+    pivot event S/R per SR_LOOKBACK (zone index dibangun per simulate).
+    """
+
+    def __init__(self, symbol, df4h, df1d, df_ltf=None):
+        self.symbol = symbol
+        self.df4h = df4h
+        self.df1d = df1d
+
+        self.t = df4h.t.to_numpy(dtype=np.int64)
+        self.high = df4h.high.to_numpy(dtype=float)
+        self.low = df4h.low.to_numpy(dtype=float)
+        self.close = df4h.close.to_numpy(dtype=float)
+
+        # rule score = scoring.py (sama dengan live)
+        c = score_components_series(df4h, df1d)
+        price = self.close
+        self.ema200 = c["EMA200"].to_numpy()
+        self.struct_up = c["StructUp"].to_numpy()
+        self.struct_down = c["StructDown"].to_numpy()
+        self.volume = c["Volume"].to_numpy()
+        self.adl_up = c["ADLUp"].to_numpy()
+        self.adl_down = c["ADLDown"].to_numpy()
+        self.d20 = c["ADLDelta20"].to_numpy()
+        d30 = (c["ADL"] - c["ADL"].shift(29)).to_numpy()
+
+        # check_signal → REGIME_SHIFT (bukan trade)
+        self.shift = (
+            ((d30 < 0) & (price < self.ema200))
+            | ((d30 > 0) & (price > self.ema200))
+        )
+
+        self.warmup = (np.arange(len(df4h)) < 49) | np.isnan(self.ema200)
+
+        # FUTURES kill switch (utils.is_danger_hour) di close bar
+        close_hour_wib = ((self.t + TF_MS) // 3_600_000 + WIB_OFFSET_HOURS) % 24
+        self.danger = is_danger_hour(close_hour_wib)
+
+        self._ltf(df_ltf)
+
+        self._trend = {}
+        self._levels = {}
+
+    def _ltf(self, df_ltf):
+        """
+        futures_ltf_entry / futures_ltf_sl di bar LTF terakhir
+        yang sudah close saat bar 4h close.
+        """
+        self.has_ltf = df_ltf is not None and len(df_ltf) >= 30
+        if not self.has_ltf:
+            return
+
+        ltf_ms = timeframe_ms(FUTURES_EXEC_TF)
+        close = df_ltf.close
+        ema20 = close.ewm(span=20).mean()
+
+        j = np.searchsorted(
+            df_ltf.t.to_numpy(), self.t + TF_MS - ltf_ms, side="right"
+        ) - 1
+        valid = j >= 29
+        j = np.maximum(j, 0)
+
+        c = close.to_numpy()[j]
+        up = (close > ema20) & (close > close.shift(2))
+        down = (close < ema20) & (close < close.shift(2))
+
+        self.ltf_entry = np.where(valid, c, np.nan)
+        self.ltf_long = valid & up.to_numpy()[j]
+        self.ltf_short = valid & down.to_numpy()[j]
+        self.ltf_sl_long = df_ltf.low.rolling(5).min().to_numpy()[j]
+        self.ltf_sl_short = df_ltf.high.rolling(5).max().to_numpy()[j]
+
+    def long_mask(self, period, mult):
+        key = (period, float(mult))
+        if key not in self._trend:
+            _, trend = supertrend(self.df4h, period=period, mult=mult)
+            self._trend[key] = trend.to_numpy() == 1
+        return self._trend[key]
+
+    def levels(self, lb):
+        """
+        Pivot daily + waktu (ms) pivot boleh dipakai
+        (= close bar daily ke i+lb), lihat levels.pivot_events.
+        """
+        if lb not in self._levels:
+            self._levels[lb] = pivot_events(self.df1d, lb)
+        return self._levels[lb]
+
+    # =========================
+    # SIGNAL MASK
+    # =========================
+    def signal_bars(self, params, mode):
+        long_ = self.long_mask(params["ATR_PERIOD"], params["SUPERTREND_MULT"])
+
+        structure = np.where(long_, self.struct_up, self.struct_down)
+        adl_score = np.where(long_, self.adl_up, self.adl_down)
+        score = structure + self.volume + adl_score
+
+        ok = ~self.warmup & ~self.shift & (score >= params["MIN_SCORE"])
+        ok &= np.where(long_, self.d20 > 0, self.d20 < 0)
+
+        if mode == "SPOT":
+            ok &= long_
+        else:
+            regime = classify_regime(
+                self.close, self.ema200, self.d20, 0.0, structure, self.volume
+            )
+            ok &= np.where(
+                long_,
+                np.isin(regime, LONG_REGIMES),
+                np.isin(regime, SHORT_REGIMES)
+            )
+            ok &= ~self.danger
+
+        return np.flatnonzero(ok), long_, score
+
+    # =========================
+    # TRADES
+    # =========================
+    def simulate(self, params, mode, start_t=None, end_t=None):
+        """
+        Trade untuk entry di [start_t, end_t) (ms open time bar 4h).
+        Exit boleh melewati end_t (trade tetap jalan).
+        """
+        bars, long_, score = self.signal_bars(params, mode)
+
+        if start_t is not None:
+            bars = bars[self.t[bars] >= start_t]
+        if end_t is not None:
+            bars = bars[self.t[bars] < end_t]
+
+        events = self.levels(params["SR_LOOKBACK"])
+        index = LevelIndex(params["SR_LOOKBACK"], params["LEVEL_ZONE_PCT"])
+        zb = params["ZONE_BUFFER"]
+
+        trades = []
+        busy_until = -1
+
+        for i in bars:
+            if i <= busy_until:
+                continue
+
+            entry = self.close[i]
+            now = self.t[i] + TF_MS
+            direction = "LONG" if long_[i] else "SHORT"
+
+            # index maju sampai pivot yang sudah terkonfirmasi di `now`
+            index.feed(events, now)
+
+            if direction == "LONG":
+                lv = index.nearest_support(entry)
+                if lv is None:
+                    continue
+                sl = lv * (1 - zb)
+            else:
+                lv = index.nearest_resistance(entry)
+                if lv is None:
+                    continue
+                sl = lv * (1 + zb)
+
+            if mode == "FUTURES" and self.has_ltf:
+                ok = self.ltf_long[i] if direction == "LONG" else self.ltf_short[i]
+                if not ok or abs(self.ltf_entry[i] - entry) / entry > 0.01:
+                    continue
+                entry = self.ltf_entry[i]
+                sl = (
+                    self.ltf_sl_long[i] if direction == "LONG"
+                    else self.ltf_sl_short[i]
+                )
+
+            risk = abs(entry - sl)
+            if not risk > 0:
+                continue
+            if mode == "FUTURES" and risk / entry > FUTURES_MAX_RISK:
+                continue
+
+            sign = 1 if direction == "LONG" else -1
+            tp1 = entry + sign * risk * params["TP1_R"]
+            tp2 = entry + sign * risk * params["TP2_R"]
+
+            res = resolve_trade(
+                self.t, self.high, self.low, i + 1,
+                direction, entry, sl, tp1, tp2
+            )
+
+            trades.append({
+                "Symbol": self.symbol,
+                "Mode": mode,
+                "Direction": direction,
+                "Phase": (
+                    "AKUMULASI_INSTITUSI" if direction == "LONG"
+                    else "DISTRIBUSI_INSTITUSI"
+                ),
+                "Score": int(score[i]),
+                "EntryTime": int(now),
+                "Entry": entry,
+                "SL": sl,
+                "TP1": tp1,
+                "TP2": tp2,
+                **{k: v for k, v in res.items() if k != "ExitIndex"}
+            })
+
+            if res["ExitIndex"] is None:
+                break
+            busy_until = res["ExitIndex"]
+
+        return trades
+
+
+def backtest_symbol(symbol, mode="SPOT", params=None, start_t=None, end_t=None):
+    df4h, df1d = load_history(symbol)
+    if len(df4h) < 50 or len(df1d) < 50:
+        return pd.DataFrame()
+
+    df_ltf = load_ltf(symbol) if mode == "FUTURES" else None
+    feats = SymbolFeatures(symbol, df4h, df1d, df_ltf)
+    return pd.DataFrame(
+        feats.simulate(params or default_params(mode), mode, start_t, end_t)
+    )
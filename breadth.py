@@ -0,0 +1,202 @@
+# =====================================================
+# OPSI A PRO — MARKET BREADTH
+# 1x PER SCAN CYCLE | PANEL (VECTORIZED) | SHARED GATE
+# =====================================================
+#
+# Dihitung scanner_bot 1x per cycle untuk seluruh universe:
+#   - % symbol dengan close 1d > EMA200 1d
+#   - % symbol per regime (sama dengan detect_market_regime)
+#   - % symbol dengan ADL 4h naik (20 bar)
+#   - trend BTC (supertrend 4h) + posisi terhadap EMA200 1d
+# Candle universe dibaca dari candle store (tanpa REST); hanya
+# BREADTH_REF_SYMBOL yang di-sync. check_signal membaca hasilnya
+# lewat current_breadth() → tidak fetch BTC per symbol.
+# Hasil juga ditulis ke BREADTH_FILE: proses app (scan worker) tidak
+# menjalankan cycle scanner, jadi membaca breadth dari file itu.
+# % EMA200 hanya dari symbol dengan >= BREADTH_EMA200_MIN_BARS bar 1d
+# (EMA200 dari history pendek belum stabil → listing baru bias).
+
+import os
+import json
+import threading
+
+import numpy as np
+
+import clock
+from config import (
+    ENTRY_TF,
+    DAILY_TF,
+    LIMIT_4H,
+    LIMIT_1D,
+    ATR_PERIOD,
+    SUPERTREND_MULT,
+    BREADTH_REF_SYMBOL,
+    BREADTH_MAX_AGE_SEC,
+    BREADTH_FILE,
+    BREADTH_EMA200_MIN_BARS,
+    BREADTH_MIN_PCT,
+    BREADTH_BTC_FILTER
+)
+from candle_store import get_candles, load_candles
+from indicators import supertrend
+from scoring import score_frames
+from regime import market_regime_panel
+from logger import get_logger
+
+log = get_logger("breadth")
+
+REGIMES = [
+    "REGIME_ACCUMULATION",
+    "REGIME_MARKUP",
+    "REGIME_DISTRIBUTION",
+    "REGIME_MARKDOWN",
+    "REGIME_CHOP"
+]
+
+_lock = threading.Lock()
+_current = None
+_loaded = (None, None)      # (mtime BREADTH_FILE, breadth)
+
+
+# =====================================================
+# COMPUTE
+# =====================================================
+def _direction(df4h) -> str:
+    _, trend = supertrend(df4h, period=ATR_PERIOD, mult=SUPERTREND_MULT)
+    return "LONG" if trend.iloc[-1] == 1 else "SHORT"
+
+
+def compute_breadth(symbols) -> dict:
+    names, frames4h, frames1d, directions = [], [], [], []
+
+    for symbol in dict.fromkeys(symbols):
+        try:
+            if symbol == BREADTH_REF_SYMBOL:
+                df4h = get_candles(symbol, ENTRY_TF, LIMIT_4H)
+                df1d = get_candles(symbol, DAILY_TF, LIMIT_1D)
+            else:
+                df4h = load_candles(symbol, ENTRY_TF, LIMIT_4H)
+                df1d = load_candles(symbol, DAILY_TF, LIMIT_1D)
+
+            if len(df4h) < 50 or len(df1d) < 50:
+                continue
+
+            direction = _direction(df4h)
+        except Exception as e:
+            log.error("breadth_error", symbol=symbol, error=str(e))
+            continue
+
+        names.append(symbol)
+        frames4h.append(df4h)
+        frames1d.append(df1d)
+        directions.append(direction)
+
+    out = {"Time": clock.time(), "Symbols": len(names)}
+    if not names:
+        return out
+
+    scores = score_frames(frames4h, frames1d, directions, names)
+    regimes = market_regime_panel(scores)
+    above = scores["DailyClose"].to_numpy() > scores["EMA200"].to_numpy()
+    mature = np.array([len(df) >= BREADTH_EMA200_MIN_BARS for df in frames1d])
+
+    out.update({
+        "AboveEMA200Pct": round(float(above[mature].mean() * 100), 1) if mature.any() else None,
+        "EMA200Symbols": int(mature.sum()),
+        "RisingADLPct": round(float((scores["ADLDelta20"].to_numpy() > 0).mean() * 100), 1),
+        "RegimePct": {r: round(float(np.mean(regimes == r) * 100), 1) for r in REGIMES},
+        "LongPct": round(float(np.mean(np.asarray(directions) == "LONG") * 100), 1)
+    })
+
+    if BREADTH_REF_SYMBOL in names:
+        i = names.index(BREADTH_REF_SYMBOL)
+        out["BTCTrend"] = directions[i]
+        out["BTCAboveEMA200"] = bool(above[i]) if mature[i] else None
+
+    return out
+
+
+# =====================================================
+# SHARED STATE
+# =====================================================
+def _save(breadth: dict):
+    tmp = BREADTH_FILE + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(breadth, f)
+    os.replace(tmp, BREADTH_FILE)
+
+
+def _load():
+    """Breadth dari BREADTH_FILE (dibaca ulang hanya kalau file berubah)."""
+    global _loaded
+    try:
+        mtime = os.path.getmtime(BREADTH_FILE)
+    except OSError:
+        return None
+
+    with _lock:
+        if mtime == _loaded[0]:
+            return _loaded[1]
+
+    try:
+        with open(BREADTH_FILE) as f:
+            b = json.load(f)
+    except Exception as e:
+        log.error("breadth_load_error", error=str(e))
+        return None
+
+    with _lock:
+        _loaded = (mtime, b)
+    return b
+
+
+def update_breadth(symbols) -> dict:
+    global _current
+    breadth = compute_breadth(symbols)
+
+    with _lock:
+        _current = breadth
+
+    try:
+        _save(breadth)
+    except Exception as e:
+        log.error("breadth_save_error", error=str(e))
+    return breadth
+
+
+def current_breadth():
+    """
+    Breadth cycle terakhir (None kalau belum ada / terlalu lama).
+    Proses tanpa cycle scanner (app) → dari BREADTH_FILE.
+    """
+    with _lock:
+        b = _current
+
+    if b is None:
+        b = _load()
+    if b is None or b.get("AboveEMA200Pct") is None:
+        return None
+    if clock.time() - b["Time"] > BREADTH_MAX_AGE_SEC:
+        return None
+    return b
+
+
+# =====================================================
+# GATE (check_signal)
+# =====================================================
+def breadth_allows(mode: str, direction: str, breadth=None) -> bool:
+    """True kalau breadth mendukung arah signal (tanpa breadth → True)."""
+    b = breadth if breadth is not None else current_breadth()
+    if b is None:
+        return True
+
+    pct = b["AboveEMA200Pct"]
+    if direction == "LONG" and pct < BREADTH_MIN_PCT:
+        return False
+    if direction == "SHORT" and pct > 100 - BREADTH_MIN_PCT:
+        return False
+
+    if BREADTH_BTC_FILTER and mode == "FUTURES" and b.get("BTCTrend") not in (None, direction):
+        return False
+
+    return True
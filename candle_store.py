@@ -0,0 +1,237 @@
+# =====================================================
+# OPSI A PRO — CANDLE STORE
+# SQLITE OHLCV | 1 BASE FEED / SYMBOL | LOCAL 4H + 1D
+# =====================================================
+#
+# Alur get_candles(symbol, "4h"):
+# 1. sync base feed (BASE_TF) → hanya bar baru sejak bar terakhir
+# 2. 4h / 1d di-seed 1x per proses dari exchange, lalu bucket terbaru
+#    dibangun ulang dari base feed (resample) setiap sync
+# → per symbol per cycle cukup 1 REST call (base), bukan 3.
+
+import sqlite3
+import threading
+from contextlib import closing
+
+import pandas as pd
+
+import clock
+from config import (
+    CANDLE_DB_FILE,
+    BASE_TF,
+    BASE_FETCH_LIMIT,
+    BASE_SYNC_MIN_SEC
+)
+from exchange import fetch_ohlcv, fetch_ohlcv_since
+from logger import get_logger
+from resample import timeframe_ms, is_derivable, bucket_start, resample_ohlcv, OFFSET_MS
+
+COLS = ["t", "open", "high", "low", "close", "volume"]
+
+log = get_logger("candle_store")
+
+_lock = threading.Lock()
+_last_sync = {}       # symbol → epoch detik sync base terakhir
+_seeded = set()       # (symbol, tf) yang sudah di-seed di proses ini
+
+
+# =====================================================
+# LOW LEVEL
+# =====================================================
+def _connect():
+    conn = sqlite3.connect(CANDLE_DB_FILE, timeout=30)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS candles ("
+        "symbol TEXT, tf TEXT, t INTEGER, "
+        "open REAL, high REAL, low REAL, close REAL, volume REAL, "
+        "PRIMARY KEY (symbol, tf, t)) WITHOUT ROWID"
+    )
+    return conn
+
+
+def upsert_candles(symbol: str, tf: str, df) -> int:
+    if df is None or df.empty:
+        return 0
+
+    rows = [
+        (symbol, tf, int(r[0]), *map(float, r[1:]))
+        for r in df[COLS].itertuples(index=False, name=None)
+    ]
+
+    with closing(_connect()) as conn, conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO candles VALUES (?,?,?,?,?,?,?,?)",
+            rows
+        )
+
+    return len(rows)
+
+
+def load_candles(symbol: str, tf: str, limit=None, start=None, end=None):
+    """
+    OHLCV tersimpan, urut naik. start/end = ms (inklusif / eksklusif).
+    limit = N bar terakhir dalam range.
+    """
+    sql = "SELECT t, open, high, low, close, volume FROM candles WHERE symbol = ? AND tf = ?"
+    params = [symbol, tf]
+
+    if start is not None:
+        sql += " AND t >= ?"
+        params.append(int(start))
+    if end is not None:
+        sql += " AND t < ?"
+        params.append(int(end))
+
+    sql += " ORDER BY t DESC"
+    if limit:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+
+    with closing(_connect()) as conn:
+        df = pd.read_sql_query(sql, conn, params=params)
+
+    df = df.iloc[::-1].reset_index(drop=True)
+    df.attrs.update(symbol=symbol, tf=tf)      # → key indicator_cache
+    return df
+
+
+def purge_misaligned(symbol: str, tf: str) -> int:
+    """Hapus bar tf yang open time-nya tidak sejajar bucket_start (alignment lama)."""
+    with closing(_connect()) as conn, conn:
+        return conn.execute(
+            "DELETE FROM candles WHERE symbol = ? AND tf = ? AND (t + ?) % ? != 0",
+            (symbol, tf, OFFSET_MS, timeframe_ms(tf))
+        ).rowcount
+
+
+def candle_bounds(symbol: str, tf: str):
+    """(first_t, last_t, count) atau (None, None, 0)."""
+    with closing(_connect()) as conn:
+        return conn.execute(
+            "SELECT MIN(t), MAX(t), COUNT(*) FROM candles "
+            "WHERE symbol = ? AND tf = ?",
+            (symbol, tf)
+        ).fetchone()
+
+
+# =====================================================
+# BASE FEED SYNC
+# =====================================================
+def sync_base(symbol: str, force=False):
+    now = clock.time()
+
+    with _lock:
+        if not force and now - _last_sync.get(symbol, 0) < BASE_SYNC_MIN_SEC:
+            return
+        _last_sync[symbol] = now
+
+    _, last, _ = candle_bounds(symbol, BASE_TF)
+    base_ms = timeframe_ms(BASE_TF)
+
+    gap = last is None or (now * 1000 - last) / base_ms >= BASE_FETCH_LIMIT - 1
+
+    if gap:
+        # store kosong / terputus → ambil page terbaru, HTF wajib seed ulang
+        df = fetch_ohlcv_since(symbol, BASE_TF, None, BASE_FETCH_LIMIT)
+        with _lock:
+            for key in [k for k in _seeded if k[0] == symbol]:
+                _seeded.discard(key)
+    else:
+        # mulai dari bar terakhir (bar berjalan ikut ter-update)
+        df = fetch_ohlcv_since(symbol, BASE_TF, int(last), BASE_FETCH_LIMIT)
+
+    upsert_candles(symbol, BASE_TF, df)
+
+
+# =====================================================
+# DERIVED TIMEFRAME
+# =====================================================
+def _roll_forward(symbol: str, tf: str, limit: int):
+    # seed 1x per proses (dan setelah base feed terputus)
+    seeding = (symbol, tf) not in _seeded
+
+    if seeding:
+        # bar dari alignment lain (store / backfill lama) → 2 bar per hari
+        purge_misaligned(symbol, tf)
+
+    _, last, _ = candle_bounds(symbol, tf)
+
+    if seeding:
+        seed = fetch_ohlcv(symbol, tf, limit)
+        aligned = (seed["t"].astype("int64") + OFFSET_MS) % timeframe_ms(tf) == 0
+        if not aligned.all():
+            log.warning("seed_misaligned", symbol=symbol, tf=tf, dropped=int((~aligned).sum()))
+            seed = seed[aligned]
+
+        upsert_candles(symbol, tf, seed)
+        if not seed.empty:
+            last = int(seed["t"].iloc[-1])
+        with _lock:
+            _seeded.add((symbol, tf))
+
+    if last is None:
+        return
+
+    base_first, _, _ = candle_bounds(symbol, BASE_TF)
+    if base_first is None:
+        return
+
+    # bucket terakhir hanya dibangun ulang kalau base menutup seluruh bucket
+    start = int(last) if base_first <= last else int(
+        bucket_start(base_first, tf) + timeframe_ms(tf)
+    )
+
+    base = load_candles(symbol, BASE_TF, start=start)
+    upsert_candles(symbol, tf, resample_ohlcv(base, tf))
+
+
+def get_candles(symbol: str, tf: str, limit: int):
+    """
+    Pengganti fetch_ohlcv untuk timeframe yang bisa diturunkan dari BASE_TF.
+    Timeframe lain tetap lewat REST (cached).
+    """
+    if not is_derivable(tf, BASE_TF):
+        return fetch_ohlcv(symbol, tf, limit)
+
+    sync_base(symbol)
+
+    if tf != BASE_TF:
+        _roll_forward(symbol, tf, limit)
+
+    return load_candles(symbol, tf, limit)
+
+
+# =====================================================
+# RANGE (ANY TIMEFRAME, CACHED)
+# =====================================================
+def load_range(symbol: str, tf: str, start: int, end: int, now_ms=None):
+    """
+    Semua bar tf dengan open time di [start, end), start sejajar tf.
+    Range yang sudah lengkap & close di store tidak di-fetch ulang;
+    selain itu fetch mulai dari bar terakhir yang kontinu sejak start.
+    """
+    step = timeframe_ms(tf)
+    now_ms = now_ms or clock.time_ms()
+
+    have = load_candles(symbol, tf, start=start, end=end)
+    cursor = int(start)
+
+    if len(have):
+        last = int(have["t"].iloc[-1])
+        if len(have) == (last - start) // step + 1:     # tanpa gap
+            if last + step >= end and last + step <= now_ms:
+                return have
+            cursor = last
+
+    while cursor < end:
+        df = fetch_ohlcv_since(symbol, tf, cursor, BASE_FETCH_LIMIT)
+        if df.empty:
+            break
+
+        upsert_candles(symbol, tf, df)
+        nxt = int(df["t"].iloc[-1]) + step
+        if nxt <= cursor:
+            break
+        cursor = nxt
+
+    return load_candles(symbol, tf, start=start, end=end)
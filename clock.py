@@ -0,0 +1,92 @@
+# =====================================================
+# OPSI A PRO — CLOCK
+# SYSTEM (WALL CLOCK) | REPLAY (VIRTUAL, ACCELERATED)
+# =====================================================
+#
+# Semua modul jalur scanner membaca waktu lewat modul ini:
+#   clock.time() / clock.now(tz) / clock.monotonic() / clock.sleep()
+# Default = SystemClock (perilaku sama dengan time / datetime).
+# replay.py memasang ReplayClock → 1 hari bisa dijalankan ulang
+# dalam hitungan menit.
+
+import time as _time
+import threading
+from datetime import datetime, timezone
+
+
+class SystemClock:
+    def time(self) -> float:
+        return _time.time()
+
+    def monotonic(self) -> float:
+        return _time.monotonic()
+
+    def sleep(self, sec: float):
+        _time.sleep(max(sec, 0))
+
+
+class ReplayClock:
+    """
+    Waktu virtual mulai dari `start` (epoch detik).
+    Waktu proses nyata dikali `speed`; sleep() langsung lompat (tanpa tidur).
+    speed=0 → waktu hanya maju lewat sleep() (deterministik).
+    """
+
+    def __init__(self, start: float, speed: float = 100.0):
+        self.start = float(start)
+        self.speed = float(speed)
+        self._offset = 0.0
+        self._real0 = _time.monotonic()
+        self._lock = threading.Lock()
+
+    def monotonic(self) -> float:
+        with self._lock:
+            return (_time.monotonic() - self._real0) * self.speed + self._offset
+
+    def time(self) -> float:
+        return self.start + self.monotonic()
+
+    def sleep(self, sec: float):
+        with self._lock:
+            self._offset += max(sec, 0)
+
+
+_clock = SystemClock()
+
+
+def set_clock(clk):
+    """Pasang clock (None → kembali ke SystemClock)."""
+    global _clock
+    _clock = clk or SystemClock()
+
+
+def get_clock():
+    return _clock
+
+
+# =====================================================
+# SHORTCUT
+# =====================================================
+def time() -> float:
+    return _clock.time()
+
+
+def time_ms() -> int:
+    return int(_clock.time() * 1000)
+
+
+def monotonic() -> float:
+    return _clock.monotonic()
+
+
+def sleep(sec: float):
+    _clock.sleep(sec)
+
+
+def now(tz=timezone.utc) -> datetime:
+    return datetime.fromtimestamp(_clock.time(), tz)
+
+
+def utcnow() -> datetime:
+    """Naive UTC (pengganti datetime.utcnow())."""
+    return now(timezone.utc).replace(tzinfo=None)
@@ -18,6 +18,26 @@ LIMIT_1D  = 200
 LIMIT_LTF = 200
 
 
+# =====================================================
+# CANDLE STORE / RESAMPLING
+# =====================================================
+# 1 base feed per symbol → 4h & 1d dibangun lokal
+CANDLE_DB_FILE = "candles.db"
+BASE_TF = "15m"
+BASE_FETCH_LIMIT = 300          # max bar per request OKX /market/candles
+BASE_SYNC_MIN_SEC = 60          # base feed tidak di-refresh lebih sering
+
+# Alignment bar >= 1d (1 untuk seed ccxt, backfill dan resample lokal):
+#   0 = UTC  → ccxt okx minta "1Dutc" (open 00:00 UTC, default ccxt)
+#   8 = HK   → "1D" native OKX (open 16:00 UTC)
+# 1m–4H OKX sama di kedua mode (8 % 4 == 0).
+EXCHANGE_BAR_OFFSET_HOURS = 0
+
+# backfill.py: /market/history-candles (max 100 bar per request)
+BACKFILL_PAGE_LIMIT = 100
+BACKFILL_CHECKPOINT_FILE = "backfill_checkpoint.json"
+
+
 # =====================================================
 # INDICATOR CONFIG
 # =====================================================
@@ -28,11 +48,20 @@ VO_FAST = 14
 VO_SLOW = 28
 
 
+# =====================================================
+# SCORE THRESHOLD
+# =====================================================
+SPOT_MIN_SCORE = 70
+FUTURES_MIN_SCORE = 75
+
+
 # =====================================================
 # SUPPORT / RESISTANCE
 # =====================================================
 SR_LOOKBACK = 5
 ZONE_BUFFER = 0.01      # 1% buffer beyond structure
+LEVEL_ZONE_PCT = 0.005  # pivot dalam 0.5% → 1 zone (levels.py)
+LEVEL_WINDOW_BARS = LIMIT_1D    # pivot S/R hanya dari N bar daily terakhir (None = semua)
 
 
 # =====================================================
@@ -45,8 +74,36 @@ TP2_R = 2.0
 # =====================================================
 # SCANNER
 # =====================================================
-RATE_LIMIT_DELAY = 0.15
-MAX_SCAN_SYMBOLS = 120      # ONLY for SPOT
+MAX_SCAN_SYMBOLS = 120      # ONLY for SPOT (dashboard / score grid)
+
+# SPOT universe: ranking quote volume 24h + spread (1x fetch_tickers)
+UNIVERSE_FILE = "universe.json"
+UNIVERSE_REFRESH_SEC = 3600
+UNIVERSE_MAX_SPREAD_PCT = 0.5   # spread > 0.5% → tidak discan
+UNIVERSE_TIER1 = 50             # scan setiap cycle
+UNIVERSE_TIER2 = 200            # 200 berikutnya ...
+UNIVERSE_TIER2_EVERY = 3        # ... setiap 3 cycle
+
+# scanner_bot: budget waktu per cycle (fraksi SCAN_INTERVAL);
+# sisa antrian (prioritas rendah) dilanjutkan cycle berikutnya
+SCAN_BUDGET_PCT = 0.8
+
+# scanner_bot: interval evaluasi adaptif per symbol
+# jarak score ke threshold (dinormalisasi volatilitas) tiap ADAPTIVE_GAP_STEP
+# poin → interval x2, dibatasi [MIN, MAX] dan close candle ENTRY_TF berikutnya
+ADAPTIVE_MIN_SEC = 300
+ADAPTIVE_MAX_SEC = 4 * 3600
+ADAPTIVE_GAP_STEP = 8
+ADAPTIVE_REF_RANGE_PCT = 2.0    # range bar 4h "normal" (% close)
+
+# OKX public REST limit per IP: endpoint → (request, detik, burst)
+OKX_RATE_LIMITS = {
+    "candles": (40, 2.0, 4),            # /market/candles
+    "history_candles": (20, 2.0, 2),    # /market/history-candles
+    "ticker": (20, 2.0, 2),             # /market/ticker
+    "tickers": (20, 2.0, 2),            # /market/tickers
+    "instruments": (20, 2.0, 2)         # /public/instruments
+}
 
 
 # =====================================================
@@ -74,6 +131,13 @@ FUTURES_EXEC_TF = "15m"      # recommended: 15m (safe), 5m (aggressive)
 FUTURES_LTF_LIMIT = 200
 
 
+# =====================================================
+# TRADE OUTCOME (INTRABAR TP / SL)
+# =====================================================
+OUTCOME_TF = "5m"           # first-touch search
+OUTCOME_FINE_TF = "1m"      # bar entry + bar SL/TP ambigu
+
+
 # =====================================================
 # FUTURES — BIG COIN UNIVERSE (HARD FILTER)
 # PROP / INSTITUTIONAL GRADE
@@ -107,6 +171,67 @@ SIGNAL_LOG_FILE    = "signal_history.csv"
 TRADE_RESULT_FILE  = "trade_results.csv"
 FUTURES_TRADE_FILE = "futures_trades.csv"
 
+# indexed mirror of SIGNAL_LOG_FILE (dashboard query / pagination)
+SIGNAL_DB_FILE     = "signal_history.db"
+HISTORY_PAGE_SIZE  = 100
+HISTORY_CHUNK_ROWS = 50_000
+
+SWEEP_RESULT_FILE  = "sweep_results.csv"
+WALKFORWARD_TRADE_FILE = "walkforward_trades.csv"
+WALKFORWARD_FOLD_FILE  = "walkforward_folds.csv"
+
+# heatmap_delta: segment npz per hari + index latest-2 per symbol
+SCORE_SNAPSHOT_DIR = "score_snapshots"
+
+# rotation tracker: delta per N snapshot + top-K gainers / losers
+ROTATION_HORIZONS = (1, 6, 24)
+ROTATION_TOP_K = 10
+
+# universe score grid (heatmap tab), dihitung 1x per close 4h
+SCORE_GRID_FILE = "score_grid.json"
+SCORE_GRID_DELAY_SEC = 90       # > BASE_SYNC_MIN_SEC → bar 4h sudah final
+
+# cache indikator persisten (content-addressed, LRU, dipakai lintas proses)
+INDICATOR_CACHE_ENABLED = True
+INDICATOR_CACHE_FILE = "indicator_cache.db"
+INDICATOR_CACHE_MAX_MB = 256
+
+# =====================================================
+# MARKET BREADTH (1x PER SCAN CYCLE)
+# =====================================================
+BREADTH_REF_SYMBOL = "BTC/USDT"
+BREADTH_MAX_AGE_SEC = 900       # breadth lebih tua → dianggap tidak ada
+BREADTH_FILE = "breadth.json"   # hasil terakhir scanner → dibaca proses app
+BREADTH_EMA200_MIN_BARS = 200   # history 1d lebih pendek → tidak ikut % EMA200
+
+# gate opsional di check_signal
+BREADTH_GATE_ENABLED = False
+BREADTH_MIN_PCT = 40            # LONG: ≥ 40% universe di atas EMA200 1d
+                                # SHORT: ≤ 60%
+BREADTH_BTC_FILTER = True       # FUTURES searah trend BTC (supertrend 4h)
+
+# =====================================================
+# LOGGING (JSON LINES, BUFFERED)
+# =====================================================
+LOG_LEVEL = "INFO"              # DEBUG / INFO / WARNING / ERROR
+LOG_STDOUT = True
+LOG_FILE = "opsi_log.jsonl"     # "" → tanpa file
+LOG_FLUSH_SEC = 1.0
+LOG_QUEUE_MAX = 100_000         # penuh → event dibuang (hot path tidak blocking)
+
+# event ramai per symbol → hanya 1 dari N yang ditulis
+LOG_SAMPLE_EVERY = {
+    "cooldown_hit": 50,
+    "symbol_skip": 50
+}
+
+# =====================================================
+# LOCAL READ API (scanner_bot)
+# =====================================================
+API_ENABLED = True
+API_HOST = "127.0.0.1"
+API_PORT = 8765
+
 # =====================================================
 # SIGNAL COOLDOWN
 # =====================================================
@@ -6,6 +6,8 @@ import os
 import json
 from datetime import datetime, timedelta
 
+import clock
+
 from config import (
     COOLDOWN_FILE,
     SPOT_SIGNAL_COOLDOWN_MIN,
@@ -28,12 +30,13 @@ def _save(data):
         json.dump(data, f, indent=2)
 
 
-def is_on_cooldown(symbol: str, mode: str) -> bool:
+def cooldown_remaining(symbol: str, mode: str) -> float:
+    """Sisa cooldown (detik), 0 kalau tidak cooldown."""
     data = _load()
     key = f"{symbol}_{mode}"
 
     if key not in data:
-        return False
+        return 0.0
 
     last_time = datetime.fromisoformat(data[key])
     cooldown_min = (
@@ -42,11 +45,16 @@ def is_on_cooldown(symbol: str, mode: str) -> bool:
         else SPOT_SIGNAL_COOLDOWN_MIN
     )
 
-    return datetime.utcnow() < last_time + timedelta(minutes=cooldown_min)
+    left = last_time + timedelta(minutes=cooldown_min) - clock.utcnow()
+    return max(left.total_seconds(), 0.0)
+
+
+def is_on_cooldown(symbol: str, mode: str) -> bool:
+    return cooldown_remaining(symbol, mode) > 0
 
 
 def set_cooldown(symbol: str, mode: str):
     data = _load()
     key = f"{symbol}_{mode}"
-    data[key] = datetime.utcnow().isoformat()
+    data[key] = clock.utcnow().isoformat()
     _save(data)
@@ -3,16 +3,70 @@ import ccxt
 import pandas as pd
 import streamlit as st
 
+from config import EXCHANGE_BAR_OFFSET_HOURS
+from ratelimit import limiter
+
+# feed pengganti (replay.py): fetch_* dilayani dari data lokal, tanpa REST
+_feed = None
+
+
+def set_feed(feed):
+    """Pasang feed override (None → kembali ke OKX)."""
+    global _feed
+    _feed = feed
+
+
 @st.cache_resource
 def get_okx():
-    ex = ccxt.okx({"enableRateLimit": True})
+    # throttle via ratelimit.limiter (per endpoint), bukan global ccxt
+    # timezone OHLCV di-pin → seed 1d sejajar dengan bucket candle store
+    ex = ccxt.okx({
+        "enableRateLimit": False,
+        "options": {
+            "fetchOHLCV": {"timezone": "UTC" if EXCHANGE_BAR_OFFSET_HOURS == 0 else "HK"}
+        }
+    })
+    limiter.acquire("instruments", 4)   # spot + swap + futures + option
     ex.load_markets()
     return ex
 
-@st.cache_data(ttl=300)
 def fetch_ohlcv(symbol, tf, limit):
+    if _feed is not None:
+        return _feed.fetch_ohlcv(symbol, tf, limit)
+    return _fetch_ohlcv_cached(symbol, tf, limit)
+
+
+@st.cache_data(ttl=300)
+def _fetch_ohlcv_cached(symbol, tf, limit):
     okx = get_okx()   # ambil dari cache_resource
+    limiter.acquire("candles")
     return pd.DataFrame(
         okx.fetch_ohlcv(symbol, tf, limit=limit),
         columns=["t","open","high","low","close","volume"]
     )
+
+
+def fetch_ohlcv_since(symbol, tf, since=None, limit=300):
+    # tanpa cache → dipakai candle store (incremental sync)
+    if _feed is not None:
+        return _feed.fetch_ohlcv_since(symbol, tf, since, limit)
+    okx = get_okx()
+    limiter.acquire("candles")
+    return pd.DataFrame(
+        okx.fetch_ohlcv(symbol, tf, since=since, limit=limit),
+        columns=["t","open","high","low","close","volume"]
+    )
+
+
+def fetch_ticker(symbol):
+    if _feed is not None:
+        return _feed.fetch_ticker(symbol)
+    okx = get_okx()
+    limiter.acquire("ticker")
+    return okx.fetch_ticker(symbol)
+
+
+def fetch_tickers(symbols=None):
+    okx = get_okx()
+    limiter.acquire("tickers")
+    return okx.fetch_tickers(symbols)
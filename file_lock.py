@@ -0,0 +1,41 @@
+# =====================================================
+# OPSI A PRO — FILE LOCK
+# LOCK EKSKLUSIF ANTAR PROSES (APP STREAMLIT + SCANNER BOT)
+# =====================================================
+#
+#   with file_lock(os.path.join(SCORE_SNAPSHOT_DIR, ".lock")):
+#       ... baca / tulis file bersama ...
+#
+# flock pada file lock + threading.Lock per path (thread di proses
+# yang sama). Tidak reentrant: jangan di-nest untuk path yang sama.
+
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:     # Windows → hanya lock antar thread
+    fcntl = None
+
+_guard = threading.Lock()
+_thread_locks = {}
+
+
+@contextmanager
+def file_lock(path: str):
+    key = os.path.abspath(path)
+    with _guard:
+        tlock = _thread_locks.setdefault(key, threading.Lock())
+
+    with tlock:
+        if fcntl is None:
+            yield
+            return
+
+        with open(key, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
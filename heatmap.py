@@ -4,40 +4,72 @@
 import pandas as pd
 import plotly.express as px
 
-from exchange import fetch_ohlcv
+from candle_store import get_candles
 from indicators import supertrend
-from scoring import institutional_score
-from regime import detect_market_regime
-from config import ENTRY_TF, DAILY_TF, LIMIT_4H, LIMIT_1D
+from scoring import score_frames
+from regime import market_regime_panel
+from score_grid import load_grid
+from config import (
+    ENTRY_TF, DAILY_TF, LIMIT_4H, LIMIT_1D,
+    ATR_PERIOD, SUPERTREND_MULT
+)
 
 
-def generate_score_heatmap(okx, symbols):
-    rows = []
+def score_universe(symbols):
+    """
+    Fetch per symbol, lalu score + regime seluruh universe
+    dalam 1 panel call (live, termasuk bar berjalan).
+    """
+    names, frames4h, frames1d, directions = [], [], [], []
 
     for symbol in symbols:
         try:
-            df4h = fetch_ohlcv(symbol, ENTRY_TF, LIMIT_4H)
-            df1d = fetch_ohlcv(symbol, DAILY_TF, LIMIT_1D)
+            df4h = get_candles(symbol, ENTRY_TF, LIMIT_4H)
+            df1d = get_candles(symbol, DAILY_TF, LIMIT_1D)
 
             if len(df4h) < 50 or len(df1d) < 50:
                 continue
 
-            _, trend = supertrend(df4h, period=10, mult=3.0)
-            direction = "LONG" if trend.iloc[-1] == 1 else "SHORT"
+            _, trend = supertrend(df4h, period=ATR_PERIOD, mult=SUPERTREND_MULT)
 
-            score_data = institutional_score(df4h, df1d, direction)
-            score = score_data["TotalScore"]
+        except Exception:
+            continue
 
-            regime = detect_market_regime(df4h, df1d, score_data)
+        names.append(symbol)
+        frames4h.append(df4h)
+        frames1d.append(df1d)
+        directions.append("LONG" if trend.iloc[-1] == 1 else "SHORT")
 
-            rows.append({
-                "Symbol": symbol,
-                "Direction": direction,
-                "Score": score,
-                "Regime": regime
-            })
+    if not names:
+        return pd.DataFrame(columns=["Symbol", "Direction", "Score", "Regime"])
+
+    scores = score_frames(frames4h, frames1d, directions, names)
+
+    return pd.DataFrame({
+        "Symbol": names,
+        "Direction": directions,
+        "Score": scores["TotalScore"].to_numpy(),
+        "Regime": market_regime_panel(scores)
+    })
+
+
+def generate_score_heatmap(okx, symbols=None):
+    """Grid close 4h terakhir (score_grid) → tanpa exchange call."""
+    rows = load_grid()["rows"]
+    if symbols is not None:
+        rows = rows[rows["Symbol"].isin(symbols)]
+    return rows.reset_index(drop=True)
 
-        except Exception:
-            continue
 
-    return pd.DataFrame(rows)
+def plot_score_heatmap(grid: pd.DataFrame):
+    fig = px.treemap(
+        grid.assign(Size=1),
+        path=["Regime", "Symbol"],
+        values="Size",
+        color="Score",
+        color_continuous_scale="RdYlGn",
+        range_color=(0, 100),
+        hover_data=["Direction", "StructureScore", "VolumeScore", "ADLScore"]
+    )
+    fig.update_layout(margin=dict(t=10, l=0, r=0, b=0))
+    return fig
@@ -2,85 +2,100 @@
 # OPSI A PRO — HEATMAP DELTA SCORE (ROTASI INSTITUSI)
 # =====================================================
 import os
+import threading
 import pandas as pd
-from datetime import datetime
 
-from exchange import fetch_ohlcv
-from indicators import supertrend
-from scoring import institutional_score
-from regime import detect_market_regime
-from config import ENTRY_TF, DAILY_TF, LIMIT_4H, LIMIT_1D
+from score_grid import refresh_grid, load_grid
+from rotation import RotationTracker
+from snapshot_store import (
+    latest_pairs,
+    import_csv,
+    load_last,
+    load_snapshots
+)
 
-SNAPSHOT_FILE = "score_snapshot.csv"
+SNAPSHOT_FILE = "score_snapshot.csv"     # format lama (di-import 1x)
 
+_tracker = None
+_tracker_lock = threading.Lock()
 
-def take_score_snapshot(okx, symbols):
-    rows = []
-    ts = datetime.utcnow().isoformat()
-
-    for symbol in symbols:
-        try:
-            df4h = fetch_ohlcv(symbol, ENTRY_TF, LIMIT_4H)
-            df1d = fetch_ohlcv(symbol, DAILY_TF, LIMIT_1D)
-
-            if len(df4h) < 50 or len(df1d) < 50:
-                continue
-
-            _, trend = supertrend(df4h, period=10, mult=3.0)
-            direction = "LONG" if trend.iloc[-1] == 1 else "SHORT"
-
-            score_data = institutional_score(df4h, df1d, direction)
-            score = score_data["TotalScore"]
-
-            regime = detect_market_regime(df4h, df1d, score_data)
-
-            rows.append({
-                "Time": ts,
-                "Symbol": symbol,
-                "Direction": direction,
-                "Score": score,
-                "Regime": regime
-            })
-
-        except Exception:
-            continue
-
-    df_new = pd.DataFrame(rows)
 
+def _migrate_csv():
     if os.path.exists(SNAPSHOT_FILE):
-        df_old = pd.read_csv(SNAPSHOT_FILE)
-        df = pd.concat([df_old, df_new], ignore_index=True)
-    else:
-        df = df_new
+        import_csv(SNAPSHOT_FILE)
+        os.replace(SNAPSHOT_FILE, SNAPSHOT_FILE + ".migrated")
 
-    df.to_csv(SNAPSHOT_FILE, index=False)
-    return df_new
 
-def compute_score_delta():
-    if not os.path.exists(SNAPSHOT_FILE):
-        return None
-
-    df = pd.read_csv(SNAPSHOT_FILE)
+def take_score_snapshot(okx, symbols):
+    """
+    Snapshot = grid close 4h terakhir (score_grid menulis ke store
+    1x per close). Return grid dengan kolom Time.
+    """
+    _migrate_csv()
+    refresh_grid(symbols)
+
+    grid = load_grid()
+    df_new = grid["rows"].copy()
+    df_new.insert(0, "Time", pd.Timestamp(grid["close"], unit="ms", tz="UTC").isoformat())
+    return df_new
 
-    # ambil 2 snapshot terakhir per symbol
-    df = df.sort_values("Time")
 
-    last = df.groupby("Symbol").tail(2)
+def compute_score_delta():
+    _migrate_csv()
 
+    # 2 snapshot terakhir per symbol langsung dari index
     delta_rows = []
 
-    for symbol, g in last.groupby("Symbol"):
-        if len(g) < 2:
+    for symbol, pair in latest_pairs().items():
+        if len(pair) < 2:
             continue
 
-        prev, curr = g.iloc[0], g.iloc[1]
+        (_, _, prev_score, _), (_, direction, score, regime) = pair
 
         delta_rows.append({
             "Symbol": symbol,
-            "Direction": curr["Direction"],
-            "Score": curr["Score"],
-            "Delta": curr["Score"] - prev["Score"],
-            "Regime": curr["Regime"]
+            "Direction": direction,
+            "Score": score,
+            "Delta": score - prev_score,
+            "Regime": regime
         })
 
-    return pd.DataFrame(delta_rows)
+    if not delta_rows:
+        return None
+
+    return pd.DataFrame(delta_rows).sort_values(
+        "Delta", ascending=False
+    ).reset_index(drop=True)
+
+
+# =====================================================
+# ROTATION (MULTI HORIZON TOP-K)
+# =====================================================
+def get_rotation_tracker() -> RotationTracker:
+    """
+    Tracker per proses, di-sync dari snapshot store:
+    start → load horizon terbesar + 1 snapshot terakhir,
+    berikutnya → hanya snapshot yang lebih baru dari last_time.
+    """
+    global _tracker
+    _migrate_csv()
+
+    with _tracker_lock:
+        if _tracker is None:
+            tracker = RotationTracker()
+            new = load_last(tracker.size)
+        else:
+            tracker = _tracker
+            latest = max(
+                (pair[-1][0] for pair in latest_pairs().values()),
+                default=None
+            )
+            if latest is None or latest <= (tracker.last_time or 0):
+                return tracker
+            new = load_snapshots(start=tracker.last_time + 1)
+
+        for ms, g in new.groupby("Time", sort=True):
+            tracker.update(g, int(ms))
+
+        _tracker = tracker
+        return tracker
@@ -4,19 +4,35 @@
 # =====================================================
 
 import os
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta, timezone
 
+import clock
+
 from config import (
     SIGNAL_LOG_FILE,
+    HISTORY_CHUNK_ROWS,
     SIGNAL_COOLDOWN_MINUTES,
-    COOLDOWN_BY_MODE
+    COOLDOWN_BY_MODE,
+    ENTRY_TF,
+    DAILY_TF,
+    LIMIT_4H,
+    LIMIT_1D
+)
+
+from candle_store import get_candles
+from outcome import resolve_outcomes, trade_result_row, append_trade_results
+from telegram_bot import (
+    send_telegram_message,
+    format_trade_update,
+    format_regime_flip
 )
+from scoring import institutional_score, score_frames
+from regime import detect_market_regime, market_regime_panel
+from logger import get_logger
 
-from exchange import get_okx, fetch_ohlcv
-from telegram_bot import send_telegram_message, format_trade_update
-from scoring import institutional_score
-from regime import detect_market_regime
+log = get_logger("history")
 
 
 COLUMNS = [
@@ -79,7 +95,7 @@ def is_symbol_in_cooldown(symbol: str, mode: str) -> bool:
         minutes=SIGNAL_COOLDOWN_MINUTES
     )
 
-    return datetime.now(timezone.utc) < cooldown_until
+    return clock.now() < cooldown_until
 
 
 # =====================================================
@@ -87,14 +103,13 @@ def is_symbol_in_cooldown(symbol: str, mode: str) -> bool:
 # =====================================================
 def save_signal(signal: dict):
     _init_file()
-    df = load_signal_history()
 
-    now_utc = datetime.now(timezone.utc)
+    now_utc = clock.now()
     now_wib = now_utc.astimezone(
         timezone(timedelta(hours=7))
     )
 
-    df.loc[len(df)] = {
+    row = {
         "TimeUTC": now_utc.isoformat(),
         "TimeWIB": now_wib.strftime("%Y-%m-%d %H:%M WIB"),
         "Symbol": signal["Symbol"],
@@ -116,73 +131,268 @@ def save_signal(signal: dict):
         "Alerted": ""
     }
 
-    df.to_csv(SIGNAL_LOG_FILE, index=False)
+    # append 1 baris (tanpa rewrite seluruh file)
+    header = pd.read_csv(SIGNAL_LOG_FILE, nrows=0).columns
+    pd.DataFrame([row]).reindex(columns=header).to_csv(
+        SIGNAL_LOG_FILE, mode="a", header=False, index=False
+    )
+
+
+# =====================================================
+# MERGE HISTORY (STREAMING + HASH INDEX)
+# =====================================================
+MERGE_KEY = ["TimeUTC", "Symbol", "Mode", "Direction", "Entry"]
+
+
+def _key_hash(df) -> np.ndarray:
+    key = pd.DataFrame({
+        c: df[c].astype(str) if c in df.columns else "nan"
+        for c in MERGE_KEY if c != "Entry"
+    }, index=df.index)
+
+    entry = df["Entry"] if "Entry" in df.columns else np.nan
+    key["Entry"] = pd.to_numeric(entry, errors="coerce").round(8)
+
+    return pd.util.hash_pandas_object(key, index=False).to_numpy()
+
+
+def _existing_hashes() -> np.ndarray:
+    """
+    Sorted uint64 hash index dari history sekarang.
+    Hanya kolom key yang dibaca (8 byte per baris di memory).
+    """
+    header = pd.read_csv(SIGNAL_LOG_FILE, nrows=0).columns
+    usecols = [c for c in MERGE_KEY if c in header]
+
+    parts = [
+        _key_hash(chunk)
+        for chunk in pd.read_csv(
+            SIGNAL_LOG_FILE,
+            usecols=usecols,
+            chunksize=HISTORY_CHUNK_ROWS
+        )
+    ]
+
+    if not parts:
+        return np.empty(0, dtype=np.uint64)
+
+    return np.unique(np.concatenate(parts))
+
+
+def _iter_chunks(source, chunk_rows):
+    if isinstance(source, pd.DataFrame):
+        for i in range(0, len(source), chunk_rows):
+            yield source.iloc[i:i + chunk_rows]
+        return
+
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+    yield from pd.read_csv(source, chunksize=chunk_rows)
+
+
+def merge_signal_history(source, chunk_rows=HISTORY_CHUNK_ROWS) -> int:
+    """
+    Merge CSV backup (path / file upload / DataFrame) ke SIGNAL_LOG_FILE.
+
+    - dibaca per chunk, tidak pernah load 2 file penuh
+    - de-dup via hash (TimeUTC, Symbol, Mode, Direction, Entry)
+      terhadap history lama + baris upload sebelumnya
+    - append per chunk, return jumlah baris baru
+    """
+    _init_file()
+
+    header = list(pd.read_csv(SIGNAL_LOG_FILE, nrows=0).columns)
+    seen = _existing_hashes()
+    added = 0
+
+    for chunk in _iter_chunks(source, chunk_rows):
+        if chunk.empty:
+            continue
+
+        h = _key_hash(chunk)
+
+        # duplikat di dalam chunk itu sendiri
+        _, first = np.unique(h, return_index=True)
+        keep = np.zeros(len(h), dtype=bool)
+        keep[first] = True
+
+        # duplikat terhadap index
+        if len(seen):
+            pos = np.searchsorted(seen, h)
+            pos[pos == len(seen)] = 0
+            keep &= seen[pos] != h
+
+        if not keep.any():
+            continue
+
+        new_rows = chunk[keep]
+        new_rows.reindex(columns=header).to_csv(
+            SIGNAL_LOG_FILE, mode="a", header=False, index=False
+        )
+
+        new_h = np.sort(h[keep])
+        seen = np.insert(seen, np.searchsorted(seen, new_h), new_h)
+        added += len(new_rows)
+
+    return added
 
 
 # =====================================================
 # AUTO CLOSE + TELEGRAM
 # =====================================================
-def auto_close_signals():
+def auto_close_signals() -> int:
+    """
+    Resolve semua signal aktif dari high / low candle (intrabar),
+    bukan dari 1 harga ticker per cycle. Trade yang close dicatat
+    ke TRADE_RESULT_FILE (hit time, MFE, MAE, R).
+    Return jumlah perubahan status.
+    """
     if not os.path.exists(SIGNAL_LOG_FILE):
-        return
+        return 0
 
     df = pd.read_csv(SIGNAL_LOG_FILE)
     if df.empty:
-        return
+        return 0
+
+    active = df["Status"].isin(["OPEN", "TP1 HIT"])
+    if not active.any():
+        return 0
+
+    outcomes = resolve_outcomes(df[active], clock.time_ms())
+
+    for col in ["Status", "Alerted"]:
+        df[col] = df[col].astype(object)
+
+    updated, results = [], []
 
-    okx = get_okx()
-    changed = False
+    for i, res in outcomes.items():
+        new_status = res["Status"]
 
-    for i in range(len(df)):
-        status = df.at[i, "Status"]
+        # status tidak pernah mundur (TP1 HIT → OPEN)
+        if new_status == "OPEN" or new_status == df.at[i, "Status"]:
+            continue
 
-        if status not in ["OPEN", "TP1 HIT"]:
+        # ✅ SAFE CHECK (DATAFRAME BASED)
+        if df.at[i, "Alerted"] == new_status:
             continue
 
+        df.at[i, "Status"] = new_status
+        df.at[i, "Alerted"] = new_status
+        updated.append(i)
+
+        if res["ExitTime"] is not None:
+            results.append(trade_result_row(df.loc[i].to_dict(), res))
+
+    if not updated:
+        return 0
+
+    df.to_csv(SIGNAL_LOG_FILE, index=False)
+    append_trade_results(results)
+
+    for i in updated:
         try:
-            symbol = df.at[i, "Symbol"]
-            direction = df.at[i, "Direction"]
-
-            price = okx.fetch_ticker(symbol)["last"]
-
-            sl  = float(df.at[i, "SL"])
-            tp1 = float(df.at[i, "TP1"])
-            tp2 = float(df.at[i, "TP2"])
-
-            new_status = None
-
-            if direction == "LONG":
-                if price <= sl:
-                    new_status = "SL HIT"
-                elif price >= tp2:
-                    new_status = "TP2 HIT"
-                elif price >= tp1 and status == "OPEN":
-                    new_status = "TP1 HIT"
-            else:
-                if price >= sl:
-                    new_status = "SL HIT"
-                elif price <= tp2:
-                    new_status = "TP2 HIT"
-                elif price <= tp1 and status == "OPEN":
-                    new_status = "TP1 HIT"
-
-            # ✅ SAFE CHECK (DATAFRAME BASED)
-            if new_status and df.at[i, "Alerted"] != new_status:
-                df.at[i, "Status"] = new_status
-                df.at[i, "Alerted"] = new_status
-                changed = True
-
-                send_telegram_message(
-                    format_trade_update(df.loc[i].to_dict())
-                )
+            send_telegram_message(
+                format_trade_update(df.loc[i].to_dict())
+            )
+        except Exception as e:
+            log.error("auto_close_error", symbol=df.at[i, "Symbol"], error=str(e))
+
+    return len(updated)
+
 
+# =====================================================
+# REGIME FLIP MONITOR (BATCHED)
+# =====================================================
+def _regime_panel(open_df) -> pd.DataFrame:
+    """
+    1x fetch per symbol (via candle store), lalu regime semua
+    (Symbol, Direction) dalam 1 panel call.
+    """
+    pairs, frames4h, frames1d = [], [], []
+
+    for symbol, g in open_df.groupby("Symbol"):
+        try:
+            df4h = get_candles(symbol, ENTRY_TF, LIMIT_4H)
+            df1d = get_candles(symbol, DAILY_TF, LIMIT_1D)
         except Exception as e:
-            print(f"[AUTO CLOSE ERROR] {symbol}: {e}", flush=True)
+            log.error("regime_monitor_error", symbol=symbol, error=str(e))
+            continue
+
+        if len(df4h) < 50 or len(df1d) < 50:
             continue
 
-    if changed:
-        df.to_csv(SIGNAL_LOG_FILE, index=False)
+        for direction in g["Direction"].unique():
+            pairs.append((symbol, direction))
+            frames4h.append(df4h)
+            frames1d.append(df1d)
+
+    if not pairs:
+        return pd.DataFrame(columns=["Symbol", "Direction", "NewRegime"])
+
+    out = pd.DataFrame(pairs, columns=["Symbol", "Direction"])
+    scores = score_frames(frames4h, frames1d, out["Direction"].to_numpy())
+    out["NewRegime"] = market_regime_panel(scores)
+
+    return out
+
+
+def monitor_regime_flip() -> int:
+    """
+    Update CurrentRegime / RegimeShift untuk semua signal aktif.
+    Return jumlah regime flip (1 alert per flip).
+    """
+    if not os.path.exists(SIGNAL_LOG_FILE):
+        return 0
+
+    df = pd.read_csv(SIGNAL_LOG_FILE)
+    active = df["Status"].isin(["OPEN", "TP1 HIT"])
+
+    if not active.any():
+        return 0
+
+    feats = _regime_panel(df.loc[active, ["Symbol", "Direction"]])
+    if feats.empty:
+        return 0
+
+    cur = df.loc[active, ["Symbol", "Direction", "Regime", "CurrentRegime"]]
+    cur = cur.reset_index().merge(
+        feats[["Symbol", "Direction", "NewRegime"]],
+        on=["Symbol", "Direction"],
+        how="inner"
+    ).set_index("index")
+
+    prev = cur["CurrentRegime"].fillna(cur["Regime"])
+    flipped = cur[cur["NewRegime"] != prev]
+
+    if flipped.empty:
+        return 0
+
+    # hanya baris yang berubah
+    for col in ["CurrentRegime", "RegimeShift"]:
+        df[col] = df[col].astype(object)
+
+    df.loc[flipped.index, "CurrentRegime"] = flipped["NewRegime"]
+    df.loc[flipped.index, "RegimeShift"] = (
+        flipped["NewRegime"] != flipped["Regime"]
+    )
+    df.to_csv(SIGNAL_LOG_FILE, index=False)
+
+    # =========================
+    # ALERT QUEUE (SETELAH WRITE)
+    # =========================
+    queue = [
+        format_regime_flip(df.loc[i].to_dict(), prev.loc[i])
+        for i in flipped.index
+    ]
+
+    for msg in queue:
+        try:
+            send_telegram_message(msg)
+        except Exception as e:
+            log.error("regime_alert_error", error=str(e))
 
+    return len(queue)
 
 
 # =====================================================
@@ -0,0 +1,368 @@
+# =====================================================
+# OPSI A PRO — SIGNAL HISTORY STORE (INDEXED)
+# SQLITE MIRROR OF SIGNAL_LOG_FILE | FILTER + PAGINATION
+# =====================================================
+#
+# CSV tetap jadi sumber utama (scanner, auto close, monte carlo).
+# File ini hanya menjaga salinan ber-index di SQLite supaya dashboard
+# bisa filter + paging di sisi "server" tanpa load seluruh CSV.
+#
+# Sinkronisasi:
+# - file tidak berubah (mtime + size sama)  → tidak ada kerja
+# - file hanya bertambah (append)           → parse byte baru saja
+# - file ditulis ulang (auto close, merge)  → rebuild per chunk
+# Scanner dan app sync dari proses berbeda → seluruh sync di bawah
+# file_lock (meta dibaca ulang setelah lock). Baris baru ditulis dulu
+# ke tabel staging (to_sql commit per chunk), lalu dipasang + meta
+# dalam 1 transaksi: pembaca tidak pernah melihat tabel setengah jadi.
+
+import os
+import io
+import json
+import hashlib
+import sqlite3
+from contextlib import closing
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+from config import (
+    SIGNAL_LOG_FILE,
+    SIGNAL_DB_FILE,
+    HISTORY_PAGE_SIZE,
+    HISTORY_CHUNK_ROWS
+)
+from file_lock import file_lock
+
+TABLE = "signals"
+STAGE = "signals_stage"
+TAIL_BYTES = 4096
+
+INDEXES = {
+    "idx_time": ["TimeUTC"],
+    "idx_symbol_time": ["Symbol", "TimeUTC"],
+    "idx_mode_time": ["Mode", "TimeUTC"],
+    "idx_status_time": ["Status", "TimeUTC"]
+}
+
+LOCK_FILE = SIGNAL_DB_FILE + ".lock"
+
+
+# =====================================================
+# LOW LEVEL
+# =====================================================
+def _connect():
+    conn = sqlite3.connect(SIGNAL_DB_FILE, timeout=30)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+    )
+    return conn
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _get_meta(conn) -> dict:
+    row = conn.execute(
+        "SELECT value FROM meta WHERE key = 'source'"
+    ).fetchone()
+    return json.loads(row[0]) if row else {}
+
+
+def _set_meta(conn, meta: dict):
+    conn.execute(
+        "INSERT OR REPLACE INTO meta (key, value) VALUES ('source', ?)",
+        (json.dumps(meta),)
+    )
+
+
+def _tail_hash(path: str, size: int) -> str:
+    start = max(0, size - TAIL_BYTES)
+    with open(path, "rb") as f:
+        f.seek(start)
+        return hashlib.sha1(f.read(size - start)).hexdigest()
+
+
+def _read_header(path: str) -> list:
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def _table_exists(conn, name=TABLE) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (name,)
+    ).fetchone() is not None
+
+
+def _create_indexes(conn, columns: list):
+    for name, cols in INDEXES.items():
+        if all(c in columns for c in cols):
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {name} ON {TABLE} "
+                f"({', '.join(_quote(c) for c in cols)})"
+            )
+
+
+# =====================================================
+# SYNC CSV → SQLITE
+# =====================================================
+def _stage(conn, chunks, header: list):
+    """Tulis chunks ke tabel STAGE (dibuat ulang)."""
+    conn.execute(f"DROP TABLE IF EXISTS {STAGE}")
+    conn.commit()
+
+    # tabel dibuat dari chunk pertama (dtype hasil parse CSV) → kolom
+    # angka dapat affinity REAL / INTEGER, bukan TEXT semua
+    created = False
+    for chunk in chunks:
+        chunk.to_sql(STAGE, conn, index=False, if_exists="append" if created else "replace")
+        created = True
+
+    if not created:
+        pd.DataFrame(columns=header).to_sql(STAGE, conn, index=False)
+
+
+def _rebuild(conn, path: str, header: list):
+    """Stage seluruh CSV; dipasang oleh _swap_in(replace=True)."""
+    _stage(conn, pd.read_csv(path, chunksize=HISTORY_CHUNK_ROWS), header)
+
+
+def _append_tail(conn, path: str, header: list, offset: int):
+    """Stage byte baru saja; dipasang oleh _swap_in(replace=False)."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        raw = f.read()
+
+    chunks = []
+    if raw.strip():
+        chunks = pd.read_csv(
+            io.BytesIO(raw),
+            header=None,
+            names=header,
+            chunksize=HISTORY_CHUNK_ROWS
+        )
+    _stage(conn, chunks, header)
+
+
+def _swap_in(conn, header: list, replace: bool, meta: dict):
+    """STAGE → TABLE + meta dalam 1 transaksi."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if replace:
+            conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+            conn.execute(f"ALTER TABLE {STAGE} RENAME TO {TABLE}")
+            _create_indexes(conn, header)
+        else:
+            cols = ", ".join(_quote(c) for c in header)
+            conn.execute(f"INSERT INTO {TABLE} ({cols}) SELECT {cols} FROM {STAGE}")
+            conn.execute(f"DROP TABLE {STAGE}")
+
+        _set_meta(conn, meta)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def sync_history_store():
+    """
+    Samakan index SQLite dengan SIGNAL_LOG_FILE.
+    Murah dipanggil di setiap rerun Streamlit.
+    """
+    if not os.path.exists(SIGNAL_LOG_FILE):
+        return
+
+    with file_lock(LOCK_FILE), closing(_connect()) as conn:
+        # meta dibaca setelah lock → sync proses lain sudah terlihat
+        st = os.stat(SIGNAL_LOG_FILE)
+        old = _get_meta(conn)
+
+        if (
+            _table_exists(conn)
+            and old.get("mtime_ns") == st.st_mtime_ns
+            and old.get("size") == st.st_size
+        ):
+            return
+
+        header = _read_header(SIGNAL_LOG_FILE)
+
+        appended = (
+            _table_exists(conn)
+            and old.get("columns") == header
+            and 0 < old.get("size", 0) < st.st_size
+            and _tail_hash(SIGNAL_LOG_FILE, old["size"]) == old.get("tail")
+        )
+
+        meta = {
+            "mtime_ns": st.st_mtime_ns,
+            "size": st.st_size,
+            "tail": _tail_hash(SIGNAL_LOG_FILE, st.st_size),
+            "columns": header
+        }
+
+        if appended:
+            _append_tail(conn, SIGNAL_LOG_FILE, header, old["size"])
+        else:
+            _rebuild(conn, SIGNAL_LOG_FILE, header)
+
+        _swap_in(conn, header, replace=not appended, meta=meta)
+
+
+# =====================================================
+# QUERY
+# =====================================================
+def _day(value) -> str:
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def _where(symbol=None, mode=None, status=None, start=None, end=None):
+    clauses, params = [], []
+
+    if symbol:
+        clauses.append('"Symbol" = ?')
+        params.append(symbol)
+
+    if mode:
+        clauses.append('"Mode" = ?')
+        params.append(mode)
+
+    if status:
+        if isinstance(status, str):
+            status = [status]
+        clauses.append(f'"Status" IN ({", ".join("?" * len(status))})')
+        params.extend(status)
+
+    # TimeUTC = ISO string → perbandingan leksikal = urutan waktu
+    if start:
+        clauses.append('"TimeUTC" >= ?')
+        params.append(_day(start))
+
+    if end:
+        if isinstance(end, (date, datetime)):
+            end = (date.fromisoformat(_day(end)) + timedelta(days=1)).isoformat()
+        clauses.append('"TimeUTC" < ?')
+        params.append(str(end))
+
+    sql = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    return sql, params
+
+
+def query_signal_history(
+    symbol=None,
+    mode=None,
+    status=None,
+    start=None,
+    end=None,
+    page=1,
+    page_size=HISTORY_PAGE_SIZE
+):
+    """
+    Return (DataFrame page, total rows yang match filter).
+    page mulai dari 1, urut TimeUTC terbaru dulu.
+    end = tanggal inklusif (date) atau batas ISO eksklusif (str).
+    """
+    sync_history_store()
+
+    if not os.path.exists(SIGNAL_DB_FILE):
+        return pd.DataFrame(), 0
+
+    where, params = _where(symbol, mode, status, start, end)
+    offset = max(page - 1, 0) * page_size
+
+    with closing(_connect()) as conn:
+        if not _table_exists(conn):
+            return pd.DataFrame(), 0
+
+        total = conn.execute(
+            f"SELECT COUNT(*) FROM {TABLE}{where}", params
+        ).fetchone()[0]
+
+        df = pd.read_sql_query(
+            f"SELECT * FROM {TABLE}{where} "
+            f'ORDER BY "TimeUTC" DESC, rowid DESC LIMIT ? OFFSET ?',
+            conn,
+            params=params + [page_size, offset]
+        )
+
+    return df, total
+
+
+def count_signals(**filters) -> int:
+    sync_history_store()
+
+    if not os.path.exists(SIGNAL_DB_FILE):
+        return 0
+
+    where, params = _where(**filters)
+
+    with closing(_connect()) as conn:
+        if not _table_exists(conn):
+            return 0
+        return conn.execute(
+            f"SELECT COUNT(*) FROM {TABLE}{where}", params
+        ).fetchone()[0]
+
+
+def distinct_values(column: str, **filters) -> list:
+    sync_history_store()
+
+    if not os.path.exists(SIGNAL_DB_FILE):
+        return []
+
+    where, params = _where(**filters)
+    not_null = f"{_quote(column)} IS NOT NULL"
+    where = f"{where} AND {not_null}" if where else f" WHERE {not_null}"
+
+    with closing(_connect()) as conn:
+        if not _table_exists(conn):
+            return []
+        rows = conn.execute(
+            f"SELECT DISTINCT {_quote(column)} FROM {TABLE}{where} ORDER BY 1",
+            params
+        ).fetchall()
+
+    return [r[0] for r in rows]
+
+
+# =====================================================
+# EXPORT (STREAMING CSV)
+# =====================================================
+def iter_signal_history_csv(chunk_rows=HISTORY_CHUNK_ROWS, **filters):
+    """
+    Generator CSV text per chunk (header hanya di chunk pertama).
+    Tidak pernah memegang seluruh history di memory.
+    """
+    sync_history_store()
+
+    if not os.path.exists(SIGNAL_DB_FILE):
+        return
+
+    where, params = _where(**filters)
+
+    with closing(_connect()) as conn:
+        if not _table_exists(conn):
+            return
+
+        chunks = pd.read_sql_query(
+            f'SELECT * FROM {TABLE}{where} ORDER BY "TimeUTC" DESC, rowid DESC',
+            conn,
+            params=params,
+            chunksize=chunk_rows
+        )
+
+        first = True
+        for chunk in chunks:
+            yield chunk.to_csv(index=False, header=first)
+            first = False
+
+
+def export_signal_history(path: str, **filters) -> str:
+    with open(path, "w", newline="") as f:
+        for text in iter_signal_history_csv(**filters):
+            f.write(text)
+    return path
@@ -0,0 +1,234 @@
+# =====================================================
+# OPSI A PRO — INDICATOR CACHE
+# CONTENT-ADDRESSED | SQLITE (MULTI PROCESS) | SIZE-BOUNDED LRU
+# =====================================================
+#
+# Key = sha1(nama + versi indikator, parameter, symbol / tf (df.attrs
+# dari candle store), open time bar terakhir, hash isi OHLCV + index).
+# Isi candle ikut di-hash → data berubah = key baru. Rumus indikator
+# berubah → naikkan versi di @cached_indicator (entry lama tidak
+# terbaca lagi, dibuang LRU).
+#
+# Frame yang bar terakhirnya masih berjalan (t + tf > clock): isinya
+# berubah tiap tick → yang di-cache hanya prefix bar close
+# (df.iloc[:-1]), lalu extend(df, hasil prefix, ...) menghitung bar
+# berjalan saja di atasnya. Tanpa extend → dihitung langsung.
+#
+# Value = pickle hasil indikator. Scanner, dashboard, backtest dan
+# worker sweep berbagi INDICATOR_CACHE_FILE (WAL). Total ukuran >
+# INDICATOR_CACHE_MAX_MB → entry yang paling lama tidak dipakai dibuang.
+
+import os
+import time
+import pickle
+import sqlite3
+import hashlib
+import threading
+import functools
+
+import pandas as pd
+
+import clock
+from config import (
+    INDICATOR_CACHE_ENABLED,
+    INDICATOR_CACHE_FILE,
+    INDICATOR_CACHE_MAX_MB
+)
+from logger import get_logger
+from resample import timeframe_ms
+
+log = get_logger("indicator_cache")
+
+OHLCV = ["t", "open", "high", "low", "close", "volume"]
+
+TOUCH_SEC = 60          # "used" di-update max 1x / menit per entry (hemat write)
+EVICT_EVERY = 200       # cek ukuran tiap N put per proses
+
+
+# =====================================================
+# KEY
+# =====================================================
+def frame_key(df, name: str, params: tuple, version: int = 1) -> str:
+    h = hashlib.sha1()
+    h.update(repr((
+        name,
+        version,
+        params,
+        df.attrs.get("symbol"),
+        df.attrs.get("tf"),
+        int(df["t"].iloc[-1]) if "t" in df and len(df) else None,
+        len(df)
+    )).encode())
+
+    for c in OHLCV:
+        if c in df:
+            h.update(df[c].to_numpy(dtype=float).tobytes())
+
+    # index ikut menentukan hasil (Series keluaran memakai index df)
+    idx = df.index
+    if isinstance(idx, pd.RangeIndex):
+        h.update(repr((idx.start, idx.stop, idx.step)).encode())
+    else:
+        h.update(pd.util.hash_pandas_object(idx).to_numpy().tobytes())
+
+    return h.hexdigest()
+
+
+def last_bar_open(df) -> bool:
+    """Bar terakhir belum close (butuh df.attrs["tf"] dari candle store)."""
+    tf = df.attrs.get("tf")
+    if tf is None or "t" not in df:
+        return False
+    return int(df["t"].iloc[-1]) + timeframe_ms(tf) > clock.time_ms()
+
+
+# =====================================================
+# STORE
+# =====================================================
+class IndicatorCache:
+    def __init__(self, path=INDICATOR_CACHE_FILE, max_bytes=INDICATOR_CACHE_MAX_MB * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._puts = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _conn(self):
+        # koneksi per thread, dibuat ulang di proses anak (fork worker sweep)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value BLOB, size INTEGER, used REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_used ON cache (used)")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        """Return (True, value) atau (False, None)."""
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value, used FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return False, None
+
+        now = time.time()
+        if now - row[1] > TOUCH_SEC:
+            with conn:
+                conn.execute("UPDATE cache SET used = ? WHERE key = ?", (now, key))
+
+        self.hits += 1
+        return True, pickle.loads(row[0])
+
+    def put(self, key, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        conn = self._conn()
+
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?,?,?,?)",
+                (key, blob, len(blob), time.time())
+            )
+
+        self._puts += 1
+        if self._puts % EVICT_EVERY == 0:
+            self.evict()
+
+    def size(self) -> int:
+        return self._conn().execute(
+            "SELECT COALESCE(SUM(size), 0) FROM cache"
+        ).fetchone()[0]
+
+    def evict(self) -> int:
+        """Buang LRU sampai total <= 90% max_bytes. Return jumlah entry."""
+        conn = self._conn()
+        excess = self.size() - self.max_bytes
+        if excess <= 0:
+            return 0
+
+        target = excess + self.max_bytes // 10
+        freed, keys = 0, []
+
+        for key, size in conn.execute("SELECT key, size FROM cache ORDER BY used"):
+            keys.append((key,))
+            freed += size
+            if freed >= target:
+                break
+
+        with conn:
+            conn.executemany("DELETE FROM cache WHERE key = ?", keys)
+        return len(keys)
+
+    def clear(self):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM cache")
+
+
+_cache = None
+_lock = threading.Lock()
+
+
+def get_indicator_cache() -> IndicatorCache:
+    global _cache
+    with _lock:
+        if _cache is None:
+            _cache = IndicatorCache()
+        return _cache
+
+
+# =====================================================
+# DECORATOR
+# =====================================================
+def cached_indicator(name: str, version: int = 1, extend=None):
+    """
+    f(df, *args, **kwargs) → hasil di-cache per isi df + parameter.
+    version: naikkan kalau rumus f berubah.
+    extend(df, prev, *args, **kwargs): hasil f(df) dari prev = f(df.iloc[:-1])
+    → dipakai kalau bar terakhir df masih berjalan.
+    Error cache (db terkunci, disk penuh, ...) → hitung langsung.
+    """
+    def wrap(f):
+        @functools.wraps(f)
+        def inner(df, *args, **kwargs):
+            if not INDICATOR_CACHE_ENABLED or df is None or not len(df):
+                return f(df, *args, **kwargs)
+
+            try:
+                if last_bar_open(df):
+                    prefix = df.iloc[:-1]
+                    if extend is None or not len(prefix) or last_bar_open(prefix):
+                        return f(df, *args, **kwargs)
+                    return extend(df, inner(prefix, *args, **kwargs), *args, **kwargs)
+
+                cache = get_indicator_cache()
+                key = frame_key(df, name, (args, tuple(sorted(kwargs.items()))), version)
+                found, value = cache.get(key)
+                if found:
+                    return value
+            except Exception as e:
+                log.error("indicator_cache_error", indicator=name, error=str(e))
+                return f(df, *args, **kwargs)
+
+            value = f(df, *args, **kwargs)
+
+            try:
+                cache.put(key, value)
+            except Exception as e:
+                log.error("indicator_cache_error", indicator=name, error=str(e))
+
+            return value
+
+        inner.uncached = f
+        return inner
+
+    return wrap
@@ -4,8 +4,9 @@
 import pandas as pd
 import numpy as np
 from config import VO_FAST, VO_SLOW
+from indicator_cache import cached_indicator
 
-def supertrend(df, period, mult):
+def _supertrend_bands(df, period, mult):
     h,l,c = df.high, df.low, df.close
     tr = pd.concat([
         h-l,
@@ -15,8 +16,27 @@ def supertrend(df, period, mult):
 
     atr = tr.ewm(span=period, adjust=False).mean()
     hl2 = (h+l)/2
-    upper = hl2 + mult*atr
-    lower = hl2 - mult*atr
+    return hl2 + mult*atr, hl2 - mult*atr
+
+def _supertrend_extend(df, prev, period, mult):
+    """1 langkah loop supertrend untuk bar terakhir, dari hasil prefix."""
+    stl, trend = prev
+    upper, lower = _supertrend_bands(df, period, mult)
+    c = df.close.iloc[-1]
+
+    if trend.iloc[-1] == 1:
+        s = max(lower.iloc[-1], stl.iloc[-1])
+        t = 1 if c > s else -1
+    else:
+        s = min(upper.iloc[-1], stl.iloc[-1])
+        t = -1 if c < s else 1
+
+    return pd.Series(np.append(stl.to_numpy(), s)), pd.Series(np.append(trend.to_numpy(), t))
+
+@cached_indicator("supertrend", extend=_supertrend_extend)
+def supertrend(df, period, mult):
+    c = df.close
+    upper, lower = _supertrend_bands(df, period, mult)
 
     trend = [1]
     stl = [lower.iloc[0]]
@@ -37,22 +57,49 @@ def volume_osc(volume):
         - volume.ewm(VO_SLOW).mean()
     ) / volume.ewm(VO_SLOW).mean() * 100
 
+def _ema_extend(df, prev, span, column="close"):
+    """EMA bar terakhir dari EMA prefix (ewm adjust=True: mean = N / D)."""
+    a = 2 / (span + 1)
+    n = len(prev)
+    D = (1 - (1 - a) ** n) / a
+    N = prev.iloc[-1] * D
+    value = (df[column].iloc[-1] + (1 - a) * N) / (1 + (1 - a) * D)
+    return pd.Series(np.append(prev.to_numpy(), value), index=df.index, name=prev.name)
+
+@cached_indicator("ema", extend=_ema_extend)
+def ema(df, span, column="close"):
+    """df[column].ewm(span=span).mean() (pandas default adjust=True)."""
+    return df[column].ewm(span=span).mean()
+
 def accumulation_distribution(df):
     h,l,c,v = df.high, df.low, df.close, df.volume
     mfm = ((c-l)-(h-c))/(h-l)
     mfm = mfm.replace([np.inf,-np.inf],0).fillna(0)
     return (mfm*v).cumsum()
 
-def find_support(df, lb):
-    levels=[]
-    for i in range(lb, len(df)-lb):
-        if df.low.iloc[i] == min(df.low.iloc[i-lb:i+lb+1]):
-            levels.append(df.low.iloc[i])
-    return sorted(set(levels))
-
-def find_resistance(df, lb):
-    levels=[]
-    for i in range(lb, len(df)-lb):
-        if df.high.iloc[i] == max(df.high.iloc[i-lb:i+lb+1]):
-            levels.append(df.high.iloc[i])
-    return sorted(set(levels))
+def daily_ema_at(df4h, df1d, span):
+    """
+    EMA daily (pandas ewm adjust=True) seperti yang terlihat di setiap
+    bar 4h: bar daily berjalan memakai close 4h saat itu, bukan close
+    final harian → tanpa lookahead.
+    NaN kalau bar 4h belum punya bar daily.
+    """
+    a = 2 / (span + 1)
+    c1 = df1d.close.to_numpy(dtype=float)
+
+    # ewm adjust=True: mean = N / D, D = (1 - (1-a)^(j+1)) / a
+    D = (1 - (1 - a) ** np.arange(1, len(c1) + 1)) / a
+    N = ema(df1d, span).to_numpy() * D
+
+    j = np.searchsorted(
+        df1d.t.to_numpy(), df4h.t.to_numpy(), side="right"
+    ) - 1
+
+    prev_N = np.where(j > 0, N[np.maximum(j - 1, 0)], 0.0)
+    prev_D = np.where(j > 0, D[np.maximum(j - 1, 0)], 0.0)
+
+    value = ((1 - a) * prev_N + df4h.close.to_numpy(dtype=float)) / (
+        (1 - a) * prev_D + 1
+    )
+
+    return pd.Series(np.where(j >= 0, value, np.nan), index=df4h.index)
@@ -0,0 +1,269 @@
+# =====================================================
+# OPSI A PRO — S/R LEVEL INDEX
+# INCREMENTAL PIVOT | ZONE CLUSTER | BISECT LOOKUP
+# =====================================================
+#
+# Pivot (lookback lb) = low / high ekstrem di window 2*lb+1 bar,
+# baru "diketahui" saat bar ke i+lb close (tanpa lookahead).
+# Pivot yang berdekatan (lebar zone <= zone_pct) digabung jadi 1 zone.
+# Zone support / resistance disimpan urut → level terdekat = bisect.
+# Hanya pivot dari LEVEL_WINDOW_BARS bar terakhir yang dipakai (sama
+# dengan window LIMIT_1D bar sebelum index ini); pivot yang
+# keluar window dibuang dan zone dibangun ulang dari pivot tersisa.
+#
+# Dipakai bersama:
+#   - live (check_signal, analyze_single_coin): get_level_index(symbol, df1d)
+#     → 1 index per (symbol, tf) per proses, di-seed dari window terakhir
+#       di candle store, lalu hanya bar daily yang baru close yang diproses
+#   - backtest: pivot_events() 1x per lookback, feed() maju sesuai waktu
+
+import bisect
+import threading
+from collections import deque
+
+import numpy as np
+
+import clock
+from config import DAILY_TF, SR_LOOKBACK, LEVEL_ZONE_PCT, LEVEL_WINDOW_BARS
+from candle_store import load_candles
+from indicator_cache import cached_indicator
+from resample import timeframe_ms, bucket_start
+
+
+# =====================================================
+# PIVOT EVENTS (VECTORIZED)
+# =====================================================
+@cached_indicator("pivot_events")
+def pivot_events(df, lb, tf=DAILY_TF):
+    """
+    Return (sup_price, sup_known, res_price, res_known),
+    known = close bar konfirmasi (ms), urut naik.
+    """
+    w = 2 * lb + 1
+    low, high = df.low, df.high
+    t = df.t.to_numpy(dtype=np.int64)
+
+    sup = (low == low.rolling(w, center=True).min()).to_numpy()
+    res = (high == high.rolling(w, center=True).max()).to_numpy()
+
+    known = np.full(len(t), np.iinfo(np.int64).max)
+    known[:max(len(t) - lb, 0)] = t[lb:] + timeframe_ms(tf)
+
+    return (
+        low.to_numpy(dtype=float)[sup], known[sup],
+        high.to_numpy(dtype=float)[res], known[res]
+    )
+
+
+# =====================================================
+# ZONE LIST (SORTED)
+# =====================================================
+class ZoneList:
+    def __init__(self, zone_pct):
+        self.zone_pct = zone_pct
+        self.lows = []
+        self.highs = []
+        self.touches = []
+
+    def __len__(self):
+        return len(self.lows)
+
+    def _fits(self, lo, hi) -> bool:
+        return hi <= lo * (1 + self.zone_pct)
+
+    def add(self, price: float):
+        i = bisect.bisect_left(self.lows, price)
+
+        # gabung ke zone kiri / kanan kalau lebar tetap <= zone_pct
+        for j in (i - 1, i):
+            if 0 <= j < len(self.lows):
+                lo = min(self.lows[j], price)
+                hi = max(self.highs[j], price)
+                if self._fits(lo, hi):
+                    self.lows[j], self.highs[j] = lo, hi
+                    self.touches[j] += 1
+                    self._merge(j)
+                    return
+
+        self.lows.insert(i, price)
+        self.highs.insert(i, price)
+        self.touches.insert(i, 1)
+
+    def _merge(self, j):
+        for k in (j - 1, j):
+            if 0 <= k < len(self.lows) - 1 and self._fits(self.lows[k], self.highs[k + 1]):
+                self.highs[k] = max(self.highs[k], self.highs[k + 1])
+                self.touches[k] += self.touches[k + 1]
+                del self.lows[k + 1], self.highs[k + 1], self.touches[k + 1]
+                return
+
+    def below(self, price):
+        """Low zone terbesar yang < price (None kalau tidak ada)."""
+        i = bisect.bisect_left(self.lows, price)
+        return self.lows[i - 1] if i else None
+
+    def above(self, price):
+        """High zone terkecil yang > price (None kalau tidak ada)."""
+        i = bisect.bisect_right(self.highs, price)
+        return self.highs[i] if i < len(self.highs) else None
+
+
+# =====================================================
+# LEVEL INDEX
+# =====================================================
+class LevelIndex:
+    def __init__(
+        self,
+        lookback=SR_LOOKBACK,
+        zone_pct=LEVEL_ZONE_PCT,
+        tf=DAILY_TF,
+        window=LEVEL_WINDOW_BARS
+    ):
+        self.lookback = lookback
+        self.tf = tf
+        self.window = window
+        self.step = timeframe_ms(tf)
+        self.support = ZoneList(zone_pct)
+        self.resistance = ZoneList(zone_pct)
+        self.last_t = None      # open time bar close terakhir yang diproses
+        self._pivots = (deque(), deque())   # (bar t, price) support / resistance
+        self._pos = [0, 0]      # pointer feed() (backtest)
+        self._lock = threading.Lock()
+
+    # =========================
+    # WINDOW
+    # =========================
+    def _add(self, side: int, price: float, known: int):
+        # known = close bar konfirmasi (bar pivot + lb) → open time bar pivot
+        self._pivots[side].append((int(known) - (self.lookback + 1) * self.step, price))
+        (self.support, self.resistance)[side].add(price)
+
+    def _prune(self, last_t: int):
+        """Buang pivot di luar `window` bar terakhir (last_t = bar close terakhir)."""
+        if self.window is None:
+            return
+
+        start = last_t - (self.window - 1) * self.step
+
+        for side, zl in enumerate((self.support, self.resistance)):
+            pivots = self._pivots[side]
+            if not pivots or pivots[0][0] >= start:
+                continue
+
+            while pivots and pivots[0][0] < start:
+                pivots.popleft()
+
+            # zone tidak bisa dipecah → bangun ulang dari pivot tersisa
+            rebuilt = ZoneList(zl.zone_pct)
+            for _, price in pivots:
+                rebuilt.add(price)
+            if side == 0:
+                self.support = rebuilt
+            else:
+                self.resistance = rebuilt
+
+    # =========================
+    # BACKTEST: FEED EVENTS
+    # =========================
+    def feed(self, events, until):
+        """Tambah pivot dari pivot_events() dengan known <= until."""
+        sup_p, sup_k, res_p, res_k = events
+
+        with self._lock:
+            while self._pos[0] < len(sup_k) and sup_k[self._pos[0]] <= until:
+                self._add(0, float(sup_p[self._pos[0]]), sup_k[self._pos[0]])
+                self._pos[0] += 1
+            while self._pos[1] < len(res_k) and res_k[self._pos[1]] <= until:
+                self._add(1, float(res_p[self._pos[1]]), res_k[self._pos[1]])
+                self._pos[1] += 1
+
+            self._prune(int(bucket_start(until, self.tf)) - self.step)
+
+    # =========================
+    # LIVE: INCREMENTAL UPDATE
+    # =========================
+    def update(self, df, now_ms=None) -> int:
+        """
+        Proses bar yang sudah close dan belum pernah dilihat.
+        Hanya window 2*lb bar sebelum bar baru yang dihitung ulang.
+        Return jumlah pivot baru.
+        """
+        step = timeframe_ms(self.tf)
+        now_ms = now_ms or clock.time_ms()
+
+        closed = df[df["t"] + step <= now_ms].reset_index(drop=True)
+        if closed.empty:
+            return 0
+
+        with self._lock:
+            if self.last_t is not None:
+                first_new = int(np.searchsorted(closed["t"].to_numpy(), self.last_t, side="right"))
+                if first_new >= len(closed):
+                    return 0
+                closed = closed.iloc[max(first_new - 2 * self.lookback, 0):]
+                seen = self.last_t + step
+            else:
+                seen = np.iinfo(np.int64).min
+
+            sup_p, sup_k, res_p, res_k = pivot_events(closed, self.lookback, self.tf)
+
+            added = 0
+            new = sup_k > seen
+            for p, k in zip(sup_p[new], sup_k[new]):
+                self._add(0, float(p), k)
+                added += 1
+            new = res_k > seen
+            for p, k in zip(res_p[new], res_k[new]):
+                self._add(1, float(p), k)
+                added += 1
+
+            self.last_t = int(closed["t"].iloc[-1])
+            self._prune(self.last_t)
+            return added
+
+    # =========================
+    # LOOKUP
+    # =========================
+    def nearest_support(self, price):
+        with self._lock:
+            return self.support.below(price)
+
+    def nearest_resistance(self, price):
+        with self._lock:
+            return self.resistance.above(price)
+
+    def zones(self) -> list:
+        with self._lock:
+            return [
+                {"Type": kind, "Low": lo, "High": hi, "Touches": n}
+                for kind, zl in (("SUPPORT", self.support), ("RESISTANCE", self.resistance))
+                for lo, hi, n in zip(zl.lows, zl.highs, zl.touches)
+            ]
+
+
+# =====================================================
+# SHARED LIVE INDEX (1 PER SYMBOL × TF PER PROSES)
+# =====================================================
+_indexes = {}
+_lock = threading.Lock()
+
+
+def get_level_index(symbol, df=None, tf=DAILY_TF) -> LevelIndex:
+    """
+    Index dibangun 1x dari window terakhir (LEVEL_WINDOW_BARS + lookback
+    bar) tf di candle store, lalu di-update dari df (candle terbaru)
+    setiap dipanggil.
+    """
+    key = (symbol, tf)
+
+    with _lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = LevelIndex(tf=tf)
+            limit = index.window + index.lookback + 1 if index.window else None
+            index.update(load_candles(symbol, tf, limit))
+
+    if df is not None:
+        index.update(df)
+
+    return index
@@ -0,0 +1,283 @@
+# =====================================================
+# OPSI A PRO — SCANNER LOAD TEST
+# SYNTHETIC EXCHANGE | N SYMBOLS | LATENCY + ERROR INJECTION
+# =====================================================
+#
+# Menjalankan run_scanner() asli terhadap SyntheticFeed (pengganti
+# REST via exchange.set_feed) untuk beberapa ukuran universe.
+# Tiap ukuran = 1 subprocess baru (peak RSS & cache per proses bersih),
+# direktori kerja sementara, Telegram dry-run, clock ReplayClock(speed=1):
+# waktu proses nyata dihitung apa adanya, sleep antar cycle dilompati.
+#
+# Report per ukuran: waktu cycle (mean / max), symbol discan / ditunda,
+# slot terlewat, API call per endpoint, error injeksi, peak RSS,
+# ukuran file state (signal history, candle store, cache, ...).
+#
+#   python loadtest.py --sizes 100 500 1000 2000 --cycles 3 \
+#       --latency-ms 80 --latency-sigma 0.5 --error-rate 0.01
+
+import os
+import sys
+import json
+import time
+import zlib
+import random
+import argparse
+import resource
+import tempfile
+import threading
+import subprocess
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+RESULT_PREFIX = "LOADTEST_RESULT "
+
+
+# =====================================================
+# SYNTHETIC EXCHANGE
+# =====================================================
+class StandInError(Exception):
+    """Error injeksi (pengganti ccxt.NetworkError / 429)."""
+
+
+class SyntheticFeed:
+    """
+    OHLCV deterministik per symbol = fungsi waktu (konsisten lintas tf).
+    Latency lognormal (median latency_ms, sigma), error dengan peluang
+    error_rate, throttle ratelimit.limiter seperti REST asli (opsional).
+    """
+
+    def __init__(self, latency_ms=80.0, latency_sigma=0.5, error_rate=0.0,
+                 rate_limit=True, seed=7):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.calls = {}
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _call(self, endpoint):
+        with self._lock:
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+            delay = self._rng.lognormvariate(0, self.latency_sigma) * self.latency_ms / 1000
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.errors += 1
+
+        if self.rate_limit:
+            from ratelimit import limiter
+            limiter.acquire(endpoint)
+
+        time.sleep(delay)
+        if fail:
+            raise StandInError(f"injected {endpoint} error")
+
+    @staticmethod
+    def _bars(symbol, tf, start, n):
+        from resample import timeframe_ms
+
+        step = timeframe_ms(tf)
+        t = start + np.arange(n, dtype=np.int64) * step
+        seed = zlib.crc32(symbol.encode())
+        phase = (seed % 1000) / 1000 * 2 * np.pi
+        drift = ((seed >> 10) % 200 - 100) / 1e4
+
+        days = t / 86_400_000
+        level = 50 + (seed % 500)
+        close = level * np.exp(
+            drift * np.sin(days / 90 + phase) * 10
+            + 0.08 * np.sin(days / 7 + phase * 2)
+            + 0.02 * np.sin(days * 6 + phase * 3)
+        )
+        open_ = close * (1 - 0.002 * np.sin(days * 24 + phase))
+        wick = 0.004 * (1 + 0.5 * np.sin(days * 3 + phase))
+
+        return pd.DataFrame({
+            "t": t,
+            "open": open_,
+            "high": np.maximum(open_, close) * (1 + wick),
+            "low": np.minimum(open_, close) * (1 - wick),
+            "close": close,
+            "volume": 1000 * (1.5 + np.sin(days * 2 + phase))
+        })
+
+    def fetch_ohlcv(self, symbol, tf, limit):
+        import clock
+        from resample import bucket_start, timeframe_ms
+
+        self._call("candles")
+        last = int(bucket_start(clock.time_ms(), tf))
+        return self._bars(symbol, tf, last - (limit - 1) * timeframe_ms(tf), limit)
+
+    def fetch_ohlcv_since(self, symbol, tf, since=None, limit=300):
+        import clock
+        from resample import bucket_start, timeframe_ms
+
+        if since is None:
+            return self.fetch_ohlcv(symbol, tf, limit)
+
+        self._call("candles")
+        step = timeframe_ms(tf)
+        start = int(bucket_start(since, tf))
+        last = int(bucket_start(clock.time_ms(), tf))
+        n = max(min(limit, (last - start) // step + 1), 0)
+        return self._bars(symbol, tf, start, n)
+
+    def fetch_ticker(self, symbol):
+        df = self.fetch_ohlcv(symbol, "15m", 1)
+        return {"symbol": symbol, "last": float(df["close"].iloc[-1])}
+
+
+# =====================================================
+# WORKER (1 UKURAN UNIVERSE, PROSES TERPISAH)
+# =====================================================
+def _dir_size(path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for f in files:
+            total += os.path.getsize(os.path.join(root, f))
+    return total
+
+
+def run_worker(size, cycles, latency_ms, latency_sigma, error_rate, rate_limit, futures=15) -> dict:
+    os.environ["TELEGRAM_DRY_RUN"] = "1"
+
+    import clock
+    import logger
+    import exchange
+    import telegram_bot
+    from config import SIGNAL_LOG_FILE, CANDLE_DB_FILE
+    from scanner_bot import run_scanner, SCAN_INTERVAL
+
+    workdir = tempfile.mkdtemp(prefix="opsi_load_")
+    os.chdir(workdir)
+
+    symbols = [f"SYN{i:04d}/USDT" for i in range(size)]
+    fut = symbols[:min(futures, size)]
+
+    # 12:30 UTC = 19:30 WIB → sesi SPOT & FUTURES aktif
+    day = datetime.now(timezone.utc).replace(hour=12, minute=30, second=0, microsecond=0)
+    start = day.timestamp()
+
+    feed = SyntheticFeed(latency_ms, latency_sigma, error_rate, rate_limit)
+    exchange.set_feed(feed)
+    clock.set_clock(clock.ReplayClock(start, speed=1.0))
+
+    report = []
+    t0 = time.perf_counter()
+    run_scanner(
+        universe=lambda mode, cycle: fut if mode == "FUTURES" else symbols,
+        grid_symbols=lambda: symbols,
+        until=start + cycles * SCAN_INTERVAL - 1,
+        on_cycle=report.append
+    )
+    wall = time.perf_counter() - t0
+    logger.flush()
+
+    cyc = pd.DataFrame(report)
+    files = {
+        "signal_history": os.path.getsize(SIGNAL_LOG_FILE) if os.path.exists(SIGNAL_LOG_FILE) else 0,
+        "candles_db": os.path.getsize(CANDLE_DB_FILE) if os.path.exists(CANDLE_DB_FILE) else 0,
+        "workdir": _dir_size(workdir)
+    }
+
+    return {
+        "size": size,
+        "cycles": len(cyc),
+        "wall_sec": round(wall, 2),
+        "cycle_mean_sec": round(float(cyc["real_sec"].mean()), 2) if len(cyc) else None,
+        "cycle_max_sec": round(float(cyc["real_sec"].max()), 2) if len(cyc) else None,
+        "scanned": int(cyc["scanned"].sum()) if len(cyc) else 0,
+        "deferred": int(cyc["deferred"].sum()) if len(cyc) else 0,
+        "skipped_slots": int(cyc["skipped_slots"].sum()) if len(cyc) else 0,
+        "api_calls": dict(feed.calls),
+        "api_errors": feed.errors,
+        "signals": len(pd.read_csv(SIGNAL_LOG_FILE)) if os.path.exists(SIGNAL_LOG_FILE) else 0,
+        "telegram": len(telegram_bot.dry_run_outbox),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "files_bytes": files
+    }
+
+
+# =====================================================
+# DRIVER (SEMUA UKURAN)
+# =====================================================
+def run_load_test(sizes, cycles=3, latency_ms=80.0, latency_sigma=0.5,
+                  error_rate=0.0, rate_limit=True, verbose=False) -> pd.DataFrame:
+    rows = []
+
+    for size in sizes:
+        cmd = [
+            sys.executable, os.path.abspath(__file__), "--worker", str(size),
+            "--cycles", str(cycles),
+            "--latency-ms", str(latency_ms),
+            "--latency-sigma", str(latency_sigma),
+            "--error-rate", str(error_rate)
+        ]
+        if not rate_limit:
+            cmd.append("--no-rate-limit")
+
+        proc = subprocess.run(
+            cmd, capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        if verbose:
+            print(proc.stdout, proc.stderr, flush=True)
+
+        lines = [ln for ln in proc.stdout.splitlines() if ln.startswith(RESULT_PREFIX)]
+        if proc.returncode or not lines:
+            print(f"[LOADTEST ERROR] size {size}: exit {proc.returncode}\n{proc.stderr[-2000:]}", flush=True)
+            continue
+
+        res = json.loads(lines[-1][len(RESULT_PREFIX):])
+        calls = res.pop("api_calls")
+        files = res.pop("files_bytes")
+        res["api_calls"] = sum(calls.values())
+        res["api_calls_per_cycle"] = round(res["api_calls"] / max(res["cycles"], 1), 1)
+        res.update({f"{k}_mb": round(v / 1e6, 2) for k, v in files.items()})
+        rows.append(res)
+
+        print(
+            f"[LOADTEST] {size} symbols | cycle mean {res['cycle_mean_sec']}s "
+            f"max {res['cycle_max_sec']}s | deferred {res['deferred']} | "
+            f"API {res['api_calls']} | RSS {res['peak_rss_mb']} MB",
+            flush=True
+        )
+
+    return pd.DataFrame(rows)
+
+
+# =====================================================
+# CLI
+# =====================================================
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="OPSI A PRO scanner load test")
+    ap.add_argument("--sizes", nargs="*", type=int, default=[100, 500, 1000])
+    ap.add_argument("--cycles", type=int, default=3)
+    ap.add_argument("--latency-ms", type=float, default=80.0)
+    ap.add_argument("--latency-sigma", type=float, default=0.5)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--no-rate-limit", action="store_true")
+    ap.add_argument("--out", default=None, help="CSV report")
+    ap.add_argument("--verbose", action="store_true")
+    ap.add_argument("--worker", type=int, default=None, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.worker is not None:
+        res = run_worker(
+            args.worker, args.cycles, args.latency_ms, args.latency_sigma,
+            args.error_rate, not args.no_rate_limit
+        )
+        print(RESULT_PREFIX + json.dumps(res), flush=True)
+    else:
+        table = run_load_test(
+            args.sizes, args.cycles, args.latency_ms, args.latency_sigma,
+            args.error_rate, not args.no_rate_limit, args.verbose
+        )
+        print(table.to_string(index=False))
+        if args.out:
+            table.to_csv(args.out, index=False)
@@ -1,9 +1,201 @@
 # =====================================================
-# SIMPLE LOGGER — RENDER FRIENDLY
+# OPSI A PRO — STRUCTURED LOGGER
+# JSON LINES | BACKGROUND BUFFERED WRITER | SAMPLING | LEVEL FILTER
 # =====================================================
+#
+# Hot path hanya: cek level → cek sampling → 1 put ke queue.
+# Format JSON + write + flush dikerjakan thread writer per batch
+# (max 1x flush per LOG_FLUSH_SEC), ke stdout dan / atau LOG_FILE.
+#
+#   log = get_logger("scanner")
+#   log.info("signal", symbol="BTC/USDT", score=82, msg="✅ SIGNAL BTC/USDT")
+#   log.info("cooldown_hit", symbol=s)      # sampled (LOG_SAMPLE_EVERY)
+#
+# 1 baris = {"ts", "level", "logger", "event", ...fields}
+# → grep / jq langsung: jq 'select(.event=="signal")' opsi_log.jsonl
+#
+# Scanner dan app menulis ke LOG_FILE yang sama: fd O_APPEND, tiap
+# os.write hanya berisi baris utuh (≤ PIPE_BUF per write kecuali 1
+# baris yang lebih panjang) → baris dua proses tidak saling terpotong.
 
-from datetime import datetime
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import itertools
+import threading
+from datetime import datetime, timezone
 
+import clock
+from config import (
+    LOG_LEVEL,
+    LOG_STDOUT,
+    LOG_FILE,
+    LOG_FLUSH_SEC,
+    LOG_QUEUE_MAX,
+    LOG_SAMPLE_EVERY
+)
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+
+PIPE_BUF = 4096         # batas write atomik POSIX (ukuran chunk per os.write)
+
+
+# =====================================================
+# WRITER (THREAD DAEMON)
+# =====================================================
+class JsonLineWriter:
+    def __init__(self, stdout=LOG_STDOUT, path=LOG_FILE, flush_sec=LOG_FLUSH_SEC):
+        self.stdout = stdout
+        self.path = path
+        self.flush_sec = flush_sec
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=LOG_QUEUE_MAX)
+        self._fd = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def put(self, record: tuple):
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        """Tunggu semua record di queue tertulis."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="log-writer", daemon=True
+                    )
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            # kumpulkan max LOG_FLUSH_SEC → 1 write + 1 flush per batch
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_sec
+
+            while len(batch) < 1000:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                self._write([_format(r) for r in batch])
+            except Exception as e:
+                sys.stderr.write(f"[LOGGER ERROR] {e}\n")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, lines: list):
+        if self.stdout:
+            sys.stdout.write("".join(lines))
+            sys.stdout.flush()
+
+        if self.path:
+            if self._fd is None:
+                self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+            chunk = b""
+            for line in lines:
+                data = line.encode("utf-8")
+                if chunk and len(chunk) + len(data) > PIPE_BUF:
+                    _write_all(self._fd, chunk)
+                    chunk = b""
+                chunk += data
+            if chunk:
+                _write_all(self._fd, chunk)
+
+
+def _write_all(fd: int, data: bytes):
+    # file regular: normalnya 1 os.write, loop hanya untuk write parsial
+    while data:
+        data = data[os.write(fd, data):]
+
+
+def _format(record: tuple) -> str:
+    ts, level, name, event, fields = record
+    row = {
+        "ts": datetime.fromtimestamp(ts, timezone.utc).isoformat(timespec="milliseconds"),
+        "level": level,
+        "logger": name,
+        "event": event
+    }
+    row.update(fields)
+    return json.dumps(row, ensure_ascii=False, default=str) + "\n"
+
+
+_writer = JsonLineWriter()
+atexit.register(_writer.flush)
+
+
+# =====================================================
+# LOGGER
+# =====================================================
+class Logger:
+    def __init__(self, name: str, level=LOG_LEVEL, sample_every=None):
+        self.name = name
+        self.level = LEVELS[level]
+        self.sample_every = dict(LOG_SAMPLE_EVERY if sample_every is None else sample_every)
+        self._counters = {}
+
+    def _emit(self, level: str, event: str, fields: dict):
+        if LEVELS[level] < self.level:
+            return
+
+        every = self.sample_every.get(event)
+        if every:
+            counter = self._counters.get(event)
+            if counter is None:
+                counter = self._counters.setdefault(event, itertools.count())
+            if next(counter) % every:
+                return
+            fields["sampled"] = every
+
+        _writer.put((clock.time(), level, self.name, event, fields))
+
+    def debug(self, event: str, **fields):
+        self._emit("DEBUG", event, fields)
+
+    def info(self, event: str, **fields):
+        self._emit("INFO", event, fields)
+
+    def warning(self, event: str, **fields):
+        self._emit("WARNING", event, fields)
+
+    def error(self, event: str, **fields):
+        self._emit("ERROR", event, fields)
+
+
+_loggers = {}
+
+
+def get_logger(name: str) -> Logger:
+    if name not in _loggers:
+        _loggers[name] = Logger(name)
+    return _loggers[name]
+
+
+def flush():
+    _writer.flush()
+
+
+# =====================================================
+# LEGACY: log("teks bebas")
+# =====================================================
 def log(msg: str):
-    now = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{now}] {msg}", flush=True)
+    get_logger("app").info("message", msg=msg)
@@ -4,23 +4,35 @@
 import numpy as np
 import pandas as pd
 
-def run_monte_carlo(trade_results_df, signal_df, risk_pct, trades, runs=500):
+def run_monte_carlo(
+    trade_results_df,
+    signal_df=None,
+    risk_pct=0.01,
+    trades=300,
+    runs=500,
+    mode="SPOT",
+    phase="AKUMULASI"
+):
     """
     trade_results_df: dataframe with column ["Symbol","R"]
+                      (+ "Phase","Mode" → signal_df tidak dipakai)
     signal_df: signal history
+    mode / phase: filter trade (None = semua), default SPOT + akumulasi
     """
 
-    # hanya SPOT + fase akumulasi
-    mc = trade_results_df.merge(
-        signal_df[["Symbol","Phase","Mode"]],
-        on="Symbol",
-        how="left"
-    )
-
-    mc = mc[
-        (mc["Mode"] == "SPOT") &
-        (mc["Phase"].str.contains("AKUMULASI", na=False))
-    ]
+    if {"Phase", "Mode"}.issubset(trade_results_df.columns):
+        mc = trade_results_df
+    else:
+        mc = trade_results_df.merge(
+            signal_df[["Symbol","Phase","Mode"]],
+            on="Symbol",
+            how="left"
+        )
+
+    if mode is not None:
+        mc = mc[mc["Mode"] == mode]
+    if phase is not None:
+        mc = mc[mc["Phase"].str.contains(phase, na=False)]
 
     if len(mc) < 10:
         return None
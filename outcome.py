@@ -0,0 +1,216 @@
+# =====================================================
+# OPSI A PRO — TRADE OUTCOME RESOLVER
+# INTRABAR TP / SL | 5M FIRST TOUCH | 1M TIE-BREAK
+# =====================================================
+#
+# Per symbol 1x load candle OUTCOME_TF sejak signal aktif tertua
+# (tersimpan di candle store → cycle berikutnya hanya bar baru).
+# Path per signal:
+#   1m dari menit signal s/d akhir bar 5m-nya  (tanpa wick sebelum entry)
+#   + bar 5m berikutnya
+# Bar 5m tempat TP1 / exit terjadi dipecah ke 1m lalu di-resolve
+# ulang → hit time presisi 1m, dan SL vs target di bar 5m yang sama
+# diputuskan urutan 1m-nya (kalau masih 1 bar 1m → SL dulu).
+
+import os
+import numpy as np
+import pandas as pd
+
+import clock
+from config import OUTCOME_TF, OUTCOME_FINE_TF, TRADE_RESULT_FILE
+from candle_store import load_range
+from resample import bucket_start, timeframe_ms
+from backtest import resolve_trade
+from logger import get_logger
+
+log = get_logger("outcome")
+
+RESULT_COLUMNS = [
+    "Symbol",
+    "Mode",
+    "Phase",
+    "Direction",
+    "TimeUTC",
+    "Entry",
+    "SL",
+    "TP1",
+    "TP2",
+    "Status",
+    "TP1Time",
+    "ExitTime",
+    "ExitPrice",
+    "MFE_R",
+    "MAE_R",
+    "R"
+]
+
+MAX_REFINE = 3
+
+
+def to_ms(values) -> np.ndarray:
+    ts = pd.to_datetime(pd.Series(values), utc=True, format="ISO8601")
+    return ((ts - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(milliseconds=1)).to_numpy()
+
+
+def _iso(ms):
+    if ms is None:
+        return None
+    return pd.Timestamp(int(ms), unit="ms", tz="UTC").isoformat()
+
+
+# =====================================================
+# PATH 1 SIGNAL
+# =====================================================
+def _path(symbol, signal_ms, c5, now_ms):
+    step = timeframe_ms(OUTCOME_TF)
+    next_bar = int(bucket_start(signal_ms, OUTCOME_TF)) + step
+
+    head = load_range(
+        symbol,
+        OUTCOME_FINE_TF,
+        int(bucket_start(signal_ms, OUTCOME_FINE_TF)),
+        next_bar,
+        now_ms
+    )
+    tail = c5[c5["t"] >= next_bar]
+
+    return (
+        np.r_[head["t"].to_numpy(np.int64), tail["t"].to_numpy(np.int64)],
+        np.r_[head["high"].to_numpy(float), tail["high"].to_numpy(float)],
+        np.r_[head["low"].to_numpy(float), tail["low"].to_numpy(float)],
+        np.r_[np.ones(len(head), bool), np.zeros(len(tail), bool)]
+    )
+
+
+def _coarse_hits(res, t, fine) -> list:
+    """Index bar 5m berisi hit TP1 / exit → dipecah ke 1m (hit time presisi)."""
+    hits = []
+
+    if res["ExitIndex"] is not None:
+        hits.append(res["ExitIndex"])
+    if res["TP1Time"] is not None:
+        hits.append(int(np.searchsorted(t, res["TP1Time"])))
+
+    return sorted({k for k in hits if not fine[k]}, reverse=True)
+
+
+def resolve_signal(symbol, signal_ms, c5, direction, entry, sl, tp1, tp2, now_ms):
+    """
+    First touch SL / TP1 / TP2 sejak signal_ms (None kalau belum ada bar).
+    Bar 5m hit di-refine ke 1m; SL & target di bar 1m yang sama → SL.
+    """
+    t, high, low, fine = _path(symbol, signal_ms, c5, now_ms)
+    if not len(t):
+        return None
+
+    step = timeframe_ms(OUTCOME_TF)
+
+    for _ in range(MAX_REFINE):
+        res = resolve_trade(t, high, low, 0, direction, entry, sl, tp1, tp2)
+        hits = _coarse_hits(res, t, fine)
+        if not hits:
+            break
+
+        for k in hits:
+            c1 = load_range(
+                symbol, OUTCOME_FINE_TF, int(t[k]), int(t[k]) + step, now_ms
+            )
+            if c1.empty:
+                fine[k] = True      # tidak ada data 1m → pakai bar 5m
+                continue
+
+            t = np.r_[t[:k], c1["t"].to_numpy(np.int64), t[k + 1:]]
+            high = np.r_[high[:k], c1["high"].to_numpy(float), high[k + 1:]]
+            low = np.r_[low[:k], c1["low"].to_numpy(float), low[k + 1:]]
+            fine = np.r_[fine[:k], np.ones(len(c1), bool), fine[k + 1:]]
+    else:
+        res = resolve_trade(t, high, low, 0, direction, entry, sl, tp1, tp2)
+
+    return res
+
+
+# =====================================================
+# BATCH (SEMUA SIGNAL AKTIF)
+# =====================================================
+def resolve_outcomes(signals: pd.DataFrame, now_ms=None) -> dict:
+    """
+    signals: baris signal history (Symbol, TimeUTC, Direction,
+    Entry, SL, TP1, TP2). Return {index: hasil resolve_trade}.
+    """
+    if signals.empty:
+        return {}
+
+    now_ms = now_ms or clock.time_ms()
+    step = timeframe_ms(OUTCOME_TF)
+    end = int(bucket_start(now_ms, OUTCOME_TF)) + step
+
+    signals = signals.assign(_ms=to_ms(signals["TimeUTC"]))
+    out = {}
+
+    for symbol, g in signals.groupby("Symbol"):
+        try:
+            start = int(bucket_start(g["_ms"].min(), OUTCOME_TF))
+            c5 = load_range(symbol, OUTCOME_TF, start, end, now_ms)
+
+            for i, row in g.iterrows():
+                res = resolve_signal(
+                    symbol,
+                    int(row["_ms"]),
+                    c5,
+                    row["Direction"],
+                    float(row["Entry"]),
+                    float(row["SL"]),
+                    float(row["TP1"]),
+                    float(row["TP2"]),
+                    now_ms
+                )
+                if res is not None:
+                    out[i] = res
+
+        except Exception as e:
+            log.error("outcome_error", symbol=symbol, error=str(e))
+
+    return out
+
+
+# =====================================================
+# TRADE RESULT FILE
+# =====================================================
+def trade_result_row(signal: dict, res: dict) -> dict:
+    row = {c: signal.get(c) for c in RESULT_COLUMNS}
+    row.update({
+        "Status": res["Status"],
+        "TP1Time": _iso(res["TP1Time"]),
+        "ExitTime": _iso(res["ExitTime"]),
+        "ExitPrice": res["ExitPrice"],
+        "MFE_R": round(res["MFE_R"], 4),
+        "MAE_R": round(res["MAE_R"], 4),
+        "R": round(res["R"], 4)
+    })
+    return row
+
+
+def append_trade_results(rows: list) -> int:
+    if not rows:
+        return 0
+
+    new = pd.DataFrame(rows, columns=RESULT_COLUMNS)
+
+    if not os.path.exists(TRADE_RESULT_FILE):
+        new.to_csv(TRADE_RESULT_FILE, index=False)
+        return len(new)
+
+    header = pd.read_csv(TRADE_RESULT_FILE, nrows=0).columns
+
+    if set(RESULT_COLUMNS) - set(header):
+        # file format lama → rewrite 1x dengan kolom lengkap
+        old = pd.read_csv(TRADE_RESULT_FILE)
+        pd.concat([old, new], ignore_index=True).to_csv(
+            TRADE_RESULT_FILE, index=False
+        )
+    else:
+        new.reindex(columns=header).to_csv(
+            TRADE_RESULT_FILE, mode="a", header=False, index=False
+        )
+
+    return len(new)
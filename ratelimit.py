@@ -0,0 +1,71 @@
+# =====================================================
+# OPSI A PRO — RATE LIMITER
+# WEIGHTED TOKEN BUCKET PER ENDPOINT | THREAD + ASYNCIO SAFE
+# =====================================================
+#
+# Setiap endpoint OKX punya bucket sendiri (lihat OKX_RATE_LIMITS).
+# Token boleh minus = reservasi: caller dapat jatah waktu sendiri
+# di bawah lock, lalu tidur di luar lock → urutan FIFO, tidak ada
+# busy loop, dan tidak ada request yang keluar lebih cepat dari limit.
+
+import time
+import asyncio
+import threading
+
+from config import OKX_RATE_LIMITS
+
+
+class TokenBucket:
+    """
+    limit request per period detik, burst maksimum `burst`.
+    Refill = (limit - burst) / period → dalam window `period` manapun
+    total request tidak pernah melebihi `limit`.
+    """
+
+    def __init__(self, limit: int, period: float, burst: int = 1):
+        burst = max(1, min(burst, limit - 1))
+        self.capacity = float(burst)
+        self.rate = (limit - burst) / period
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, weight: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity,
+                self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            self.tokens -= weight
+
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self, weight: float = 1):
+        wait = self._reserve(weight)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, weight: float = 1):
+        wait = self._reserve(weight)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class RateLimiter:
+    def __init__(self, limits: dict):
+        self.buckets = {
+            name: TokenBucket(*spec)
+            for name, spec in limits.items()
+        }
+
+    def acquire(self, endpoint: str, weight: float = 1):
+        self.buckets[endpoint].acquire(weight)
+
+    async def acquire_async(self, endpoint: str, weight: float = 1):
+        await self.buckets[endpoint].acquire_async(weight)
+
+
+# shared 1 per proses (semua thread / event loop)
+limiter = RateLimiter(OKX_RATE_LIMITS)
@@ -1,61 +1,163 @@
 # =====================================================
 # OPSI A PRO — MARKET REGIME
 # =====================================================
-from indicators import accumulation_distribution
+import numpy as np
+import pandas as pd
+
+from config import ATR_PERIOD, SUPERTREND_MULT
+from indicators import accumulation_distribution, supertrend, daily_ema_at, ema
+from scoring import institutional_score_series
+
+
+def classify_regime(price, ema200, adl_now, adl_prev, structure, volume):
+    """
+    Klasifikasi regime elementwise (scalar / array).
+    Urutan rule = urutan prioritas.
+    """
+    price, ema200 = np.asarray(price), np.asarray(ema200)
+    adl_now, adl_prev = np.asarray(adl_now), np.asarray(adl_prev)
+    structure, volume = np.asarray(structure), np.asarray(volume)
+
+    return np.select(
+        [
+            # CHOP / NO TRADE
+            (structure < 40) & (volume < 20),
+            # MARKDOWN
+            (price < ema200) & (adl_now < adl_prev),
+            # DISTRIBUTION
+            (price > ema200) & (adl_now < adl_prev),
+            # MARKUP
+            (price > ema200) & (adl_now > adl_prev)
+        ],
+        [
+            "REGIME_CHOP",
+            "REGIME_MARKDOWN",
+            "REGIME_DISTRIBUTION",
+            "REGIME_MARKUP"
+        ],
+        # DEFAULT
+        default="REGIME_ACCUMULATION"
+    )
+
 
 def detect_market_regime(df4h, df1d, score):
     price = df1d.close.iloc[-1]
-    ema200 = df1d.close.ewm(span=200).mean().iloc[-1]
+    ema200 = ema(df1d, 200).iloc[-1]
     adl = accumulation_distribution(df4h)
 
-    structure = score["StructureScore"]
-    volume = score["VolumeScore"]
-
-    # =========================
-    # CHOP / NO TRADE
-    # =========================
-    if structure < 40 and volume < 20:
-        return "REGIME_CHOP"
+    return str(classify_regime(
+        price,
+        ema200,
+        adl.iloc[-1],
+        adl.iloc[-20],
+        score["StructureScore"],
+        score["VolumeScore"]
+    ))
 
-    # =========================
-    # MARKDOWN
-    # =========================
-    if price < ema200 and adl.iloc[-1] < adl.iloc[-20]:
-        return "REGIME_MARKDOWN"
 
-    # =========================
-    # DISTRIBUTION
-    # =========================
-    if price > ema200 and adl.iloc[-1] < adl.iloc[-20]:
-        return "REGIME_DISTRIBUTION"
+def market_regime_panel(scores):
+    """
+    Regime untuk semua symbol dari output institutional_score_panel.
+    """
+    return classify_regime(
+        scores["DailyClose"].to_numpy(),
+        scores["EMA200"].to_numpy(),
+        scores["ADLDelta20"].to_numpy(),
+        0.0,
+        scores["StructureScore"].to_numpy(),
+        scores["VolumeScore"].to_numpy()
+    )
 
-    # =========================
-    # MARKUP
-    # =========================
-    if price > ema200 and adl.iloc[-1] > adl.iloc[-20]:
-        return "REGIME_MARKUP"
 
-    # =========================
-    # DEFAULT
-    # =========================
-    return "REGIME_ACCUMULATION"
+SHIFT_MESSAGES = {
+    "SHIFT_TO_MARKDOWN": "⚠️ Distribution → Markdown (Institutional Exit)",
+    "SHIFT_TO_MARKUP": "🚀 Accumulation → Markup (Institutional Entry)"
+}
 
 
 def detect_regime_shift(df4h, df1d):
     adl = accumulation_distribution(df4h)
-    ema200 = df1d.close.ewm(span=200).mean().iloc[-1]
+    ema200 = ema(df1d, 200).iloc[-1]
     price = df1d.close.iloc[-1]
 
     if adl.iloc[-1] < adl.iloc[-30] and price < ema200:
         return {
             "Type": "SHIFT_TO_MARKDOWN",
-            "Message": "⚠️ Distribution → Markdown (Institutional Exit)"
+            "Message": SHIFT_MESSAGES["SHIFT_TO_MARKDOWN"]
         }
 
     if adl.iloc[-1] > adl.iloc[-30] and price > ema200:
         return {
             "Type": "SHIFT_TO_MARKUP",
-            "Message": "🚀 Accumulation → Markup (Institutional Entry)"
+            "Message": SHIFT_MESSAGES["SHIFT_TO_MARKUP"]
         }
 
     return None
+
+
+# =====================================================
+# FULL HISTORY TIMELINE (VECTORIZED)
+# =====================================================
+def regime_timeline(df4h, df1d, period=ATR_PERIOD, mult=SUPERTREND_MULT):
+    """
+    Regime + regime shift untuk SETIAP bar 4h dalam 1 pass, O(n).
+    Baris ke-i = detect_market_regime / detect_regime_shift yang
+    dipanggil dengan data s/d bar i (direction dari supertrend).
+    Bar warm-up (< 30 bar / belum ada daily) → None (kolom Regime /
+    Shift dtype object; pandas 3 tanpa dtype eksplisit mengubah None
+    jadi NaN di kolom str).
+    """
+    _, trend = supertrend(df4h, period=period, mult=mult)
+    direction = np.where(trend.to_numpy() == 1, "LONG", "SHORT")
+
+    score = institutional_score_series(df4h, df1d, direction)
+
+    price = df4h.close.to_numpy(dtype=float)
+    ema200 = daily_ema_at(df4h, df1d, 200).to_numpy()
+    adl = accumulation_distribution(df4h)
+    d20 = (adl - adl.shift(19)).to_numpy()
+    d30 = (adl - adl.shift(29)).to_numpy()
+
+    regime = classify_regime(
+        price, ema200, d20, 0.0,
+        score["StructureScore"].to_numpy(),
+        score["VolumeScore"].to_numpy()
+    ).astype(object)
+
+    shift = np.select(
+        [(d30 < 0) & (price < ema200), (d30 > 0) & (price > ema200)],
+        ["SHIFT_TO_MARKDOWN", "SHIFT_TO_MARKUP"],
+        default=""
+    ).astype(object)
+    shift[shift == ""] = None
+
+    warmup = (np.arange(len(df4h)) < 29) | np.isnan(ema200)
+    regime[warmup] = None
+    shift[warmup] = None
+
+    return pd.DataFrame({
+        "t": df4h.t.to_numpy(),
+        "Direction": direction,
+        "Score": score["TotalScore"].to_numpy(),
+        "Regime": pd.Series(regime, index=df4h.index, dtype=object),
+        "Shift": pd.Series(shift, index=df4h.index, dtype=object)
+    }, index=df4h.index)
+
+
+def regime_bands(timeline):
+    """
+    Gabung bar berurutan dengan regime sama → (start_t, end_t, Regime)
+    untuk chart band regime.
+    """
+    tl = timeline.dropna(subset=["Regime"])
+    if tl.empty:
+        return pd.DataFrame(columns=["Start", "End", "Regime"])
+
+    new_band = tl["Regime"].ne(tl["Regime"].shift())
+    band_id = new_band.cumsum()
+
+    return tl.groupby(band_id).agg(
+        Start=("t", "first"),
+        End=("t", "last"),
+        Regime=("Regime", "first")
+    ).reset_index(drop=True)
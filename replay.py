@@ -0,0 +1,218 @@
+# =====================================================
+# OPSI A PRO — DAY REPLAY (ACCELERATED CLOCK)
+# STORED CANDLES | VIRTUAL TIME | DRY-RUN TELEGRAM | CYCLE REPORT
+# =====================================================
+#
+# Menjalankan run_scanner() sepanjang 1 hari tercatat (UTC) dengan
+# ReplayClock (default 100×) dan StoreFeed (candle store sebagai
+# pengganti REST, dipotong di waktu virtual → tanpa lookahead).
+# Session gate, cooldown, daily summary, auto close ikut waktu virtual.
+#
+# Semua file state (signal history, cooldown, grid, ...) ditulis di
+# direktori kerja sementara → data live tidak tersentuh.
+# Cache per proses (candle sync, level index, score memo) ikut proses →
+# jalankan sebagai proses terpisah:
+#
+#   python replay.py --day 2026-10-01 --speed 200 --symbols BTC/USDT ETH/USDT
+
+import os
+import time
+import sqlite3
+import argparse
+import tempfile
+from contextlib import closing
+from datetime import datetime, timezone
+
+import pandas as pd
+
+import clock
+from config import CANDLE_DB_FILE, BASE_TF, FUTURES_BIG_COINS, SIGNAL_LOG_FILE
+from resample import timeframe_ms, is_derivable, bucket_start, resample_ohlcv
+
+COLS = ["t", "open", "high", "low", "close", "volume"]
+
+
+# =====================================================
+# FEED DARI CANDLE STORE (AS-OF WAKTU VIRTUAL)
+# =====================================================
+class StoreFeed:
+    """
+    Pengganti fetch_ohlcv / fetch_ohlcv_since / fetch_ticker.
+    Hanya bar BASE_TF yang sudah close di waktu virtual yang terlihat;
+    bar tf lebih besar yang masih berjalan dibangun dari bar base tsb.
+    tf lebih kecil dari BASE_TF yang tidak tersimpan (5m / 1m outcome)
+    = bar base dipecah rata (high / low sama) → resolusi hit 15m.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = os.path.abspath(db_path)
+
+    def _query(self, sql, params):
+        with closing(sqlite3.connect(self.db_path, timeout=30)) as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    def symbols(self) -> list:
+        df = self._query(
+            "SELECT DISTINCT symbol FROM candles WHERE tf = ?", [BASE_TF]
+        )
+        return df["symbol"].tolist()
+
+    def _closed(self, symbol, tf, since, until_t):
+        """Bar tf tersimpan dengan since <= t < until_t, urut naik."""
+        return self._query(
+            "SELECT t, open, high, low, close, volume FROM candles "
+            "WHERE symbol = ? AND tf = ? AND t >= ? AND t < ? ORDER BY t",
+            [symbol, tf, int(since), int(until_t)]
+        )
+
+    def _bars(self, symbol, tf, since=0):
+        now_ms = clock.time_ms()
+        step, base_step = timeframe_ms(tf), timeframe_ms(BASE_TF)
+
+        # bar close: t + step <= now_ms (tanpa asumsi alignment bucket)
+        base_end = now_ms - base_step + 1
+
+        if tf == BASE_TF:
+            return self._closed(symbol, tf, since, base_end)
+
+        if step < base_step:
+            have = self._closed(symbol, tf, since, now_ms - step + 1)
+            if len(have):
+                return have
+            base = self._closed(symbol, BASE_TF, bucket_start(since, BASE_TF), base_end)
+            return self._expand(base, tf).loc[lambda d: d["t"] >= since]
+
+        running = int(bucket_start(now_ms, tf))
+        df = self._closed(symbol, tf, since, min(running, now_ms - step + 1))
+
+        if is_derivable(tf, BASE_TF):
+            part = self._closed(symbol, BASE_TF, max(running, since), base_end)
+            if len(part):
+                df = pd.concat([df, resample_ohlcv(part, tf)], ignore_index=True)
+
+        return df
+
+    @staticmethod
+    def _expand(base, tf):
+        k = timeframe_ms(BASE_TF) // timeframe_ms(tf)
+        out = base.loc[base.index.repeat(k)].reset_index(drop=True)
+        out["t"] = out["t"] + (out.index % k) * timeframe_ms(tf)
+        out["volume"] = out["volume"] / k
+        return out[COLS]
+
+    def fetch_ohlcv(self, symbol, tf, limit):
+        since = clock.time_ms() - (limit + 1) * timeframe_ms(tf)
+        return self._bars(symbol, tf, since).tail(limit).reset_index(drop=True)
+
+    def fetch_ohlcv_since(self, symbol, tf, since=None, limit=300):
+        if since is None:
+            return self.fetch_ohlcv(symbol, tf, limit)
+        return self._bars(symbol, tf, since).head(limit).reset_index(drop=True)
+
+    def fetch_ticker(self, symbol):
+        df = self.fetch_ohlcv(symbol, BASE_TF, 1)
+        last = float(df["close"].iloc[-1]) if len(df) else None
+        return {"symbol": symbol, "last": last}
+
+
+# =====================================================
+# REPLAY 1 HARI
+# =====================================================
+def replay_day(day, symbols=None, futures=None, speed=100.0,
+               source_db=CANDLE_DB_FILE, workdir=None) -> dict:
+    """
+    day = "YYYY-MM-DD" (UTC). symbols = universe SPOT (default: semua
+    symbol di store), futures = universe FUTURES (default: FUTURES_BIG_COINS
+    yang ada di store).
+    Return {"cycles": DataFrame, "signals": DataFrame, "telegram": [str], "workdir": str}.
+    """
+    os.environ["TELEGRAM_DRY_RUN"] = "1"
+
+    feed = StoreFeed(source_db)
+    stored = feed.symbols()
+    symbols = symbols or stored
+    futures = futures if futures is not None else [s for s in FUTURES_BIG_COINS if s in stored]
+
+    start = datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()
+    workdir = workdir or tempfile.mkdtemp(prefix="opsi_replay_")
+    home = os.getcwd()
+
+    # import setelah env dry-run di-set
+    import logger
+    import exchange
+    import telegram_bot
+    from scanner_bot import run_scanner
+
+    cycles = []
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+    clock.set_clock(clock.ReplayClock(start, speed))
+    exchange.set_feed(feed)
+
+    try:
+        run_scanner(
+            universe=lambda mode, cycle: futures if mode == "FUTURES" else symbols,
+            grid_symbols=lambda: list(dict.fromkeys(futures + symbols)),
+            until=start + 86400,
+            on_cycle=cycles.append
+        )
+        signals = (
+            pd.read_csv(SIGNAL_LOG_FILE)
+            if os.path.exists(SIGNAL_LOG_FILE) else pd.DataFrame()
+        )
+    finally:
+        logger.flush()
+        exchange.set_feed(None)
+        clock.set_clock(None)
+        os.chdir(home)
+
+    report = pd.DataFrame(cycles)
+    if len(report):
+        report.insert(1, "TimeUTC", pd.to_datetime(report["start"], unit="s", utc=True))
+
+    return {
+        "cycles": report,
+        "signals": signals,
+        "telegram": list(telegram_bot.dry_run_outbox),
+        "workdir": workdir
+    }
+
+
+# =====================================================
+# CLI
+# =====================================================
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="OPSI A PRO 1-day scanner replay")
+    ap.add_argument("--day", required=True, help="YYYY-MM-DD (UTC)")
+    ap.add_argument("--symbols", nargs="*", default=None)
+    ap.add_argument("--futures", nargs="*", default=None)
+    ap.add_argument("--speed", type=float, default=100.0, help="0 = hanya lompat saat sleep")
+    ap.add_argument("--db", default=CANDLE_DB_FILE)
+    ap.add_argument("--out", default=None, help="direktori output report CSV")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    res = replay_day(args.day, args.symbols, args.futures, args.speed, args.db)
+    real = time.perf_counter() - t0
+
+    cycles = res["cycles"]
+    print(f"\n[REPLAY] {args.day} — {len(cycles)} cycles in {real:.1f}s real "
+          f"({86400 / max(real, 1e-9):.0f}× wall clock)")
+
+    if len(cycles):
+        print(f"[REPLAY] cycle real sec: mean {cycles['real_sec'].mean():.2f}, "
+              f"max {cycles['real_sec'].max():.2f} | "
+              f"scanned {cycles['scanned'].sum()}, deferred {cycles['deferred'].sum()}, "
+              f"skipped slots {cycles['skipped_slots'].sum()}")
+
+    print(f"[REPLAY] signals: {len(res['signals'])}, telegram (dry run): {len(res['telegram'])}")
+    if len(res["signals"]):
+        print(res["signals"][["TimeUTC", "Symbol", "Mode", "Direction", "Score", "Entry", "Status"]]
+              .to_string(index=False))
+
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+        cycles.to_csv(os.path.join(args.out, "replay_cycles.csv"), index=False)
+        res["signals"].to_csv(os.path.join(args.out, "replay_signals.csv"), index=False)
+
+    print(f"[REPLAY] workdir: {res['workdir']}")
@@ -0,0 +1,62 @@
+# =====================================================
+# OPSI A PRO — OHLCV RESAMPLING
+# BASE FEED → HTF | EXCHANGE-ALIGNED BUCKETS
+# =====================================================
+import numpy as np
+import pandas as pd
+
+from config import EXCHANGE_BAR_OFFSET_HOURS
+
+UNIT_MS = {
+    "m": 60_000,
+    "h": 3_600_000,
+    "d": 86_400_000,
+    "w": 604_800_000
+}
+
+OFFSET_MS = EXCHANGE_BAR_OFFSET_HOURS * UNIT_MS["h"]
+
+
+def timeframe_ms(tf: str) -> int:
+    return int(tf[:-1]) * UNIT_MS[tf[-1].lower()]
+
+
+def is_derivable(tf: str, base_tf: str) -> bool:
+    tf_ms, base_ms = timeframe_ms(tf), timeframe_ms(base_tf)
+    return tf_ms >= base_ms and tf_ms % base_ms == 0
+
+
+def bucket_start(t, tf: str):
+    """
+    Open time (ms) bucket `tf` yang memuat timestamp t.
+    Bucket mengikuti jam exchange (UTC + EXCHANGE_BAR_OFFSET_HOURS).
+    """
+    ms = timeframe_ms(tf)
+    return (np.asarray(t, dtype=np.int64) + OFFSET_MS) // ms * ms - OFFSET_MS
+
+
+def resample_ohlcv(df, tf: str):
+    """
+    df: kolom t, open, high, low, close, volume (t ms, urut naik).
+    Return OHLCV tf dengan format sama. Bucket terakhir boleh parsial
+    (sama seperti candle berjalan dari exchange).
+    """
+    cols = ["t", "open", "high", "low", "close", "volume"]
+
+    if df.empty:
+        return pd.DataFrame(columns=cols)
+
+    t = df["t"].to_numpy(dtype=np.int64)
+    bucket = bucket_start(t, tf)
+
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(t)] - 1
+
+    return pd.DataFrame({
+        "t": bucket[starts],
+        "open": df["open"].to_numpy(dtype=float)[starts],
+        "high": np.maximum.reduceat(df["high"].to_numpy(dtype=float), starts),
+        "low": np.minimum.reduceat(df["low"].to_numpy(dtype=float), starts),
+        "close": df["close"].to_numpy(dtype=float)[ends],
+        "volume": np.add.reduceat(df["volume"].to_numpy(dtype=float), starts)
+    })
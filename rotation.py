@@ -0,0 +1,142 @@
+# =====================================================
+# OPSI A PRO — ROTATION TRACKER
+# RING BUFFER PER SYMBOL | MULTI HORIZON (WAKTU) | SORTED TOP-K
+# =====================================================
+#
+# update(snapshot, ms) per snapshot:
+#   - (ms, score) masuk ke buffer per symbol (dipangkas ke window
+#     horizon terbesar + 1 bar)
+#   - delta horizon h = score sekarang − score symbol di snapshot
+#     terakhir pada / sebelum ms − h × ENTRY_TF (berbasis waktu,
+#     bukan jumlah snapshot per symbol; snapshot terlewat tetap aman)
+#   - symbol yang tidak ada di snapshot ini dikeluarkan dari delta
+#   - top-K gainers / losers per horizon lewat heap berukuran K
+#     (heapq.nlargest / nsmallest): O(n log K) per snapshot, bukan
+#     index terurut penuh (delta semua symbol berubah tiap snapshot)
+# Query (gainers / losers / rotating_in) hanya baca list K tersimpan.
+
+import heapq
+from collections import deque
+
+import pandas as pd
+
+from config import ENTRY_TF, ROTATION_HORIZONS, ROTATION_TOP_K
+from resample import timeframe_ms
+
+STEP_MS = timeframe_ms(ENTRY_TF)
+
+
+class RotationTracker:
+    def __init__(self, horizons=ROTATION_HORIZONS, k=ROTATION_TOP_K):
+        self.horizons = tuple(sorted(horizons))
+        self.k = k
+        self.size = self.horizons[-1] + 1
+        self.window_ms = (self.horizons[-1] + 1) * STEP_MS
+
+        self.scores = {}          # symbol → deque (ms, score)
+        self.info = {}            # symbol → (Direction, Regime) terakhir
+        self.delta = {h: {} for h in self.horizons}
+        self.top = {h: [] for h in self.horizons}        # K (d, symbol) terbesar, turun
+        self.bottom = {h: [] for h in self.horizons}     # K (d, symbol) terkecil, naik
+        self.last_time = None
+
+    # =========================
+    # UPDATE
+    # =========================
+    def update(self, snapshot: pd.DataFrame, ms=None):
+        """
+        snapshot: Symbol, Direction, Score, Regime (1 baris per symbol)
+        ms: waktu snapshot (close 4h). Tanpa ms → last_time + 1 bar.
+        """
+        if ms is None:
+            ms = (self.last_time or 0) + STEP_MS
+        ms = int(ms)
+        floor = ms - self.window_ms
+
+        seen = set()
+        for sym, direction, score, regime in snapshot[
+            ["Symbol", "Direction", "Score", "Regime"]
+        ].itertuples(index=False, name=None):
+            buf = self.scores.get(sym)
+            if buf is None:
+                buf = self.scores[sym] = deque()
+
+            if buf and buf[-1][0] == ms:
+                buf.pop()                       # snapshot yang sama ditulis ulang
+            buf.append((ms, int(score)))
+            while buf[0][0] < floor:
+                buf.popleft()
+
+            self.info[sym] = (direction, regime)
+            seen.add(sym)
+
+            for h in self.horizons:
+                ref = self._score_at(buf, ms - h * STEP_MS)
+                if ref is None:
+                    self.delta[h].pop(sym, None)
+                else:
+                    self.delta[h][sym] = buf[-1][1] - ref
+
+        # symbol yang keluar universe / berhenti update
+        for sym in [s for s in self.scores if s not in seen]:
+            for h in self.horizons:
+                self.delta[h].pop(sym, None)
+
+            buf = self.scores[sym]
+            while buf and buf[0][0] < floor:
+                buf.popleft()
+            if not buf:
+                del self.scores[sym]
+                del self.info[sym]
+
+        for h in self.horizons:
+            items = [(d, sym) for sym, d in self.delta[h].items()]
+            self.top[h] = heapq.nlargest(self.k, items)
+            self.bottom[h] = heapq.nsmallest(self.k, items)
+
+        self.last_time = ms
+
+    @staticmethod
+    def _score_at(buf, ref_ms):
+        """Score snapshot terakhir dengan waktu <= ref_ms (None kalau tidak ada)."""
+        for t, score in reversed(buf):
+            if t <= ref_ms:
+                return score
+        return None
+
+    # =========================
+    # QUERY
+    # =========================
+    def _frame(self, rows, h) -> pd.DataFrame:
+        return pd.DataFrame([
+            {
+                "Symbol": sym,
+                "Direction": self.info[sym][0],
+                "Score": self.scores[sym][-1][1],
+                f"Delta{h}": d,
+                "Regime": self.info[sym][1]
+            }
+            for d, sym in rows
+        ], columns=["Symbol", "Direction", "Score", f"Delta{h}", "Regime"])
+
+    def gainers(self, horizon=1) -> pd.DataFrame:
+        return self._frame(self.top[horizon], horizon)
+
+    def losers(self, horizon=1) -> pd.DataFrame:
+        return self._frame(self.bottom[horizon], horizon)
+
+    def rotating_in(self, horizon=None) -> pd.DataFrame:
+        """
+        Top gainers horizon terpanjang yang tersedia, hanya yang delta
+        positif di semua horizon (rotasi masuk konsisten).
+        """
+        horizon = horizon or self.horizons[-1]
+
+        rows = [
+            (d, sym) for d, sym in self.top[horizon]
+            if d > 0 and all(
+                self.delta[h].get(sym, 0) > 0
+                for h in self.horizons if h <= horizon
+            )
+        ]
+        return self._frame(rows, horizon)
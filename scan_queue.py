@@ -0,0 +1,197 @@
+# =====================================================
+# OPSI A PRO — SCAN QUEUE (DEADLINE AWARE)
+# PRIORITY ORDER | TIME BUDGET | DEFERRED CARRY-OVER
+# =====================================================
+#
+# 1 antrian per cycle untuk semua mode, urutan prioritas:
+#   1. FUTURES
+#   2. symbol dengan signal aktif (OPEN / TP1 HIT)
+#   3. symbol yang tertunda dari cycle sebelumnya (paling lama dulu)
+#   4. score tertinggi di cycle sebelumnya (signals.last_eval → EvalLog)
+# Budget habis → sisa antrian ditunda ke cycle berikutnya.
+#
+# Frekuensi adaptif: tiap (mode, symbol) punya waktu evaluasi berikutnya
+#   gap      = threshold − score terakhir (≤ 0 → dekat trigger)
+#   eff_gap  = gap × ADAPTIVE_REF_RANGE_PCT / range bar 4h (volatil → lebih sering)
+#   interval = ADAPTIVE_MIN_SEC × 2^(eff_gap / ADAPTIVE_GAP_STEP), max ADAPTIVE_MAX_SEC
+# lalu dipotong di close ENTRY_TF berikutnya (score berubah saat bar close).
+# Symbol yang jauh dari threshold cukup dicek 1x per bar 4h.
+# Return awal tanpa score (cooldown, kill switch, history pendek) → cek
+# lagi di close ENTRY_TF berikutnya / akhir cooldown; fetch error →
+# backoff ADAPTIVE_MIN_SEC × 2^(error beruntun − 1), max ADAPTIVE_MAX_SEC.
+
+import threading
+
+import clock
+
+from config import (
+    ENTRY_TF,
+    SPOT_MIN_SCORE,
+    FUTURES_MIN_SCORE,
+    ADAPTIVE_MIN_SEC,
+    ADAPTIVE_MAX_SEC,
+    ADAPTIVE_GAP_STEP,
+    ADAPTIVE_REF_RANGE_PCT
+)
+from history_store import distinct_values
+from resample import bucket_start, timeframe_ms
+
+MIN_SCORE = {
+    "SPOT": SPOT_MIN_SCORE,
+    "FUTURES": FUTURES_MIN_SCORE
+}
+
+
+def open_signal_symbols() -> set:
+    # mirror SQLite ber-index (history_store), bukan load seluruh CSV
+    return set(distinct_values("Symbol", status=["OPEN", "TP1 HIT"]))
+
+
+# =====================================================
+# EVAL LOG (THREAD SAFE)
+# =====================================================
+class EvalLog:
+    """
+    Evaluasi terakhir per (symbol, mode):
+      {"Score", "Time", "RangePct"}              → jadwal adaptif
+      {"Score": None, "Time", "Until", "Fails"}  → skip / error
+    Ditulis check_signal (scanner + thread scan worker app), dibaca
+    scheduler lewat snapshot() → 1 copy konsisten per cycle.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._items = {}
+
+    def record(self, symbol: str, mode: str, score, range_pct):
+        with self._lock:
+            self._items[(symbol, mode)] = {
+                "Score": score,
+                "Time": clock.time(),
+                "RangePct": range_pct
+            }
+
+    def skip(self, symbol: str, mode: str, until=None):
+        """Return awal tanpa score; cek lagi di until (default close ENTRY_TF)."""
+        now = clock.time()
+        with self._lock:
+            self._items[(symbol, mode)] = {
+                "Score": None,
+                "Time": now,
+                "Until": next_close(now) if until is None else max(until, now + ADAPTIVE_MIN_SEC),
+                "Fails": 0
+            }
+
+    def fail(self, symbol: str, mode: str):
+        """Fetch error → backoff eksponensial per error beruntun."""
+        now = clock.time()
+        with self._lock:
+            prev = self._items.get((symbol, mode)) or {}
+            fails = prev.get("Fails", 0) + 1
+            self._items[(symbol, mode)] = {
+                "Score": None,
+                "Time": now,
+                "Until": now + min(ADAPTIVE_MIN_SEC * 2 ** (fails - 1), ADAPTIVE_MAX_SEC),
+                "Fails": fails
+            }
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._items.get(key, default)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._items)
+
+
+# =====================================================
+# ADAPTIVE NEXT EVALUATION
+# =====================================================
+def next_close(now: float) -> float:
+    """Close ENTRY_TF berikutnya (epoch detik), minimal now + ADAPTIVE_MIN_SEC."""
+    close = (int(bucket_start(now * 1000, ENTRY_TF)) + timeframe_ms(ENTRY_TF)) / 1000
+    return max(close, now + ADAPTIVE_MIN_SEC)
+
+
+def next_eval_time(mode: str, ev: dict) -> float:
+    """Epoch detik evaluasi berikutnya dari hasil evaluasi terakhir."""
+    if ev.get("Until") is not None:         # skip / error tanpa score
+        return ev["Until"]
+
+    gap = max(MIN_SCORE[mode] - ev["Score"], 0)
+    range_pct = max(ev.get("RangePct") or ADAPTIVE_REF_RANGE_PCT, 1e-6)
+    eff_gap = gap * ADAPTIVE_REF_RANGE_PCT / range_pct
+
+    interval = min(
+        ADAPTIVE_MIN_SEC * 2 ** (eff_gap / ADAPTIVE_GAP_STEP),
+        ADAPTIVE_MAX_SEC
+    )
+
+    return min(ev["Time"] + interval, next_close(ev["Time"]))
+
+
+def split_due(jobs, evals, now=None) -> tuple:
+    """
+    jobs = [(mode, symbol)] → (due, waiting).
+    Belum pernah dievaluasi → due.
+    """
+    now = now or clock.time()
+    due, waiting = [], []
+
+    for job in jobs:
+        mode, symbol = job
+        ev = evals.get((symbol, mode))
+        if ev is None or next_eval_time(mode, ev) <= now:
+            due.append(job)
+        else:
+            waiting.append(job)
+
+    return due, waiting
+
+
+# =====================================================
+# PRIORITY QUEUE
+# =====================================================
+class ScanQueue:
+    def __init__(self):
+        self.deferred = {}      # (mode, symbol) → jumlah cycle tertunda
+
+    def plan(self, jobs, open_symbols=(), scores=None, modes=None) -> list:
+        """
+        jobs = [(mode, symbol)] → urut prioritas (duplikat dibuang).
+        Job tertunda ikut masuk walau tidak ada di jobs (mis. tier 2),
+        selama mode-nya aktif di cycle ini.
+        """
+        scores = scores or {}
+        modes = modes or {mode for mode, _ in jobs}
+        jobs = list(jobs) + [job for job in self.deferred if job[0] in modes]
+
+        def key(job):
+            mode, symbol = job
+            score = scores.get((symbol, mode), {}).get("Score")
+            if score is None:                   # belum pernah / skip / error
+                score = -1
+            return (
+                mode != "FUTURES",
+                symbol not in open_symbols,
+                -self.deferred.get(job, 0),
+                -score
+            )
+
+        return sorted(dict.fromkeys(jobs), key=key)
+
+    def run(self, queue, scan, deadline) -> tuple:
+        """
+        scan(mode, symbol) untuk tiap job sampai clock.monotonic() >= deadline.
+        Return (jumlah discan, jumlah ditunda).
+        """
+        done = 0
+        for mode, symbol in queue:
+            if clock.monotonic() >= deadline:
+                break
+            scan(mode, symbol)
+            done += 1
+
+        rest = queue[done:]
+        self.deferred = {job: self.deferred.get(job, 0) + 1 for job in rest}
+        return done, len(rest)
@@ -0,0 +1,165 @@
+# =====================================================
+# OPSI A PRO — BACKGROUND SCAN WORKER
+# 1 WORKER / MODE / PROCESS | SHARED PROGRESS | CANDLE-CLOSE CACHE
+# =====================================================
+#
+# Tombol "Scan Market" tidak lagi scan di thread script Streamlit:
+# - scan jalan di thread worker (1 per mode, dipakai semua session)
+# - klik saat scan berjalan → ikut job yang sama (tanpa scan ganda)
+# - hasil di-cache sampai close candle berikutnya
+#   (SPOT: ENTRY_TF, FUTURES: FUTURES_EXEC_TF)
+# - save_signal + Telegram dilakukan worker → 1x per signal
+
+import time
+import threading
+
+from config import ENTRY_TF, FUTURES_EXEC_TF
+from resample import bucket_start, timeframe_ms
+from signals import check_signal
+from history import save_signal, is_symbol_in_cooldown
+from telegram_bot import send_telegram_message, format_signal_message
+
+CACHE_TF = {
+    "SPOT": ENTRY_TF,
+    "FUTURES": FUTURES_EXEC_TF
+}
+
+
+def next_close(mode: str, now_ms=None) -> int:
+    tf = CACHE_TF[mode]
+    now_ms = now_ms or int(time.time() * 1000)
+    return int(bucket_start(now_ms, tf)) + timeframe_ms(tf)
+
+
+class ScanJob:
+    def __init__(self, mode, symbols, balance):
+        self.mode = mode
+        self.symbols = list(symbols)
+        self.balance = balance
+        self.started = time.time()
+        self.finished = None
+        self.valid_until = next_close(mode)
+
+        self.done = 0
+        self.current = None
+        self.found = []
+        self.errors = []
+        self.status = "RUNNING"
+        self._lock = threading.Lock()
+
+    @property
+    def total(self):
+        return len(self.symbols)
+
+    def is_fresh(self) -> bool:
+        return time.time() * 1000 < self.valid_until
+
+    def snapshot(self) -> dict:
+        """State saat ini (copy, aman dibaca dari session mana pun)."""
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "status": self.status,
+                "done": self.done,
+                "total": self.total,
+                "current": self.current,
+                "found": list(self.found),
+                "errors": list(self.errors),
+                "started": self.started,
+                "finished": self.finished,
+                "valid_until": self.valid_until,
+                "balance": self.balance
+            }
+
+    # =========================
+    # RUN (THREAD WORKER)
+    # =========================
+    def run(self):
+        try:
+            for symbol in self.symbols:
+                with self._lock:
+                    self.current = symbol
+
+                sig = self._scan_symbol(symbol)
+
+                with self._lock:
+                    if sig:
+                        self.found.append(sig)
+                    self.done += 1
+
+            status = "DONE"
+        except Exception as e:
+            with self._lock:
+                self.errors.append(f"worker: {e}")
+            status = "ERROR"
+
+        with self._lock:
+            self.status = status
+            self.current = None
+            self.finished = time.time()
+
+    def _scan_symbol(self, symbol):
+        # anti duplicate / cooldown
+        if is_symbol_in_cooldown(symbol, self.mode):
+            return None
+
+        try:
+            sig = check_signal(symbol, self.mode, self.balance)
+        except Exception as e:
+            with self._lock:
+                self.errors.append(f"{symbol}: {e}")
+            return None
+
+        if not sig or sig.get("SignalType") != "TRADE_EXECUTION":
+            return None
+
+        save_signal(sig)
+
+        try:
+            send_telegram_message(format_signal_message(sig))
+        except Exception as e:
+            with self._lock:
+                self.errors.append(f"Telegram {symbol}: {e}")
+
+        return sig
+
+
+class ScanWorker:
+    def __init__(self, mode):
+        self.mode = mode
+        self.job = None
+        self._lock = threading.Lock()
+
+    def start(self, symbols, balance) -> ScanJob:
+        """
+        Job berjalan → dipakai bersama (de-dup klik).
+        Job DONE & belum lewat close candle → cache.
+        Selain itu (termasuk job ERROR) → scan baru di background thread.
+        """
+        with self._lock:
+            job = self.job
+            if job is not None and (
+                job.status == "RUNNING"
+                or (job.status == "DONE" and job.is_fresh() and job.balance == balance)
+            ):
+                return job
+
+            job = self.job = ScanJob(self.mode, symbols, balance)
+            threading.Thread(
+                target=job.run, name=f"scan-{self.mode}", daemon=True
+            ).start()
+            return job
+
+    def current(self):
+        return self.job
+
+
+_workers = {}
+_workers_lock = threading.Lock()
+
+
+def get_scan_worker(mode: str) -> ScanWorker:
+    with _workers_lock:
+        if mode not in _workers:
+            _workers[mode] = ScanWorker(mode)
+        return _workers[mode]
@@ -5,17 +5,25 @@
 
 import time
 import os
-from datetime import datetime, timezone
 
-from exchange import get_okx
-from signals import check_signal
+import clock
+
+from signals import check_signal, last_eval
 from history import (
+    load_signal_history,
     save_signal,
     auto_close_signals,
+    monitor_regime_flip,
     is_symbol_in_cooldown,
     calculate_bot_rating
 )
 from telegram_bot import send_telegram_message
+from logger import get_logger
+from score_grid import refresh_grid, load_grid
+from breadth import update_breadth
+from api_server import state as api_state, records, performance_rollup, start_api_server
+from universe import tiered_symbols, top_symbols
+from scan_queue import ScanQueue, open_signal_symbols, split_due
 from scheduler import (
     is_optimal_spot,
     is_optimal_futures
@@ -23,23 +31,27 @@ from scheduler import (
 from config import (
     FUTURES_BIG_COINS,
     MAX_SCAN_SYMBOLS,
-    RATE_LIMIT_DELAY
+    SCAN_BUDGET_PCT,
+    API_ENABLED,
+    API_HOST,
+    API_PORT
 )
 
 # =====================================================
 # CONFIG
 # =====================================================
 SCAN_INTERVAL = 300        # 5 menit
+SCAN_BUDGET = SCAN_INTERVAL * SCAN_BUDGET_PCT
 BALANCE_DUMMY = 10_000     # simulasi
 SUMMARY_FLAG_FILE = "daily_summary.flag"
 
+scan_queue = ScanQueue()
+
 
 # =====================================================
-# LOGGER
+# LOGGER (JSON LINES)
 # =====================================================
-def log(msg: str):
-    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
-    print(f"[{now}] {msg}", flush=True)
+log = get_logger("scanner")
 
 
 # =====================================================
@@ -52,12 +64,12 @@ def summary_sent_today() -> bool:
     with open(SUMMARY_FLAG_FILE, "r") as f:
         last_date = f.read().strip()
 
-    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    today = clock.now().strftime("%Y-%m-%d")
     return last_date == today
 
 
 def mark_summary_sent():
-    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    today = clock.now().strftime("%Y-%m-%d")
     with open(SUMMARY_FLAG_FILE, "w") as f:
         f.write(today)
 
@@ -82,125 +94,297 @@ def build_signal_message(sig: dict) -> str:
 
 
 # =====================================================
-# SCAN MARKET
-# RETURN True  = scan dilakukan
-# RETURN False = skip (di luar jam)
+# SYMBOL UNIVERSE
 # =====================================================
-def scan_market(mode: str) -> bool:
-    okx = get_okx()
+def symbol_universe(mode: str, cycle: int = 0) -> list:
+    if mode == "FUTURES":
+        return FUTURES_BIG_COINS
 
-    # =========================
-    # TIME GUARD
-    # =========================
-    if mode == "FUTURES" and not is_optimal_futures():
-        log("⏳ FUTURES outside optimal hours — skip")
-        return False
+    # ranking likuiditas, tier 2 tidak setiap cycle
+    return tiered_symbols(cycle)
 
-    if mode == "SPOT" and not is_optimal_spot():
-        log("⏳ SPOT outside optimal hours — skip")
-        return False
+
+# =====================================================
+# SCAN 1 SYMBOL
+# =====================================================
+def scan_symbol(mode: str, symbol: str):
+    # ⛔ Anti duplicate / cooldown
+    if is_symbol_in_cooldown(symbol, mode):
+        log.info("cooldown_hit", symbol=symbol, mode=mode)
+        last_eval.skip(symbol, mode)
+        return None
+
+    try:
+        sig = check_signal(symbol, mode, BALANCE_DUMMY)
+    except Exception as e:
+        log.error("signal_error", symbol=symbol, mode=mode, error=str(e))
+        last_eval.fail(symbol, mode)
+        return None
+
+    if not sig or sig.get("SignalType") != "TRADE_EXECUTION":
+        log.info("symbol_skip", symbol=symbol, mode=mode)
+        return None
 
     # =========================
-    # SYMBOL UNIVERSE
+    # SAVE SIGNAL
     # =========================
-    symbols = (
-        FUTURES_BIG_COINS
-        if mode == "FUTURES"
-        else [
-            s for s, m in okx.markets.items()
-            if m.get("spot") and m.get("active") and s.endswith("/USDT")
-        ][:MAX_SCAN_SYMBOLS]
+    save_signal(sig)
+
+    log.info(
+        "signal",
+        symbol=symbol,
+        mode=mode,
+        direction=sig["Direction"],
+        score=sig["Score"],
+        regime=sig["Regime"],
+        msg=f"✅ SIGNAL {symbol} | {sig['Direction']} | Score {sig['Score']} | {sig['Regime']}"
     )
 
-    log(f"🔍 Scanning {mode} — {len(symbols)} symbols")
-
     # =========================
-    # MAIN LOOP
+    # TELEGRAM ALERT
     # =========================
-    for symbol in symbols:
+    try:
+        send_telegram_message(build_signal_message(sig))
+        log.info("telegram_sent", symbol=symbol)
+    except Exception as e:
+        log.error("telegram_error", symbol=symbol, error=str(e))
 
-        # ⛔ Anti duplicate / cooldown
-        if is_symbol_in_cooldown(symbol, mode):
-            continue
+    return sig
 
+
+# =====================================================
+# SCAN CYCLE (PRIORITY QUEUE + DEADLINE)
+# RETURN {FUTURES/SPOT: True = scan dilakukan, False = di luar jam,
+#         scanned / deferred / waiting: jumlah symbol, signals: signal baru}
+# =====================================================
+def scan_cycle(cycle: int, deadline: float, universe=symbol_universe) -> dict:
+    # =========================
+    # TIME GUARD
+    # =========================
+    active = {
+        "FUTURES": is_optimal_futures(),
+        "SPOT": is_optimal_spot()
+    }
+    modes = [m for m, ok in active.items() if ok]
+    result = dict(active, scanned=0, deferred=0, waiting=0, signals=[])
+
+    jobs = []
+    for mode, ok in active.items():
+        if not ok:
+            log.info("session_closed", mode=mode, msg=f"⏳ {mode} outside optimal hours — skip")
+            continue
         try:
-            sig = check_signal(symbol, mode, BALANCE_DUMMY)
+            symbols = universe(mode, cycle)
         except Exception as e:
-            log(f"⚠️ Signal error {symbol}: {e}")
+            # universe 1 mode gagal → mode lain tetap discan
+            log.error("universe_error", mode=mode, error=str(e))
             continue
+        jobs += [(mode, s) for s in symbols]
 
-        if not sig or sig.get("SignalType") != "TRADE_EXECUTION":
-            continue
+    if not jobs:
+        return result
 
-        # =========================
-        # SAVE SIGNAL
-        # =========================
-        save_signal(sig)
+    # =========================
+    # ADAPTIVE FREQUENCY
+    # due sebelum pertengahan cycle berikutnya → scan sekarang
+    # =========================
+    evals = last_eval.snapshot()
+    due, waiting = split_due(jobs, evals, clock.time() + SCAN_INTERVAL / 2)
+
+    # =========================
+    # PRIORITY ORDER
+    # =========================
+    queue = scan_queue.plan(due, open_signal_symbols(), evals, modes=set(modes))
+    log.info("scan_start", modes=modes, queued=len(queue), not_due=len(waiting))
 
-        log(
-            f"✅ SIGNAL {symbol} | "
-            f"{sig['Direction']} | "
-            f"Score {sig['Score']} | "
-            f"{sig['Regime']}"
+    def scan(mode, symbol):
+        sig = scan_symbol(mode, symbol)
+        if sig:
+            result["signals"].append(sig)
+
+    done, deferred = scan_queue.run(queue, scan, deadline)
+
+    if deferred:
+        log.warning("scan_deferred", scanned=done, deferred=deferred)
+
+    result.update(scanned=done, deferred=deferred, waiting=len(waiting))
+    return result
+
+
+# =====================================================
+# DAILY SUMMARY (1x / DAY, DI LUAR JAM AKTIF)
+# =====================================================
+def send_daily_summary():
+    if summary_sent_today():
+        return
+
+    stats = calculate_bot_rating()
+
+    if stats and stats.get("valid"):
+        send_telegram_message(
+            "OPSI A PRO — DAILY SUMMARY\n\n"
+            f"Rating     : {stats['rating']}\n"
+            f"Win Rate   : {stats['win_rate']}%\n"
+            f"Expectancy : {stats['expectancy']} R\n"
+            f"Trades     : {stats['trades']}\n\n"
+            "Market currently outside optimal hours"
         )
+        mark_summary_sent()
+        log.info("daily_summary_sent")
 
-        # =========================
-        # TELEGRAM ALERT
-        # =========================
-        try:
-            send_telegram_message(build_signal_message(sig))
-            log("📩 Telegram sent")
-        except Exception as e:
-            log(f"❌ Telegram error: {e}")
 
-        time.sleep(RATE_LIMIT_DELAY)
+# =====================================================
+# LOCAL API STATE (1x PER CYCLE)
+# =====================================================
+def publish_state(cycle: int, result: dict):
+    api_state.publish("scan", {
+        "cycle": cycle,
+        "time": clock.now().isoformat(),
+        "active": {m: result.get(m, False) for m in ("FUTURES", "SPOT")},
+        "scanned": result["scanned"],
+        "deferred": result["deferred"],
+        "waiting": result["waiting"],
+        "signals": result.get("signals", [])
+    })
+
+    hist = load_signal_history()
+    api_state.publish("signals", records(hist[hist["Status"].isin(["OPEN", "TP1 HIT"])]))
 
-    return True
+    grid = load_grid()
+    api_state.publish("scores", {
+        "close": grid["close"],
+        "updated": grid["updated"],
+        "rows": records(grid["rows"])
+    })
+
+    api_state.publish("performance", performance_rollup(calculate_bot_rating()))
+
+
+def default_grid_symbols() -> list:
+    return list(dict.fromkeys(
+        FUTURES_BIG_COINS + top_symbols(MAX_SCAN_SYMBOLS)
+    ))
 
 
 # =====================================================
 # MAIN LOOP (CRON-LIKE)
+# universe / grid_symbols / until / on_cycle → dipakai replay.py
 # =====================================================
-if __name__ == "__main__":
-    log("🚀 OPSI A PRO Scanner started")
+def run_scanner(universe=symbol_universe, grid_symbols=default_grid_symbols,
+                until=None, on_cycle=None):
+    log.info("scanner_started")
+    cycle = 0
+    cycle_start = clock.monotonic()
+
+    while until is None or clock.time() < until:
+        started = clock.time()
+        real_start = time.perf_counter()
+        result = {"scanned": 0, "deferred": 0, "waiting": 0, "signals": []}
 
-    while True:
         try:
             # =========================
             # AUTO MAINTENANCE
             # =========================
-            auto_close_signals()
-            log("🔧 Auto maintenance done")
+            closed = auto_close_signals()
+            flips = monitor_regime_flip()
+            log.info("maintenance", closed=closed, regime_flips=flips)
+        except Exception as e:
+            log.error("maintenance_error", cycle=cycle, error=str(e))
 
+        # =========================
+        # UNIVERSE + SCORE GRID + BREADTH
+        # terpisah: universe / grid gagal → scan cycle tetap jalan
+        # =========================
+        try:
+            symbols = grid_symbols()
+            if refresh_grid(symbols):
+                log.info("score_grid_updated", symbols=len(symbols))
+
+            # =========================
+            # MARKET BREADTH (1x / cycle)
+            # =========================
+            breadth = update_breadth(symbols)
+            if "AboveEMA200Pct" in breadth:
+                log.info(
+                    "breadth",
+                    symbols=breadth["Symbols"],
+                    above_ema200_pct=breadth["AboveEMA200Pct"],
+                    rising_adl_pct=breadth["RisingADLPct"],
+                    btc_trend=breadth.get("BTCTrend")
+                )
+            api_state.publish("breadth", breadth)
+        except Exception as e:
+            log.error("market_refresh_error", cycle=cycle, error=str(e))
+
+        try:
             # =========================
             # MARKET SCANS
             # =========================
-            fut_active = scan_market("FUTURES")
-            spot_active = scan_market("SPOT")
+            result = scan_cycle(cycle, cycle_start + SCAN_BUDGET, universe)
 
             # =========================
             # DAILY SUMMARY (1x / day)
             # =========================
-            if not fut_active and not spot_active:
-                if not summary_sent_today():
-                    stats = calculate_bot_rating()
-
-                    if stats and stats.get("valid"):
-                        send_telegram_message(
-                            "OPSI A PRO — DAILY SUMMARY\n\n"
-                            f"Rating     : {stats['rating']}\n"
-                            f"Win Rate   : {stats['win_rate']}%\n"
-                            f"Expectancy : {stats['expectancy']} R\n"
-                            f"Trades     : {stats['trades']}\n\n"
-                            "Market currently outside optimal hours"
-                        )
-                        mark_summary_sent()
-                        log("📊 Daily summary sent")
-
+            if not result["FUTURES"] and not result["SPOT"]:
+                send_daily_summary()
             else:
-                log("📡 Active session — summary skipped")
+                log.debug("summary_skipped")
 
         except Exception as e:
-            log(f"🔥 Scanner crash prevented: {e}")
+            log.error("cycle_crash", cycle=cycle, error=str(e))
+
+        # =========================
+        # LOCAL API (terpisah: gagal publish ≠ cycle crash)
+        # =========================
+        try:
+            publish_state(cycle, result)
+        except Exception as e:
+            log.error("publish_error", cycle=cycle, error=str(e))
+
+        # =========================
+        # STABLE CADENCE
+        # start cycle = grid SCAN_INTERVAL, cycle yang molor
+        # melewati slot berikutnya (tidak menumpuk / drift)
+        # =========================
+        elapsed = clock.monotonic() - cycle_start
+        cycle += 1
+        cycle_start += SCAN_INTERVAL
+        now = clock.monotonic()
+        missed = 0
+
+        if now > cycle_start:
+            missed = int((now - cycle_start) // SCAN_INTERVAL) + 1
+            cycle_start += missed * SCAN_INTERVAL
+            log.warning("cycle_overrun", cycle=cycle, skipped_slots=missed)
+
+        log.info(
+            "cycle_done",
+            cycle=cycle - 1,
+            elapsed_sec=round(elapsed, 2),
+            scanned=result["scanned"],
+            deferred=result["deferred"],
+            waiting=result["waiting"],
+            signals=len(result.get("signals", []))
+        )
+
+        if on_cycle:
+            on_cycle({
+                "cycle": cycle - 1,
+                "start": started,
+                "elapsed": elapsed,
+                "real_sec": time.perf_counter() - real_start,
+                "scanned": result["scanned"],
+                "deferred": result["deferred"],
+                "waiting": result["waiting"],
+                "skipped_slots": missed
+            })
+
+        clock.sleep(cycle_start - now)
+
+
+if __name__ == "__main__":
+    if API_ENABLED:
+        start_api_server()
+        log.info("api_started", url=f"http://{API_HOST}:{API_PORT}")
 
-        time.sleep(SCAN_INTERVAL)
+    run_scanner()
@@ -3,13 +3,14 @@
 # ONLY RUN AT OPTIMAL HOURS
 # =====================================================
 
-from datetime import datetime
 import pytz
 
+import clock
+
 WIB = pytz.timezone("Asia/Jakarta")
 
 def wib_hour():
-    return datetime.now(WIB).hour
+    return clock.now(WIB).hour
 
 
 def is_optimal_spot():
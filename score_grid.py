@@ -0,0 +1,216 @@
+# =====================================================
+# OPSI A PRO — UNIVERSE SCORE GRID
+# 1X PER 4H CLOSE | MEMO PER SYMBOL | SHARED FILE
+# =====================================================
+#
+# Grid = score + regime seluruh universe di close 4h terakhir
+# (bar berjalan tidak ikut → hasil stabil sampai close berikutnya).
+#
+# refresh_grid(symbols):
+#   - grid sudah untuk close terakhir → tidak ada kerja
+#   - symbol yang bar close terakhirnya sama dengan memo → pakai memo
+#   - sisanya 1 panel call, tulis SCORE_GRID_FILE + 1 snapshot
+#     ke snapshot store (heatmap delta / rotation)
+#   - symbol yang gagal di-update (BarTime != close terakhir) tidak
+#     ikut ditulis → score lama tidak pernah tampil sebagai score baru
+# App dan scanner sama-sama refresh → dikunci file lock antar proses;
+# yang datang kedua melihat grid sudah untuk close ini lalu selesai.
+# Heatmap & delta view cukup load_grid() → tanpa exchange call.
+
+import os
+import json
+import time
+import threading
+
+import pandas as pd
+
+import clock
+from config import (
+    ENTRY_TF,
+    DAILY_TF,
+    LIMIT_4H,
+    LIMIT_1D,
+    ATR_PERIOD,
+    SUPERTREND_MULT,
+    SCORE_GRID_FILE,
+    SCORE_GRID_DELAY_SEC
+)
+from candle_store import get_candles
+from indicators import supertrend
+from resample import bucket_start, timeframe_ms
+from scoring import score_frames
+from regime import market_regime_panel
+from snapshot_store import append_snapshot
+from file_lock import file_lock
+from logger import get_logger
+
+log = get_logger("score_grid")
+
+GRID_COLUMNS = [
+    "Symbol",
+    "Direction",
+    "Score",
+    "Regime",
+    "StructureScore",
+    "VolumeScore",
+    "ADLScore",
+    "Close",
+    "BarTime"
+]
+
+_lock = threading.Lock()
+_memo = {}          # symbol → row (BarTime = open bar 4h close terakhir)
+_worker = None
+
+
+def current_close(now_ms=None) -> int:
+    """Open time bar 4h berjalan = waktu close bar 4h terakhir (ms)."""
+    now_ms = now_ms or clock.time_ms()
+    return int(bucket_start(now_ms, ENTRY_TF))
+
+
+# =====================================================
+# LOAD / SAVE
+# =====================================================
+def load_grid() -> dict:
+    """{"close": ms, "updated": ms, "rows": DataFrame} (rows kosong kalau belum ada)."""
+    if not os.path.exists(SCORE_GRID_FILE):
+        return {"close": None, "updated": None, "rows": pd.DataFrame(columns=GRID_COLUMNS)}
+
+    with open(SCORE_GRID_FILE) as f:
+        data = json.load(f)
+
+    data["rows"] = pd.DataFrame(data["rows"], columns=GRID_COLUMNS)
+    return data
+
+
+def _save_grid(close_ms: int, rows: pd.DataFrame):
+    tmp = SCORE_GRID_FILE + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({
+            "close": close_ms,
+            "updated": clock.time_ms(),
+            "rows": rows.to_dict("records")
+        }, f)
+    os.replace(tmp, SCORE_GRID_FILE)
+
+
+# =====================================================
+# CLOSED BARS
+# =====================================================
+def _closed_frames(symbol: str, close_ms: int):
+    """
+    4h tanpa bar berjalan; daily dipotong di close_ms
+    (close daily berjalan = close 4h terakhir).
+    """
+    df4h = get_candles(symbol, ENTRY_TF, LIMIT_4H + 1)
+    df4h = df4h[df4h["t"] < close_ms].reset_index(drop=True)
+
+    df1d = get_candles(symbol, DAILY_TF, LIMIT_1D)
+    df1d = df1d[df1d["t"] < close_ms].reset_index(drop=True)
+
+    if len(df1d) and len(df4h) and df1d["t"].iloc[-1] + timeframe_ms(DAILY_TF) > close_ms:
+        df1d.loc[df1d.index[-1], "close"] = df4h["close"].iloc[-1]
+
+    return df4h, df1d
+
+
+# =====================================================
+# REFRESH
+# =====================================================
+def refresh_grid(symbols, force=False) -> bool:
+    """Hitung grid untuk close 4h terakhir. Return True kalau grid baru ditulis."""
+    close_ms = current_close()
+
+    with file_lock(SCORE_GRID_FILE + ".lock"):
+        if not force and load_grid()["close"] == close_ms:
+            return False
+
+        if not _memo:
+            for row in load_grid()["rows"].to_dict("records"):
+                _memo[row["Symbol"]] = row
+
+        bar_ms = close_ms - timeframe_ms(ENTRY_TF)
+        names, frames4h, frames1d, directions = [], [], [], []
+
+        for symbol in symbols:
+            memo = _memo.get(symbol)
+            if memo is not None and memo["BarTime"] == bar_ms:
+                continue
+
+            try:
+                df4h, df1d = _closed_frames(symbol, close_ms)
+                if len(df4h) < 50 or len(df1d) < 50:
+                    continue
+
+                # bar terakhir sama dengan memo (symbol tidak aktif) → skip
+                if memo is not None and memo["BarTime"] == int(df4h["t"].iloc[-1]):
+                    continue
+
+                _, trend = supertrend(df4h, period=ATR_PERIOD, mult=SUPERTREND_MULT)
+
+            except Exception as e:
+                log.error("score_grid_error", symbol=symbol, error=str(e))
+                continue
+
+            names.append(symbol)
+            frames4h.append(df4h)
+            frames1d.append(df1d)
+            directions.append("LONG" if trend.iloc[-1] == 1 else "SHORT")
+
+        if names:
+            scores = score_frames(frames4h, frames1d, directions, names)
+            regimes = market_regime_panel(scores)
+
+            for i, symbol in enumerate(names):
+                s = scores.iloc[i]
+                _memo[symbol] = {
+                    "Symbol": symbol,
+                    "Direction": directions[i],
+                    "Score": int(s["TotalScore"]),
+                    "Regime": str(regimes[i]),
+                    "StructureScore": int(s["StructureScore"]),
+                    "VolumeScore": int(s["VolumeScore"]),
+                    "ADLScore": int(s["ADLScore"]),
+                    "Close": float(s["Close"]),
+                    "BarTime": int(frames4h[i]["t"].iloc[-1])
+                }
+
+        # hanya symbol dengan bar close terakhir (fetch gagal / tidak aktif → keluar)
+        rows = pd.DataFrame(
+            [_memo[s] for s in symbols if s in _memo and _memo[s]["BarTime"] == bar_ms],
+            columns=GRID_COLUMNS
+        )
+        _save_grid(close_ms, rows)
+        append_snapshot(rows, close_ms)
+
+    return True
+
+
+# =====================================================
+# BACKGROUND JOB
+# =====================================================
+def _run(get_symbols):
+    while True:
+        try:
+            refresh_grid(get_symbols())
+        except Exception as e:
+            log.error("score_grid_error", error=str(e))
+
+        # tidur sampai close 4h berikutnya (+ jeda agar candle final)
+        wake = current_close() + timeframe_ms(ENTRY_TF) + SCORE_GRID_DELAY_SEC * 1000
+        time.sleep(max(5.0, wake / 1000 - time.time()))
+
+
+def start_grid_worker(get_symbols) -> threading.Thread:
+    """1 thread per proses; get_symbols() dipanggil tiap refresh."""
+    global _worker
+
+    with _lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(
+                target=_run, args=(get_symbols,), name="score-grid", daemon=True
+            )
+            _worker.start()
+
+    return _worker
@@ -1,62 +1,243 @@
 # =====================================================
 # OPSI A PRO — INSTITUTIONAL SCORING
 # =====================================================
-from indicators import volume_osc, accumulation_distribution
+import numpy as np
+import pandas as pd
+
+from config import VO_FAST, VO_SLOW
+from indicators import volume_osc, accumulation_distribution, daily_ema_at, ema
+
+
+# =====================================================
+# PANEL HELPERS
+# =====================================================
+def build_panel(frames, column):
+    """
+    List DataFrame → array (symbols × bars), rata kanan.
+    Symbol dengan history lebih pendek di-pad NaN di kiri.
+    """
+    n = max((len(df) for df in frames), default=0)
+    panel = np.full((len(frames), n), np.nan)
+
+    for i, df in enumerate(frames):
+        if len(df):
+            panel[i, n - len(df):] = df[column].to_numpy(dtype=float)
+
+    return panel
+
+
+def _ewm_last(x, alpha):
+    """
+    Nilai terakhir pandas ewm(adjust=True).mean() per baris.
+    NaN (padding) = bobot nol, sama seperti pandas ignore_na=False.
+    """
+    n = x.shape[1]
+    w = (1 - alpha) ** np.arange(n - 1, -1, -1)
+    valid = ~np.isnan(x)
+
+    return (np.where(valid, x, 0.0) @ w) / (valid @ w)
+
+
+def _span(span):
+    return 2 / (span + 1)
+
+
+def _com(com):
+    return 1 / (1 + com)
 
-def institutional_score(df4h, df1d, direction="LONG"):
-    price = df4h.close.iloc[-1]
 
-    ema20 = df4h.close.ewm(span=20).mean().iloc[-1]
-    ema50 = df4h.close.ewm(span=50).mean().iloc[-1]
-    ema200 = df1d.close.ewm(span=200).mean().iloc[-1]
+# =====================================================
+# SCORE RULES (PANEL, SERIES & BACKTEST)
+# =====================================================
+def structure_points(price, ema20, ema50, ema200):
+    """(up, down) poin STRUCTURE (max 40)."""
+    up = (
+        15 * (price > ema20) + 10 * (ema20 > ema50)
+        + 10 * (ema50 > ema200) + 5 * (price > ema200)
+    )
+    down = (
+        15 * (price < ema20) + 10 * (ema20 < ema50)
+        + 10 * (ema50 < ema200) + 5 * (price < ema200)
+    )
+    return np.minimum(up, 40), np.minimum(down, 40)
+
+
+def volume_points(vo):
+    """Poin VOLUME dari volume oscillator % (max 30)."""
+    return np.minimum(10 * (vo > 3) + 10 * (vo > 10) + 10 * (vo > 20), 30)
+
+
+def adl_points(d5, d10, d20):
+    """(up, down) poin ADL FLOW dari delta ADL 5 / 10 / 20 bar (max 30)."""
+    up = 10 * (d5 > 0) + 10 * (d10 > 0) + 10 * (d20 > 0)
+    down = 10 * (d5 < 0) + 10 * (d10 < 0) + 10 * (d20 < 0)
+    return np.minimum(up, 30), np.minimum(down, 30)
+
+
+# =====================================================
+# PANEL SCORE (SYMBOLS × BARS)
+# =====================================================
+def institutional_score_panel(
+    close4h,
+    volume4h,
+    high4h,
+    low4h,
+    close1d,
+    direction="LONG",
+    symbols=None
+):
+    """
+    Semua array (symbols × bars) rata kanan (bar terakhir sejajar).
+    direction: "LONG" / "SHORT" atau array per symbol.
+
+    Return DataFrame per symbol:
+    TotalScore, StructureScore, VolumeScore, ADLScore
+    + fitur regime (Close, DailyClose, EMA200, ADLDelta20).
+    """
+    close4h = np.asarray(close4h, dtype=float)
+    volume4h = np.asarray(volume4h, dtype=float)
+    high4h = np.asarray(high4h, dtype=float)
+    low4h = np.asarray(low4h, dtype=float)
+    close1d = np.asarray(close1d, dtype=float)
+
+    long_ = np.broadcast_to(
+        np.asarray(direction) == "LONG", (close4h.shape[0],)
+    )
+
+    price = close4h[:, -1]
+    ema20 = _ewm_last(close4h, _span(20))
+    ema50 = _ewm_last(close4h, _span(50))
+    ema200 = _ewm_last(close1d, _span(200))
 
     # =========================
     # 1. STRUCTURE (40)
     # =========================
-    structure = 0
-    if direction == "LONG":
-        if price > ema20: structure += 15
-        if ema20 > ema50: structure += 10
-        if ema50 > ema200: structure += 10
-        if price > ema200: structure += 5
-    else:
-        if price < ema20: structure += 15
-        if ema20 < ema50: structure += 10
-        if ema50 < ema200: structure += 10
-        if price < ema200: structure += 5
-
-    structure = min(structure, 40)
+    up, down = structure_points(price, ema20, ema50, ema200)
+    structure = np.where(long_, up, down)
 
     # =========================
     # 2. VOLUME (30)
     # =========================
-    vo = volume_osc(df4h.volume).iloc[-1]
-    volume = 0
-    if vo > 3: volume += 10
-    if vo > 10: volume += 10
-    if vo > 20: volume += 10
-    volume = min(volume, 30)
+    slow = _ewm_last(volume4h, _com(VO_SLOW))
+    vo = (_ewm_last(volume4h, _com(VO_FAST)) - slow) / slow * 100
+
+    volume = volume_points(vo)
 
     # =========================
     # 3. ADL FLOW (30)
     # =========================
-    adl = accumulation_distribution(df4h)
-    adl_score = 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mfm = ((close4h - low4h) - (high4h - close4h)) / (high4h - low4h)
+    mfm = np.nan_to_num(mfm, nan=0.0, posinf=0.0, neginf=0.0)
+    adl = np.nancumsum(mfm * volume4h, axis=1)
 
-    if direction == "LONG":
-        if adl.iloc[-1] > adl.iloc[-5]: adl_score += 10
-        if adl.iloc[-1] > adl.iloc[-10]: adl_score += 10
-        if adl.iloc[-1] > adl.iloc[-20]: adl_score += 10
-    else:
-        if adl.iloc[-1] < adl.iloc[-5]: adl_score += 10
-        if adl.iloc[-1] < adl.iloc[-10]: adl_score += 10
-        if adl.iloc[-1] < adl.iloc[-20]: adl_score += 10
+    d5 = adl[:, -1] - adl[:, -5]
+    d10 = adl[:, -1] - adl[:, -10]
+    d20 = adl[:, -1] - adl[:, -20]
 
-    adl_score = min(adl_score, 30)
+    adl_up, adl_down = adl_points(d5, d10, d20)
+    adl_score = np.where(long_, adl_up, adl_down)
+
+    return pd.DataFrame({
+        "TotalScore": structure + volume + adl_score,
+        "StructureScore": structure,
+        "VolumeScore": volume,
+        "ADLScore": adl_score,
+        "Close": price,
+        "DailyClose": close1d[:, -1],
+        "EMA200": ema200,
+        "ADLDelta20": d20
+    }, index=symbols)
+
+
+def score_frames(frames4h, frames1d, direction="LONG", symbols=None):
+    """Shortcut panel dari list DataFrame OHLCV."""
+    return institutional_score_panel(
+        build_panel(frames4h, "close"),
+        build_panel(frames4h, "volume"),
+        build_panel(frames4h, "high"),
+        build_panel(frames4h, "low"),
+        build_panel(frames1d, "close"),
+        direction,
+        symbols
+    )
+
+
+# =====================================================
+# SINGLE SYMBOL (WRAPPER)
+# =====================================================
+def institutional_score(df4h, df1d, direction="LONG"):
+    row = score_frames([df4h], [df1d], [direction]).iloc[0]
 
     return {
+        "TotalScore": int(row["TotalScore"]),
+        "StructureScore": int(row["StructureScore"]),
+        "VolumeScore": int(row["VolumeScore"]),
+        "ADLScore": int(row["ADLScore"])
+    }
+
+
+# =====================================================
+# FULL HISTORY (PER BAR 4H)
+# =====================================================
+def score_components_series(df4h, df1d) -> pd.DataFrame:
+    """
+    Komponen score per bar 4h yang tidak tergantung arah (tanpa lookahead):
+    poin up / down per komponen + Close, EMA200 (daily), ADL, ADLDelta20.
+    Dipakai institutional_score_series dan backtest.SymbolFeatures.
+    """
+    close = df4h.close
+
+    price = close.to_numpy(dtype=float)
+    ema20 = ema(df4h, 20).to_numpy()
+    ema50 = ema(df4h, 50).to_numpy()
+    ema200 = daily_ema_at(df4h, df1d, 200).to_numpy()
+
+    struct_up, struct_down = structure_points(price, ema20, ema50, ema200)
+    volume = volume_points(volume_osc(df4h.volume).to_numpy())
+
+    adl = accumulation_distribution(df4h)
+    d5 = (adl - adl.shift(4)).to_numpy()
+    d10 = (adl - adl.shift(9)).to_numpy()
+    d20 = (adl - adl.shift(19)).to_numpy()
+
+    adl_up, adl_down = adl_points(d5, d10, d20)
+
+    return pd.DataFrame({
+        "StructUp": struct_up,
+        "StructDown": struct_down,
+        "Volume": volume,
+        "ADLUp": adl_up,
+        "ADLDown": adl_down,
+        "Close": price,
+        "EMA200": ema200,
+        "ADL": adl.to_numpy(),
+        "ADLDelta20": d20
+    }, index=df4h.index)
+
+
+def institutional_score_series(df4h, df1d, direction="LONG"):
+    """
+    Score untuk setiap bar 4h dalam 1 pass (tanpa lookahead).
+    Bar terakhir = institutional_score(df4h, df1d, direction)
+    selama close 1d terakhir = close 4h terakhir.
+    direction: "LONG" / "SHORT" atau Series per bar.
+    """
+    c = score_components_series(df4h, df1d)
+    long_ = np.broadcast_to(np.asarray(direction) == "LONG", (len(df4h),))
+
+    structure = np.where(long_, c["StructUp"], c["StructDown"])
+    volume = c["Volume"].to_numpy()
+    adl_score = np.where(long_, c["ADLUp"], c["ADLDown"])
+
+    out = pd.DataFrame({
         "TotalScore": structure + volume + adl_score,
         "StructureScore": structure,
         "VolumeScore": volume,
         "ADLScore": adl_score
-    }
+    }, index=df4h.index)
+
+    # warm-up: belum ada 20 bar ADL / belum ada bar daily
+    out[(np.arange(len(df4h)) < 19) | np.isnan(c["EMA200"].to_numpy())] = np.nan
+
+    return out
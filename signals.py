@@ -4,6 +4,8 @@
 # FINAL | CONFIG-SAFE | INSTITUTIONAL GRADE
 # =====================================================
 
+import clock
+
 from config import (
     ENTRY_TF,
     DAILY_TF,
@@ -14,24 +16,37 @@ from config import (
     TP1_R,
     TP2_R,
     ZONE_BUFFER,
-    SR_LOOKBACK,
-    FUTURES_MAX_RISK
+    FUTURES_MAX_RISK,
+    ATR_PERIOD,
+    SUPERTREND_MULT,
+    SPOT_MIN_SCORE,
+    FUTURES_MIN_SCORE,
+    BREADTH_GATE_ENABLED
 )
 
-from exchange import fetch_ohlcv
-from indicators import (
-    supertrend,
-    accumulation_distribution,
-    find_support,
-    find_resistance
-)
+from candle_store import get_candles
+from indicators import supertrend, accumulation_distribution
+from levels import get_level_index
 from scoring import institutional_score
 from regime import detect_market_regime, detect_regime_shift
 from risk import calculate_futures_position
+from breadth import breadth_allows
+from scan_queue import EvalLog
 from utils import now_wib, is_danger_time
 
 # 🔒 COOLDOWN ENGINE
-from cooldown import is_on_cooldown, set_cooldown
+from cooldown import cooldown_remaining, set_cooldown
+
+# score terakhir per (symbol, mode) → prioritas scan cycle berikutnya
+last_eval = EvalLog()
+
+
+# =====================================================
+# VOLATILITY (RANGE BAR RATA-RATA, % CLOSE)
+# =====================================================
+def bar_range_pct(df, period=ATR_PERIOD) -> float:
+    tail = df.iloc[-period:]
+    return float(((tail.high - tail.low) / tail.close).mean() * 100)
 
 
 # =====================================================
@@ -79,32 +94,37 @@ def check_signal(symbol, mode, balance):
     # =========================
     # ⛔ ANTI DUPLICATE (COOLDOWN)
     # =========================
-    if is_on_cooldown(symbol, mode):
+    left = cooldown_remaining(symbol, mode)
+    if left > 0:
+        last_eval.skip(symbol, mode, until=clock.time() + left)
         return None
 
     # =========================
     # FUTURES KILL SWITCH
     # =========================
     if mode == "FUTURES" and is_danger_time():
+        last_eval.skip(symbol, mode)
         return None
 
     # =========================
     # FETCH DATA
     # =========================
     try:
-        df4h = fetch_ohlcv(symbol, ENTRY_TF, LIMIT_4H)
-        df1d = fetch_ohlcv(symbol, DAILY_TF, LIMIT_1D)
-        df_ltf = fetch_ohlcv(symbol, FUTURES_EXEC_TF, FUTURES_LTF_LIMIT)
+        df4h = get_candles(symbol, ENTRY_TF, LIMIT_4H)
+        df1d = get_candles(symbol, DAILY_TF, LIMIT_1D)
+        df_ltf = get_candles(symbol, FUTURES_EXEC_TF, FUTURES_LTF_LIMIT)
     except Exception:
+        last_eval.fail(symbol, mode)
         return None
 
     if len(df4h) < 50 or len(df1d) < 50 or len(df_ltf) < 50:
+        last_eval.skip(symbol, mode)
         return None
 
     # =========================
     # HTF TREND
     # =========================
-    _, trend = supertrend(df4h, period=10, mult=3.0)
+    _, trend = supertrend(df4h, period=ATR_PERIOD, mult=SUPERTREND_MULT)
     direction = "LONG" if trend.iloc[-1] == 1 else "SHORT"
 
     # =========================
@@ -112,10 +132,11 @@ def check_signal(symbol, mode, balance):
     # =========================
     score_data = institutional_score(df4h, df1d, direction)
     score = score_data["TotalScore"]
+    last_eval.record(symbol, mode, score, bar_range_pct(df4h))
 
-    if mode == "SPOT" and score < 70:
+    if mode == "SPOT" and score < SPOT_MIN_SCORE:
         return None
-    if mode == "FUTURES" and score < 75:
+    if mode == "FUTURES" and score < FUTURES_MIN_SCORE:
         return None
 
     # =========================
@@ -147,6 +168,12 @@ def check_signal(symbol, mode, balance):
         if direction == "SHORT" and regime not in ["REGIME_DISTRIBUTION", "REGIME_MARKDOWN"]:
             return None
 
+    # =========================
+    # MARKET BREADTH (OPSIONAL, 1x PER CYCLE)
+    # =========================
+    if BREADTH_GATE_ENABLED and not breadth_allows(mode, direction):
+        return None
+
     # =========================
     # ADL CONFIRMATION
     # =========================
@@ -174,17 +201,19 @@ def check_signal(symbol, mode, balance):
     # =========================
     # HTF SL (INVALIDATION)
     # =========================
+    levels = get_level_index(symbol, df1d)
+
     if direction == "LONG":
-        supports = [s for s in find_support(df1d, SR_LOOKBACK) if s < entry]
-        if not supports:
+        support = levels.nearest_support(entry)
+        if support is None:
             return None
-        sl_htf = max(supports) * (1 - ZONE_BUFFER)
+        sl_htf = support * (1 - ZONE_BUFFER)
         phase = "AKUMULASI_INSTITUSI"
     else:
-        resistances = [r for r in find_resistance(df1d, SR_LOOKBACK) if r > entry]
-        if not resistances:
+        resistance = levels.nearest_resistance(entry)
+        if resistance is None:
             return None
-        sl_htf = min(resistances) * (1 + ZONE_BUFFER)
+        sl_htf = resistance * (1 + ZONE_BUFFER)
         phase = "DISTRIBUSI_INSTITUSI"
 
     # =========================
@@ -0,0 +1,239 @@
+# =====================================================
+# OPSI A PRO — SCORE SNAPSHOT STORE (COLUMNAR)
+# DATE PARTITION | NPZ COMPRESSED | LATEST-2 INDEX
+# =====================================================
+#
+# Layout SCORE_SNAPSHOT_DIR:
+#   2026-10-19/223500123456.npz   1 segment per snapshot (hari berjalan)
+#   2026-10-18.npz                hari lewat → digabung jadi 1 segment
+#   latest.json                   2 snapshot terakhir per symbol
+#
+# Tulis snapshot = 1 file baru + update index (tanpa baca history).
+# Delta = baca latest.json saja → O(symbols).
+# App dan scanner sama-sama menulis → update index & compaction
+# di bawah file lock (LOCK_FILE) antar proses.
+
+import os
+import json
+import glob
+import shutil
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+import clock
+from config import SCORE_SNAPSHOT_DIR
+from file_lock import file_lock
+
+COLUMNS = ["Time", "Symbol", "Direction", "Score", "Regime"]
+INDEX_FILE = "latest.json"
+LOCK_FILE = ".lock"
+
+
+# =====================================================
+# LOW LEVEL
+# =====================================================
+def _day(ms: int) -> str:
+    return datetime.fromtimestamp(ms / 1000, timezone.utc).strftime("%Y-%m-%d")
+
+
+def _to_arrays(df: pd.DataFrame, ms: int) -> dict:
+    return {
+        "Time": np.full(len(df), ms, dtype=np.int64),
+        "Symbol": df["Symbol"].to_numpy(dtype=str),
+        "Direction": df["Direction"].to_numpy(dtype=str),
+        "Score": df["Score"].to_numpy(dtype=np.int16),
+        "Regime": df["Regime"].to_numpy(dtype=str)
+    }
+
+
+def _write_npz(path: str, arrays: dict):
+    tmp = path + ".tmp.npz"
+    np.savez_compressed(tmp, **arrays)
+    os.replace(tmp, path)
+
+
+def _read_npz(path: str) -> dict:
+    with np.load(path, allow_pickle=False) as z:
+        return {c: z[c] for c in COLUMNS}
+
+
+def _store_lock():
+    os.makedirs(SCORE_SNAPSHOT_DIR, exist_ok=True)
+    return file_lock(os.path.join(SCORE_SNAPSHOT_DIR, LOCK_FILE))
+
+
+def _load_index() -> dict:
+    path = os.path.join(SCORE_SNAPSHOT_DIR, INDEX_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_index(index: dict):
+    path = os.path.join(SCORE_SNAPSHOT_DIR, INDEX_FILE)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(index, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+# =====================================================
+# COMPACTION (HARI LEWAT → 1 SEGMENT)
+# =====================================================
+def compact_partitions(today=None) -> int:
+    """Gabung segment per hari yang sudah lewat. Return jumlah hari."""
+    with _store_lock():
+        return _compact(today or _day(clock.time_ms()))
+
+
+def _compact(today: str) -> int:
+    # dipanggil dengan _store_lock() sudah dipegang
+    done = 0
+
+    for part in sorted(glob.glob(os.path.join(SCORE_SNAPSHOT_DIR, "????-??-??"))):
+        day = os.path.basename(part)
+        if not os.path.isdir(part) or day >= today:
+            continue
+
+        segments = [_read_npz(p) for p in sorted(glob.glob(os.path.join(part, "*.npz")))]
+        target = part + ".npz"
+        if os.path.exists(target):
+            segments.insert(0, _read_npz(target))
+
+        if segments:
+            _write_npz(target, {
+                c: np.concatenate([s[c] for s in segments]) for c in COLUMNS
+            })
+
+        shutil.rmtree(part)
+        done += 1
+
+    return done
+
+
+# =====================================================
+# WRITE
+# =====================================================
+def append_snapshot(df: pd.DataFrame, ms=None) -> int:
+    """
+    df: Symbol, Direction, Score, Regime (1 baris per symbol).
+    Tulis 1 segment + geser index latest-2. Return jumlah baris.
+    """
+    if df.empty:
+        return 0
+
+    ms = int(ms or clock.time_ms())
+    day = _day(ms)
+    stamp = datetime.fromtimestamp(ms / 1000, timezone.utc).strftime("%H%M%S%f")
+
+    with _store_lock():
+        part = os.path.join(SCORE_SNAPSHOT_DIR, day)
+        new_day = not os.path.isdir(part)
+        os.makedirs(part, exist_ok=True)
+
+        _write_npz(os.path.join(part, stamp + ".npz"), _to_arrays(df, ms))
+
+        index = _load_index()
+        for row in df[["Symbol", "Direction", "Score", "Regime"]].itertuples(index=False):
+            entry = [ms, row.Direction, int(row.Score), row.Regime]
+            # snapshot ms yang sama ditulis ulang → ganti, bukan geser
+            prev = [e for e in index.get(row.Symbol, []) if e[0] != ms]
+            index[row.Symbol] = prev[-1:] + [entry]
+        _save_index(index)
+
+        if new_day:
+            _compact(day)
+
+    return len(df)
+
+
+# =====================================================
+# READ
+# =====================================================
+def latest_pairs() -> dict:
+    """{symbol: [[ms, direction, score, regime] prev, curr]} (1–2 entry)."""
+    return _load_index()
+
+
+def load_snapshots(start=None, end=None, symbols=None) -> pd.DataFrame:
+    """
+    Semua snapshot dengan Time (ms) di [start, end).
+    Hanya partisi hari yang overlap range yang dibaca.
+    """
+    lo = _day(start) if start is not None else ""
+    hi = _day(end - 1) if end is not None else "9999"     # end eksklusif
+
+    paths = []
+    for p in sorted(glob.glob(os.path.join(SCORE_SNAPSHOT_DIR, "????-??-??*"))):
+        day = os.path.basename(p)[:10]
+        if not (lo <= day <= hi):
+            continue
+        paths += sorted(glob.glob(os.path.join(p, "*.npz"))) if os.path.isdir(p) else [p]
+
+    if not paths:
+        return pd.DataFrame(columns=COLUMNS)
+
+    segments = [_read_npz(p) for p in paths]
+    df = pd.DataFrame({
+        c: np.concatenate([s[c] for s in segments]) for c in COLUMNS
+    })
+
+    mask = np.ones(len(df), dtype=bool)
+    if start is not None:
+        mask &= df["Time"].to_numpy() >= start
+    if end is not None:
+        mask &= df["Time"].to_numpy() < end
+    if symbols is not None:
+        mask &= df["Symbol"].isin(symbols).to_numpy()
+
+    return df[mask].sort_values("Time", kind="stable").reset_index(drop=True)
+
+
+def load_last(n: int) -> pd.DataFrame:
+    """n snapshot terakhir (partisi dibaca dari yang terbaru)."""
+    frames, times = [], set()
+
+    days = {
+        os.path.basename(p)[:10]
+        for p in glob.glob(os.path.join(SCORE_SNAPSHOT_DIR, "????-??-??*"))
+    }
+
+    for day in sorted(days, reverse=True):
+        df = load_snapshots(
+            int(pd.Timestamp(day, tz="UTC").timestamp() * 1000),
+            int((pd.Timestamp(day, tz="UTC") + pd.Timedelta(days=1)).timestamp() * 1000)
+        )
+        frames.append(df)
+        times.update(df["Time"].unique().tolist())
+        if len(times) >= n:
+            break
+
+    if not frames:
+        return pd.DataFrame(columns=COLUMNS)
+
+    df = pd.concat(frames[::-1], ignore_index=True)
+    keep = sorted(times)[-n:]
+    return df[df["Time"] >= keep[0]].reset_index(drop=True) if keep else df
+
+
+# =====================================================
+# LEGACY CSV (score_snapshot.csv) → STORE
+# =====================================================
+def import_csv(path: str) -> int:
+    """Import snapshot CSV lama (Time ISO, Symbol, Direction, Score, Regime)."""
+    df = pd.read_csv(path)
+    if df.empty:
+        return 0
+
+    ts = pd.to_datetime(df["Time"], utc=True, format="ISO8601")
+    df["_ms"] = (ts - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(milliseconds=1)
+
+    rows = 0
+    for ms, g in df.sort_values("_ms").groupby("_ms", sort=True):
+        rows += append_snapshot(g, int(ms))
+
+    compact_partitions()
+    return rows
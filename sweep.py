@@ -0,0 +1,224 @@
+# =====================================================
+# OPSI A PRO — PARAMETER SWEEP
+# GRID / RANDOM SEARCH | PROCESS POOL | RANKED RESULT
+# =====================================================
+#
+# Unit kerja = 1 symbol: fitur dihitung 1x, supertrend di-cache per
+# (ATR_PERIOD, SUPERTREND_MULT), pivot per SR_LOOKBACK, lalu semua
+# kombinasi parameter dievaluasi di atas cache itu.
+#
+#   python sweep.py --mode FUTURES --samples 1000 --workers 8
+
+import os
+import random
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from config import FUTURES_BIG_COINS, SWEEP_RESULT_FILE
+from backtest import SymbolFeatures, load_history, load_ltf, default_params
+
+DEFAULT_SPACE = {
+    "ATR_PERIOD": [7, 10, 14],
+    "SUPERTREND_MULT": [2.0, 2.5, 3.0, 3.5],
+    "SR_LOOKBACK": [3, 5, 8],
+    "ZONE_BUFFER": [0.005, 0.01, 0.015],
+    "TP1_R": [0.8, 1.0],
+    "TP2_R": [1.5, 2.0, 3.0],
+    "MIN_SCORE": [65, 70, 75, 80]
+}
+
+
+# =====================================================
+# PARAMETER SET
+# =====================================================
+def param_grid(space=None) -> list:
+    space = space or DEFAULT_SPACE
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*space.values())]
+
+
+def sample_params(space=None, n=100, seed=0) -> list:
+    """n kombinasi unik secara acak dari grid (tanpa materialisasi grid)."""
+    space = space or DEFAULT_SPACE
+    keys = list(space)
+    sizes = [len(space[k]) for k in keys]
+    total = int(np.prod(sizes))
+
+    rng = random.Random(seed)
+    picks = rng.sample(range(total), min(n, total))
+
+    combos = []
+    for flat in picks:
+        combo = {}
+        for k, size in zip(reversed(keys), reversed(sizes)):
+            flat, idx = divmod(flat, size)
+            combo[k] = space[k][idx]
+        combos.append({k: combo[k] for k in keys})
+
+    return combos
+
+
+# =====================================================
+# WORKER (1 SYMBOL × SEMUA KOMBINASI)
+# =====================================================
+def _evaluate_symbol(job):
+    symbol, mode, combos, windows = job
+
+    try:
+        df4h, df1d = load_history(symbol)
+    except Exception:
+        return None
+
+    if len(df4h) < 50 or len(df1d) < 50:
+        return None
+
+    df_ltf = load_ltf(symbol) if mode == "FUTURES" else None
+    feats = SymbolFeatures(symbol, df4h, df1d, df_ltf)
+    base = default_params(mode)
+
+    # simulasi terpisah per window → posisi tidak terbawa antar window
+    window_id, combo_id, entry_t, exit_t, r = [], [], [], [], []
+    for wid, (start_t, end_t) in enumerate(windows):
+        for cid, combo in enumerate(combos):
+            for tr in feats.simulate({**base, **combo}, mode, start_t, end_t):
+                if tr["ExitTime"] is None:
+                    continue
+                window_id.append(wid)
+                combo_id.append(cid)
+                entry_t.append(tr["EntryTime"])
+                exit_t.append(tr["ExitTime"])
+                r.append(tr["R"])
+
+    return (
+        np.asarray(window_id, dtype=np.int32),
+        np.asarray(combo_id, dtype=np.int32),
+        np.asarray(entry_t, dtype=np.int64),
+        np.asarray(exit_t, dtype=np.int64),
+        np.asarray(r, dtype=float)
+    )
+
+
+def pool_map(fn, jobs, workers=None) -> list:
+    """map fn ke jobs (workers=1 → proses ini, selain itu ProcessPool)."""
+    if workers == 1:
+        return list(map(fn, jobs))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(fn, jobs))
+
+
+def run_pool_windows(symbols, mode, combos, windows, workers=None):
+    """
+    windows = [(start_t, end_t), ...], tiap window disimulasikan terpisah.
+    Return (window_id, combo_id, entry_t, exit_t, R) gabungan semua symbol.
+    """
+    jobs = [(s, mode, combos, windows) for s in symbols]
+    results = [r for r in pool_map(_evaluate_symbol, jobs, workers) if r is not None]
+
+    if not results:
+        empty = np.empty(0)
+        return (
+            empty.astype(np.int32), empty.astype(np.int32),
+            empty.astype(np.int64), empty.astype(np.int64), empty
+        )
+
+    return tuple(np.concatenate(parts) for parts in zip(*results))
+
+
+def run_pool(symbols, mode, combos, start_t=None, end_t=None, workers=None):
+    """Return (combo_id, entry_t, exit_t, R) gabungan semua symbol."""
+    _, *res = run_pool_windows(symbols, mode, combos, [(start_t, end_t)], workers)
+    return tuple(res)
+
+
+# =====================================================
+# RANKING
+# =====================================================
+def summarize(combo_id, exit_t, r, combos, min_trades=20) -> pd.DataFrame:
+    trades = pd.DataFrame({"Combo": combo_id, "ExitTime": exit_t, "R": r})
+    rows = []
+
+    for cid, g in trades.sort_values("ExitTime").groupby("Combo"):
+        equity = g["R"].cumsum().to_numpy()
+        drawdown = np.maximum.accumulate(np.r_[0.0, equity])[1:] - equity
+        gains, losses = g["R"][g["R"] > 0].sum(), -g["R"][g["R"] < 0].sum()
+
+        rows.append({
+            "Combo": cid,
+            "Trades": len(g),
+            "WinRate": round((g["R"] > 0).mean() * 100, 2),
+            "Expectancy": round(g["R"].mean(), 4),
+            "TotalR": round(g["R"].sum(), 2),
+            "ProfitFactor": round(gains / losses, 2) if losses > 0 else np.inf,
+            "MaxDD_R": round(drawdown.max(), 2)
+        })
+
+    res = pd.DataFrame(rows, columns=[
+        "Combo", "Trades", "WinRate", "Expectancy",
+        "TotalR", "ProfitFactor", "MaxDD_R"
+    ])
+    params = pd.DataFrame(combos).rename_axis("Combo").reset_index()
+    res = params.merge(res, on="Combo", how="left")
+    res["Trades"] = res["Trades"].fillna(0).astype(int)
+    res["Eligible"] = res["Trades"] >= min_trades
+
+    return res.sort_values(
+        ["Eligible", "Expectancy", "TotalR"],
+        ascending=False,
+        na_position="last"
+    ).reset_index(drop=True)
+
+
+def run_sweep(
+    symbols=None,
+    mode="SPOT",
+    space=None,
+    samples=None,
+    seed=0,
+    workers=None,
+    min_trades=20,
+    start_t=None,
+    end_t=None
+) -> pd.DataFrame:
+    """
+    samples=None → full grid, samples=N → N kombinasi acak.
+    Return tabel ranking (terbaik di atas).
+    """
+    symbols = symbols or FUTURES_BIG_COINS
+    combos = (
+        param_grid(space) if samples is None
+        else sample_params(space, samples, seed)
+    )
+
+    combo_id, _, exit_t, r = run_pool(symbols, mode, combos, start_t, end_t, workers)
+    return summarize(combo_id, exit_t, r, combos, min_trades)
+
+
+# =====================================================
+# CLI
+# =====================================================
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="OPSI A PRO parameter sweep")
+    ap.add_argument("--mode", default="FUTURES", choices=["SPOT", "FUTURES"])
+    ap.add_argument("--symbols", nargs="*", default=None)
+    ap.add_argument("--samples", type=int, default=None)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--workers", type=int, default=os.cpu_count())
+    ap.add_argument("--min-trades", type=int, default=20)
+    ap.add_argument("--out", default=SWEEP_RESULT_FILE)
+    args = ap.parse_args()
+
+    result = run_sweep(
+        args.symbols,
+        args.mode,
+        samples=args.samples,
+        seed=args.seed,
+        workers=args.workers,
+        min_trades=args.min_trades
+    )
+    result.to_csv(args.out, index=False)
+    print(result.head(20).to_string(index=False))
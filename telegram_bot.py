@@ -9,7 +9,11 @@ import requests
 BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 CHAT_ID   = os.getenv("TELEGRAM_CHAT_ID")
 
-if not BOT_TOKEN or not CHAT_ID:
+# TELEGRAM_DRY_RUN=1 → pesan tidak dikirim, hanya dicatat di dry_run_outbox
+DRY_RUN = os.getenv("TELEGRAM_DRY_RUN") == "1"
+dry_run_outbox = []
+
+if not DRY_RUN and (not BOT_TOKEN or not CHAT_ID):
     raise RuntimeError("Telegram ENV not set")
 
 TELEGRAM_URL = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
@@ -19,6 +23,10 @@ TELEGRAM_URL = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
 # CORE SENDER (PLAIN TEXT ONLY)
 # =====================================================
 def send_telegram_message(text: str):
+    if DRY_RUN:
+        dry_run_outbox.append(text)
+        return
+
     payload = {
         "chat_id": CHAT_ID,
         "text": text   # ⛔ NO parse_mode (ANTI ERROR 400)
@@ -70,3 +78,18 @@ def format_trade_update(row: dict) -> str:
         f"TP1        : {row['TP1']}\n"
         f"TP2        : {row['TP2']}"
     )
+
+
+# =====================================================
+# REGIME FLIP MESSAGE (SAFE)
+# =====================================================
+def format_regime_flip(row: dict, old_regime: str) -> str:
+    return (
+        "OPSI A PRO REGIME FLIP\n\n"
+        f"Symbol     : {row['Symbol']}\n"
+        f"Mode       : {row['Mode']}\n"
+        f"Direction  : {row['Direction']}\n"
+        f"Status     : {row['Status']}\n\n"
+        f"Frozen     : {row['Regime']}\n"
+        f"Regime     : {old_regime} → {row['CurrentRegime']}"
+    )
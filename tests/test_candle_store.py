@@ -0,0 +1,75 @@
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import clock
+import exchange
+import candle_store
+from resample import bucket_start, timeframe_ms
+
+DAY_MS = timeframe_ms("1d")
+SYMBOL = "BTC/USDT"
+
+
+class UtcFeed:
+    """Bar sejajar UTC (seperti ccxt okx "1Dutc"), harga deterministik."""
+
+    @staticmethod
+    def _bars(tf, start, n):
+        t = start + np.arange(n, dtype=np.int64) * timeframe_ms(tf)
+        close = 100 + (t // 900_000 % 50).astype(float)
+        return pd.DataFrame({
+            "t": t, "open": close, "high": close + 1,
+            "low": close - 1, "close": close, "volume": 1.0
+        })
+
+    def fetch_ohlcv(self, symbol, tf, limit):
+        last = int(bucket_start(clock.time_ms(), tf))
+        return self._bars(tf, last - (limit - 1) * timeframe_ms(tf), limit)
+
+    def fetch_ohlcv_since(self, symbol, tf, since=None, limit=300):
+        if since is None:
+            return self.fetch_ohlcv(symbol, tf, limit)
+        step = timeframe_ms(tf)
+        last = int(bucket_start(clock.time_ms(), tf))
+        return self._bars(tf, int(since), min(limit, (last - int(since)) // step + 1))
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    start = datetime(2026, 3, 10, 20, 0, tzinfo=timezone.utc).timestamp()
+    clock.set_clock(clock.ReplayClock(start, speed=1.0))
+    exchange.set_feed(UtcFeed())
+    candle_store._seeded.clear()
+    candle_store._last_sync.clear()
+    yield
+    exchange.set_feed(None)
+    clock.set_clock(None)
+
+
+def _assert_one_bar_per_day(df):
+    assert (df["t"] % DAY_MS == 0).all()
+    assert df["t"].is_unique
+    assert (df["t"] // DAY_MS).is_unique
+
+
+def test_seed_and_roll_forward_one_daily_bar_per_day(store):
+    # bar HK (16:00 UTC) sisa alignment lama → harus dibuang saat seed
+    stale = UtcFeed._bars("1d", 20 * DAY_MS + 16 * 3_600_000, 1)
+    candle_store.upsert_candles(SYMBOL, "1d", stale)
+
+    df = candle_store.get_candles(SYMBOL, "1d", 30)
+    _assert_one_bar_per_day(df)
+    assert len(df) == 30
+
+    for _ in range(3):
+        clock.sleep(DAY_MS / 1000 + 3600)
+        df = candle_store.get_candles(SYMBOL, "1d", 60)
+        _assert_one_bar_per_day(df)
+
+    # bar berjalan = hari ini (UTC), bukan bucket 16:00 kemarin
+    assert int(df["t"].iloc[-1]) == int(bucket_start(clock.time_ms(), "1d"))
+    assert len(df) == 33
@@ -0,0 +1,61 @@
+import os
+import sys
+import subprocess
+
+import numpy as np
+import pandas as pd
+
+from config import SIGNAL_LOG_FILE
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROWS = 120_000
+
+SYNC = """
+import history_store
+history_store.sync_history_store()
+print(history_store.count_signals(), history_store.count_signals(status="OPEN"))
+"""
+
+
+def _write_history(path):
+    i = np.arange(ROWS)
+    pd.DataFrame({
+        "TimeUTC": pd.Timestamp("2026-01-01") + pd.to_timedelta(i, unit="min"),
+        "Symbol": np.where(i % 2, "BTC/USDT", "ETH/USDT"),
+        "Mode": np.where(i % 3, "SPOT", "FUTURES"),
+        "Status": np.where(i % 10 == 0, "OPEN", "CLOSED"),
+        "Score": i % 100
+    }).assign(TimeUTC=lambda d: d["TimeUTC"].dt.strftime("%Y-%m-%dT%H:%M:%S")).to_csv(path, index=False)
+
+
+def test_concurrent_sync_builds_one_copy(tmp_path):
+    _write_history(tmp_path / SIGNAL_LOG_FILE)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, os.environ.get("PYTHONPATH", "")]))
+
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-c", SYNC],
+            cwd=tmp_path, env=env, stdout=subprocess.PIPE, text=True
+        )
+        for _ in range(2)
+    ]
+    outs = [p.communicate(timeout=300)[0].split() for p in procs]
+
+    assert all(p.returncode == 0 for p in procs)
+    assert outs == [[str(ROWS), str(ROWS // 10)]] * 2
+
+    # mirror sudah fresh → sync berikutnya tidak menggandakan baris
+    rerun = subprocess.run(
+        [sys.executable, "-c", SYNC],
+        cwd=tmp_path, env=env, stdout=subprocess.PIPE, text=True, check=True
+    )
+    assert rerun.stdout.split() == [str(ROWS), str(ROWS // 10)]
+
+    # append → hanya baris baru yang masuk
+    with open(tmp_path / SIGNAL_LOG_FILE, "a") as f:
+        f.write("2027-01-01T00:00:00,SOL/USDT,SPOT,OPEN,50\n")
+    rerun = subprocess.run(
+        [sys.executable, "-c", SYNC],
+        cwd=tmp_path, env=env, stdout=subprocess.PIPE, text=True, check=True
+    )
+    assert rerun.stdout.split() == [str(ROWS + 1), str(ROWS // 10 + 1)]
@@ -0,0 +1,166 @@
+# =====================================================
+# OPSI A PRO — SPOT UNIVERSE (LIQUIDITY RANKED)
+# 1 FETCH_TICKERS | QUOTE VOLUME + SPREAD | TIERED | CACHED
+# =====================================================
+#
+# Ranking dibangun dari 1x fetch_tickers (bukan per symbol):
+#   - hanya spot USDT aktif
+#   - spread (ask − bid) / mid > UNIVERSE_MAX_SPREAD_PCT → dibuang
+#   - urut quote volume 24h (tie → spread lebih kecil)
+# Disimpan di UNIVERSE_FILE, di-refresh tiap UNIVERSE_REFRESH_SEC.
+# Exchange error saat refresh → ranking lama (memory / file walau
+# sudah basi) + log universe_stale; error hanya kalau belum ada sama
+# sekali (cold start tanpa file).
+#
+# Tier scanner:
+#   tier 1 = top UNIVERSE_TIER1            → setiap cycle
+#   tier 2 = UNIVERSE_TIER2 berikutnya     → tiap UNIVERSE_TIER2_EVERY cycle
+
+import os
+import json
+import threading
+
+import pandas as pd
+
+import clock
+from config import (
+    UNIVERSE_FILE,
+    UNIVERSE_REFRESH_SEC,
+    UNIVERSE_MAX_SPREAD_PCT,
+    UNIVERSE_TIER1,
+    UNIVERSE_TIER2,
+    UNIVERSE_TIER2_EVERY
+)
+from exchange import get_okx, fetch_tickers
+from logger import get_logger
+
+log = get_logger("universe")
+
+COLUMNS = ["Symbol", "QuoteVolume", "SpreadPct", "Last"]
+
+_lock = threading.Lock()
+_cache = {"updated": 0, "rows": None}
+
+
+# =====================================================
+# BUILD
+# =====================================================
+def _quote_volume(t: dict) -> float:
+    qv = t.get("quoteVolume")
+    if qv is None and t.get("baseVolume") is not None and t.get("last"):
+        qv = t["baseVolume"] * t["last"]
+    return float(qv or 0.0)
+
+
+def _spread_pct(t: dict) -> float:
+    bid, ask = t.get("bid"), t.get("ask")
+    if not bid or not ask or ask < bid:
+        return float("inf")
+    return (ask - bid) / ((ask + bid) / 2) * 100
+
+
+def rank_markets(markets: dict, tickers: dict) -> pd.DataFrame:
+    rows = []
+
+    for symbol, m in markets.items():
+        if not (m.get("spot") and m.get("active") and symbol.endswith("/USDT")):
+            continue
+
+        t = tickers.get(symbol)
+        if not t:
+            continue
+
+        spread = _spread_pct(t)
+        if spread > UNIVERSE_MAX_SPREAD_PCT:
+            continue
+
+        rows.append({
+            "Symbol": symbol,
+            "QuoteVolume": _quote_volume(t),
+            "SpreadPct": round(spread, 4),
+            "Last": t.get("last")
+        })
+
+    df = pd.DataFrame(rows, columns=COLUMNS)
+    return df.sort_values(
+        ["QuoteVolume", "SpreadPct"], ascending=[False, True]
+    ).reset_index(drop=True)
+
+
+def build_universe() -> pd.DataFrame:
+    ranked = rank_markets(get_okx().markets, fetch_tickers())
+
+    tmp = UNIVERSE_FILE + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({
+            "updated": clock.time(),
+            "rows": ranked.to_dict("records")
+        }, f)
+    os.replace(tmp, UNIVERSE_FILE)
+
+    return ranked
+
+
+# =====================================================
+# CACHED ACCESS
+# =====================================================
+def _load_file():
+    """(updated, rows) dari UNIVERSE_FILE, None kalau tidak ada / rusak."""
+    if not os.path.exists(UNIVERSE_FILE):
+        return None
+    try:
+        with open(UNIVERSE_FILE) as f:
+            data = json.load(f)
+        return data["updated"], pd.DataFrame(data["rows"], columns=COLUMNS)
+    except Exception as e:
+        log.error("universe_file_error", error=str(e))
+        return None
+
+
+def get_universe(force=False) -> pd.DataFrame:
+    """Ranking terbaru (memory → file → exchange → ranking basi)."""
+    with _lock:
+        now = clock.time()
+
+        if not force and _cache["rows"] is not None \
+                and now - _cache["updated"] < UNIVERSE_REFRESH_SEC:
+            return _cache["rows"]
+
+        saved = _load_file()
+        if not force and saved is not None and now - saved[0] < UNIVERSE_REFRESH_SEC:
+            _cache.update(updated=saved[0], rows=saved[1])
+            return _cache["rows"]
+
+        try:
+            rows = build_universe()
+        except Exception as e:
+            # exchange error → ranking lama (memory, lalu file) walau basi
+            if _cache["rows"] is None and saved is not None:
+                _cache.update(updated=saved[0], rows=saved[1])
+            if _cache["rows"] is None:
+                raise
+
+            log.warning(
+                "universe_stale",
+                age_sec=round(now - _cache["updated"]),
+                error=str(e)
+            )
+            return _cache["rows"]
+
+        _cache.update(updated=now, rows=rows)
+        return rows
+
+
+def top_symbols(n: int) -> list:
+    return get_universe()["Symbol"].head(n).tolist()
+
+
+def tiered_symbols(cycle: int) -> list:
+    """Tier 1 setiap cycle, tier 2 ikut tiap UNIVERSE_TIER2_EVERY cycle."""
+    symbols = get_universe()["Symbol"].tolist()
+    tier1 = symbols[:UNIVERSE_TIER1]
+
+    if cycle % UNIVERSE_TIER2_EVERY:
+        return tier1
+
+    return tier1 + symbols[UNIVERSE_TIER1:UNIVERSE_TIER1 + UNIVERSE_TIER2]
@@ -1,20 +1,30 @@
 # =====================================================
 # OPSI A PRO — UTILS
 # =====================================================
-from datetime import datetime, timezone, timedelta
+from datetime import timezone, timedelta
+
+import clock
 
 # ===== TIMEZONE =====
-WIB = timezone(timedelta(hours=7))
+WIB_OFFSET_HOURS = 7
+WIB = timezone(timedelta(hours=WIB_OFFSET_HOURS))
+
+# kill switch FUTURES: jam WIB [start, end)
+DANGER_HOURS_WIB = (0, 5)
 
 def now_wib():
-    return datetime.now(timezone.utc).astimezone(WIB).strftime("%Y-%m-%d %H:%M WIB")
+    return clock.now(WIB).strftime("%Y-%m-%d %H:%M WIB")
 
 def wib_hour():
-    return datetime.now(timezone.utc).astimezone(WIB).hour
+    return clock.now(WIB).hour
+
+def is_danger_hour(h):
+    # midnight – subuh; h = jam WIB (int atau numpy array)
+    start, end = DANGER_HOURS_WIB
+    return (h >= start) & (h < end)
 
 def is_danger_time():
-    # midnight – subuh
-    return 0 <= wib_hour() < 5
+    return bool(is_danger_hour(wib_hour()))
 
 def is_safe_spot_time():
     h = wib_hour()
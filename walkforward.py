@@ -0,0 +1,207 @@
+# =====================================================
+# OPSI A PRO — WALK-FORWARD OPTIMIZATION
+# ROLLING TRAIN / TEST | OUT-OF-SAMPLE TRADES
+# =====================================================
+#
+# |---- train ----|- test -|
+#          |---- train ----|- test -|
+#                   |---- train ----|- test -|
+#
+# Pass 1: per symbol, fitur dihitung 1x lalu setiap kombinasi
+#         disimulasikan per window train (posisi di-reset tiap fold,
+#         trade sebelum fold tidak memblok entry di dalam fold).
+# Pass 2: parameter terbaik tiap fold dijalankan di window test
+#         → trade out-of-sample, untuk run_monte_carlo(trades,
+#         mode=mode, phase=None) (default monte carlo = SPOT akumulasi).
+#
+#   python walkforward.py --mode SPOT --train-days 180 --test-days 30
+
+import os
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from config import (
+    ENTRY_TF,
+    FUTURES_BIG_COINS,
+    WALKFORWARD_TRADE_FILE,
+    WALKFORWARD_FOLD_FILE
+)
+from candle_store import candle_bounds
+from backtest import SymbolFeatures, load_history, load_ltf, default_params
+from sweep import param_grid, sample_params, run_pool_windows, pool_map, summarize
+
+DAY_MS = 86_400_000
+
+
+# =====================================================
+# FOLDS
+# =====================================================
+def make_folds(symbols, train_days, test_days, step_days=None) -> list:
+    bounds = [candle_bounds(s, ENTRY_TF) for s in symbols]
+    bounds = [b for b in bounds if b[0] is not None]
+    if not bounds:
+        return []
+
+    first = min(b[0] for b in bounds)
+    last = max(b[1] for b in bounds)
+    step = (step_days or test_days) * DAY_MS
+
+    folds, start = [], first
+    while start + (train_days + test_days) * DAY_MS <= last + DAY_MS:
+        train_end = start + train_days * DAY_MS
+        folds.append({
+            "Fold": len(folds),
+            "TrainStart": start,
+            "TrainEnd": train_end,
+            "TestEnd": train_end + test_days * DAY_MS
+        })
+        start += step
+
+    return folds
+
+
+# =====================================================
+# PASS 2 WORKER (OUT-OF-SAMPLE)
+# =====================================================
+def _test_symbol(job):
+    symbol, mode, plan = job
+
+    try:
+        df4h, df1d = load_history(symbol)
+    except Exception:
+        return []
+
+    if len(df4h) < 50 or len(df1d) < 50:
+        return []
+
+    df_ltf = load_ltf(symbol) if mode == "FUTURES" else None
+    feats = SymbolFeatures(symbol, df4h, df1d, df_ltf)
+
+    trades = []
+    for fold in plan:
+        for tr in feats.simulate(
+            fold["Params"], mode, fold["TrainEnd"], fold["TestEnd"]
+        ):
+            trades.append({"Fold": fold["Fold"], **tr})
+
+    return trades
+
+
+# =====================================================
+# WALK FORWARD
+# =====================================================
+def walk_forward(
+    symbols=None,
+    mode="SPOT",
+    train_days=180,
+    test_days=30,
+    step_days=None,
+    space=None,
+    samples=200,
+    seed=0,
+    workers=None,
+    min_trades=20
+):
+    """
+    Return (trade_results, folds):
+    - trade_results: trade OOS tertutup (Symbol, Mode, Phase, R, ...)
+      → run_monte_carlo(trade_results, mode=mode, phase=None)
+    - folds: parameter terpilih + statistik train / test per fold
+    """
+    symbols = symbols or FUTURES_BIG_COINS
+    folds = make_folds(symbols, train_days, test_days, step_days)
+    if not folds:
+        return pd.DataFrame(), pd.DataFrame()
+
+    combos = (
+        param_grid(space) if samples is None
+        else sample_params(space, samples, seed)
+    )
+
+    # =========================
+    # PASS 1 — IN-SAMPLE (SEMUA KOMBINASI, PER WINDOW TRAIN)
+    # =========================
+    windows = [(f["TrainStart"], f["TrainEnd"]) for f in folds]
+    window_id, combo_id, _, exit_t, r = run_pool_windows(
+        symbols, mode, combos, windows, workers
+    )
+
+    base = default_params(mode)
+    for k, fold in enumerate(folds):
+        # trade train harus sudah close sebelum window test dimulai
+        m = (window_id == k) & (exit_t < fold["TrainEnd"])
+        ranked = summarize(combo_id[m], exit_t[m], r[m], combos, min_trades)
+        best = ranked.iloc[0]
+
+        if best["Eligible"]:
+            fold["Params"] = {**base, **combos[int(best["Combo"])]}
+            fold["Selected"] = "OPTIMIZED"
+            fold["TrainTrades"] = int(best["Trades"])
+            fold["TrainExpectancy"] = best["Expectancy"]
+        else:
+            fold["Params"] = base
+            fold["Selected"] = "DEFAULT"
+            fold["TrainTrades"] = 0
+            fold["TrainExpectancy"] = np.nan
+
+    # =========================
+    # PASS 2 — OUT-OF-SAMPLE
+    # =========================
+    results = pool_map(_test_symbol, [(s, mode, folds) for s in symbols], workers)
+
+    trades = pd.DataFrame([tr for res in results for tr in res])
+    if not trades.empty:
+        trades = trades[trades["R"].notna()].sort_values("EntryTime")
+        trades = trades.reset_index(drop=True)
+
+    # =========================
+    # FOLD REPORT
+    # =========================
+    report = []
+    for fold in folds:
+        oos = trades[trades["Fold"] == fold["Fold"]] if not trades.empty else trades
+        report.append({
+            **{k: v for k, v in fold.items() if k != "Params"},
+            **fold["Params"],
+            "TestTrades": len(oos),
+            "TestExpectancy": round(oos["R"].mean(), 4) if len(oos) else np.nan
+        })
+
+    return trades, pd.DataFrame(report)
+
+
+# =====================================================
+# CLI
+# =====================================================
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="OPSI A PRO walk-forward")
+    ap.add_argument("--mode", default="SPOT", choices=["SPOT", "FUTURES"])
+    ap.add_argument("--symbols", nargs="*", default=None)
+    ap.add_argument("--train-days", type=int, default=180)
+    ap.add_argument("--test-days", type=int, default=30)
+    ap.add_argument("--step-days", type=int, default=None)
+    ap.add_argument("--samples", type=int, default=200)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--workers", type=int, default=os.cpu_count())
+    ap.add_argument("--min-trades", type=int, default=20)
+    args = ap.parse_args()
+
+    trades, folds = walk_forward(
+        args.symbols,
+        args.mode,
+        args.train_days,
+        args.test_days,
+        args.step_days,
+        samples=args.samples,
+        seed=args.seed,
+        workers=args.workers,
+        min_trades=args.min_trades
+    )
+
+    trades.to_csv(WALKFORWARD_TRADE_FILE, index=False)
+    folds.to_csv(WALKFORWARD_FOLD_FILE, index=False)
+    print(folds.to_string(index=False))
+    if not trades.empty:
+        print(f"\nOOS trades: {len(trades)} | expectancy {trades['R'].mean():.3f} R")